@@ -11,6 +11,8 @@ from KBQA.appB.summarizers import GoldSummarizer
 from KBQA.appB.summarizers import LaurenSummarizer
 from KBQA.appB.summarizers import NES
 from KBQA.appB.summarizers import OneHopRankSummarizer
+from KBQA.appB.summarizers.graph_backend import LocalBackend
+from KBQA.appB.summarizers.graph_backend import set_backend
 
 
 class DatasetGenerator:
@@ -64,21 +66,23 @@ class DatasetGenerator:
                 print(f"Error summarizing question {question.text}: {exception}")
 
 
-def get_args() -> Tuple[str, str, str]:
+def get_args() -> Tuple[str, str, str, str]:
     """Get cmd-args.
 
     :return:
         dataset_name: Name of the a QALD or LC-QuAD dataset located at ROOT_PATH
         summarizer_name: Name of a summarizer such as NES, FromAnswer or OneHopRanking
         outfile_name: Name of the output qtq file.
+        store_path: Path of a local triple store replacing DBpedia (empty for DBpedia).
     :rType: tuple
     """
     (opt_args, _) = getopt.getopt(
-        sys.argv[1:], "d:s:o", ["dataset=", "summarizer=", "output="]
+        sys.argv[1:], "d:s:o:k:", ["dataset=", "summarizer=", "output=", "store="]
     )
     dataset_name = ""
     summarizer_name = "NES"
     outfile_name = ""
+    store_path = ""
     for opt, value in opt_args:
         if opt in ("-d", "--dataset"):
             dataset_name = value
@@ -86,16 +90,18 @@ def get_args() -> Tuple[str, str, str]:
             summarizer_name = value
         if opt in ("-o", "--output"):
             outfile_name = value
-    return dataset_name, summarizer_name, outfile_name
+        if opt in ("-k", "--store"):
+            store_path = value
+    return dataset_name, summarizer_name, outfile_name, store_path
 
 
 def main() -> None:
     """Start this module from as __main__ (e.g. from commandline) to invoke this function.
 
-    Synopsis: python generator.py {--dataset | -d} <dataset-name> [{--summarizer | -s} <summarizer>] [{--output|-o} <output-file>]
+    Synopsis: python generator.py {--dataset | -d} <dataset-name> [{--summarizer | -s} <summarizer>] [{--output|-o} <output-file>] [{--store|-k} <store-file>]
     """
     # Gather the given options.
-    dataset_name, summarizer_name, outfile_name = get_args()
+    dataset_name, summarizer_name, outfile_name, store_path = get_args()
 
     if dataset_name == "":
         print(
@@ -111,6 +117,10 @@ def main() -> None:
         "LaurenSummarizer": LaurenSummarizer,
     }
 
+    # Answer the queries of the summarizers from a local triple store.
+    if store_path != "":
+        set_backend(LocalBackend(store_path))
+
     if summarizer_name not in summarizers:
         print(
             f'Provide a summarizer with "{sys.argv[0]}\\ {{-s | --summarizer}} <summarizer_name>".'
@@ -8,8 +8,7 @@ from typing import Tuple
 
 from KBQA.appB.data_generator import Question
 from KBQA.appB.summarizers import BaseSummarizer
-from SPARQLWrapper import JSON
-from SPARQLWrapper import SPARQLWrapper
+from KBQA.appB.summarizers.graph_backend import get_backend
 
 
 class FromAnswerSummarizer(BaseSummarizer):
@@ -219,12 +218,7 @@ class FromAnswerSummarizer(BaseSummarizer):
         :param query: The SPARQL query
         :return: Results for the SPARQL query
         """
-        sparql = SPARQLWrapper("http://dbpedia.org/sparql")
-        sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
-
-        answers = sparql.query().convert()
-        return answers
+        return get_backend().select(query)
 
     def _get_query_results(
         self, sparql_query: str, query_constraint: str
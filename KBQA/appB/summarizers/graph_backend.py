@@ -0,0 +1,196 @@
+"""Pluggable access to the knowledge graph for the summarizers.
+
+By default, the summarizers query the public DBpedia endpoint. With
+set_backend, they can be switched to another SPARQL endpoint or to a local
+TripleStore, e.g. for generating datasets without network access:
+
+    from KBQA.appB.summarizers.graph_backend import LocalBackend
+    from KBQA.appB.summarizers.graph_backend import set_backend
+
+    set_backend(LocalBackend("dbpedia.sqlite"))
+"""
+from abc import ABC
+from abc import abstractmethod
+import json
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from rdflib import Graph
+from rdflib.term import Node
+
+from . import endpoints
+from .triple_store import Triple
+from .triple_store import TripleStore
+
+
+class GraphBackend(ABC):
+    """Abstract knowledge graph, which answers triple patterns and SPARQL-queries."""
+
+    @abstractmethod
+    def triples(
+        self,
+        subj: Optional[Node] = None,
+        pred: Optional[Node] = None,
+        obj: Optional[Node] = None,
+        limit: int = -1,
+    ) -> List[Triple]:
+        """Get the triples matching a pattern.
+
+        Parameters
+        ----------
+        subj : Node, optional
+            Subject of the triples (default: every subject).
+        pred : Node, optional
+            Predicate of the triples (default: every predicate).
+        obj : Node, optional
+            Object of the triples (default: every object).
+        limit : int, optional
+            Limit the number of triples (use -1 to not use any limit).
+
+        Returns
+        -------
+        list
+            Matching triples.
+        """
+
+    @abstractmethod
+    def construct(self, query: str) -> Graph:
+        """Evaluate a CONSTRUCT-query.
+
+        Parameters
+        ----------
+        query : str
+            CONSTRUCT-SPARQL-query.
+
+        Returns
+        -------
+        Graph
+            Graph constructed by the query.
+        """
+
+    @abstractmethod
+    def select(self, query: str) -> Dict[str, Any]:
+        """Evaluate a SELECT- or ASK-query.
+
+        Parameters
+        ----------
+        query : str
+            SELECT- or ASK-SPARQL-query.
+
+        Returns
+        -------
+        dict
+            Result in the SPARQL 1.1 JSON format.
+        """
+
+
+class SparqlBackend(GraphBackend):
+    """Knowledge graph behind a SPARQL endpoint.
+
+    Parameters
+    ----------
+    endpoint : str, optional
+        SPARQL endpoint (default: endpoints.DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the requests in seconds (default: endpoints.client.default_timeout).
+    """
+
+    def __init__(
+        self,
+        endpoint: str = endpoints.DBPEDIA_ENDPOINT,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def triples(
+        self,
+        subj: Optional[Node] = None,
+        pred: Optional[Node] = None,
+        obj: Optional[Node] = None,
+        limit: int = -1,
+    ) -> List[Triple]:
+        """Get the triples matching a pattern with a CONSTRUCT-query."""
+        pattern = " ".join(
+            variable if term is None else term.n3()
+            for variable, term in zip(("?s", "?p", "?o"), (subj, pred, obj))
+        )
+        limit_str = "" if limit == -1 else f"LIMIT {limit}"
+
+        return list(
+            self.construct(
+                f"CONSTRUCT {{ {pattern} }} WHERE {{ {pattern} . }} {limit_str}"
+            )
+        )
+
+    def construct(self, query: str) -> Graph:
+        """Send a CONSTRUCT-query to the endpoint."""
+        return endpoints.query_sparql_graph(query, self.endpoint, self.timeout)
+
+    def select(self, query: str) -> Dict[str, Any]:
+        """Send a SELECT- or ASK-query to the endpoint."""
+        return endpoints.query_sparql_json(query, self.endpoint, self.timeout)
+
+
+class LocalBackend(GraphBackend):
+    """Knowledge graph in a local TripleStore.
+
+    Triple patterns are answered by the indexes of the store and
+    SPARQL-queries are evaluated by rdflib on top of the store.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database of the store (see triple_store).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.store = TripleStore(path)
+        self.graph = Graph(store=self.store)
+
+    def triples(
+        self,
+        subj: Optional[Node] = None,
+        pred: Optional[Node] = None,
+        obj: Optional[Node] = None,
+        limit: int = -1,
+    ) -> List[Triple]:
+        """Get the triples matching a pattern from the indexes of the store."""
+        return self.store.match(subj, pred, obj, limit)
+
+    def construct(self, query: str) -> Graph:
+        """Evaluate a CONSTRUCT-query on the store."""
+        return self.graph.query(query).graph
+
+    def select(self, query: str) -> Dict[str, Any]:
+        """Evaluate a SELECT- or ASK-query on the store."""
+        return json.loads(self.graph.query(query).serialize(format="json"))
+
+
+# the current backend is kept in a mutable container, so set_backend does not
+# need a global statement
+_backends: Dict[str, GraphBackend] = {"current": SparqlBackend()}
+
+
+def get_backend() -> GraphBackend:
+    """Get the knowledge graph used by the summarizers.
+
+    Returns
+    -------
+    GraphBackend
+        Current backend (default: SparqlBackend for DBpedia).
+    """
+    return _backends["current"]
+
+
+def set_backend(backend: GraphBackend) -> None:
+    """Replace the knowledge graph used by the summarizers.
+
+    Parameters
+    ----------
+    backend : GraphBackend
+        New backend.
+    """
+    _backends["current"] = backend
@@ -2,8 +2,8 @@
 from typing import List
 from typing import Tuple
 
+from KBQA.appB.summarizers.graph_backend import get_backend
 from rdflib.graph import Graph
-from rdflib.plugins.sparql import prepareQuery
 from rdflib.term import URIRef
 import requests
 
@@ -64,28 +64,11 @@ def hop_dbpedia_subgraph(entities: List[URIRef], *, limit: int = -1) -> Graph:
     :param limit: An optional limit for the number of triples per entity.
     :return: The subgraph of type rdflib.graph.Graph.
     """
-    # Determine if we have a limit or not.
-    if limit == -1:
-        limit_str = ""
-    else:
-        limit_str = f"LIMIT {limit}"
-
-    query = prepareQuery(
-        f"""
-        CONSTRUCT {{ ?s ?p ?o }}
-        WHERE {{
-            SERVICE <http://dbpedia.org/sparql> {{
-                ?s ?p ?o .
-            }}
-        }}
-        {limit_str}
-        """
-    )
+    backend = get_backend()
     subgraph = Graph()
     for entity in entities:
-        # This is only querying the service endpoint and not subgraph.
-        subgraph_entity = subgraph.query(query, initBindings={"s": entity})
-        subgraph_entity_inverse = subgraph.query(query, initBindings={"o": entity})
+        subgraph_entity = backend.triples(subj=entity, limit=limit)
+        subgraph_entity_inverse = backend.triples(obj=entity, limit=limit)
         for triple in subgraph_entity:
             subgraph.add(triple)
         for triple in subgraph_entity_inverse:
@@ -132,31 +115,12 @@ def hop_dbpedia_regular_and_inverse_subgraph(
     :return: A pair (class tuple) of rdflib.graph.Graph which are sets of triples. First for regular and second for
     inverse relations.
     """
-    # Determine if we have a limit or not.
-    if limit == -1:
-        limit_str = ""
-    else:
-        limit_str = f"LIMIT {limit}"
-
-    query = prepareQuery(
-        f"""
-        CONSTRUCT {{ ?s ?p ?o }}
-        WHERE {{
-            SERVICE <http://dbpedia.org/sparql> {{
-                ?s ?p ?o .
-            }}
-        }}
-        {limit_str}
-        """
-    )
+    backend = get_backend()
     regular_subgraph = Graph()
     inverse_subgraph = Graph()
     for entity in entities:
-        # This is only querying the service endpoint and not subgraph.
-        subgraph_entity = regular_subgraph.query(query, initBindings={"s": entity})
-        subgraph_entity_inverse = inverse_subgraph.query(
-            query, initBindings={"o": entity}
-        )
+        subgraph_entity = backend.triples(subj=entity, limit=limit)
+        subgraph_entity_inverse = backend.triples(obj=entity, limit=limit)
         for triple in subgraph_entity:
             regular_subgraph.add(triple)
         for triple in subgraph_entity_inverse:
@@ -3,12 +3,12 @@ import argparse
 from typing import List
 from typing import Tuple
 
+from KBQA.appB.summarizers.graph_backend import get_backend
 from KBQA.appB.summarizers.utils import entity_recognition_dbspotlight_confidence
 from KBQA.appB.summarizers.utils import entity_recognition_tagme
 from KBQA.appB.summarizers.utils import entity_relation_recognition
 from rdflib import Graph
 from rdflib import URIRef
-from SPARQLWrapper import SPARQLWrapper
 
 
 def entity_relation_hops(
@@ -269,7 +269,7 @@ def get_subgraphs_for_entity_without_relations(
 
 
 def ask_dbpedia(query: str) -> Graph:
-    """Send a SPARQL-query to DBpedia and get the resulting subgraph.
+    """Send a SPARQL-query to the graph backend and get the resulting subgraph.
 
     The query is expected to be a CONSTRUCT-query s.t. a subgraph can be returned.
 
@@ -283,12 +283,7 @@ def ask_dbpedia(query: str) -> Graph:
     result : Graph
         Subgraph contructed by the SPARQL-query.
     """
-    sparql = SPARQLWrapper("http://dbpedia.org/sparql/")
-    sparql.setQuery(query)
-
-    result = sparql.query().convert()
-
-    return result
+    return get_backend().construct(query)
 
 
 def get_regular_subgraph_for_one_hop(entity: str, relation: str, limit: int) -> Graph:
@@ -441,7 +436,10 @@ def get_query_for_one_hop(subj: str, pred: str, obj: str, limit: int) -> str:
 
     # FILTER(STRSTARTS(STR({pred}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({pred}), "http://dbpedia.org/property/"))
     # FILTER(STR({pred}) != STR(<http://dbpedia.org/ontology/wikiPageWikiLink>))
-    query = f"""CONSTRUCT WHERE {{
+    # the explicit template keeps the query portable to local SPARQL engines
+    query = f"""CONSTRUCT {{
+        {subj} {pred} {obj}
+    }} WHERE {{
         {subj} {pred} {obj}
     }} {limit_str}"""
 
@@ -478,7 +476,10 @@ def get_query_for_two_hops(entity: str, p_1: str, p_2: str, limit: int) -> str:
     # FILTER(STRSTARTS(STR({p_1}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_1}), "http://dbpedia.org/property/"))
     # FILTER(STRSTARTS(STR({p_2}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_2}), "http://dbpedia.org/property/"))
 
-    query = f"""CONSTRUCT WHERE {{
+    query = f"""CONSTRUCT {{
+        {entity} {p_1} ?e2 .
+        ?e2 {p_2} ?e3 .
+    }} WHERE {{
         {entity} {p_1} ?e2 .
         ?e2 {p_2} ?e3 .
     }} {limit_str}"""
@@ -516,7 +517,10 @@ def get_query_for_two_hops_inverse(entity: str, p_1: str, p_2: str, limit: int)
     # FILTER(STRSTARTS(STR({p_1}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_1}), "http://dbpedia.org/property/"))
     # FILTER(STRSTARTS(STR({p_2}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_2}), "http://dbpedia.org/property/"))
 
-    query = f"""CONSTRUCT WHERE {{
+    query = f"""CONSTRUCT {{
+        ?e1 {p_1} {entity} .
+        ?e2 {p_2} ?e1 .
+    }} WHERE {{
         ?e1 {p_1} {entity} .
         ?e2 {p_2} ?e1 .
     }} {limit_str}"""
@@ -552,13 +556,13 @@ def get_subgraphs_based_on_relations(
     for relation in relations:
         relation_str += relation.n3() + ","
 
-    query_regular = f"""CONSTRUCT WHERE {{
+    query_regular = f"""CONSTRUCT {{ {entity.n3()} ?p ?o }} WHERE {{
         {entity.n3()} ?p ?o
         FILTER( ?p IN ({relation_str[:-1]}) )
     }}
     """
 
-    query_inverse = f"""CONSTRUCT WHERE {{
+    query_inverse = f"""CONSTRUCT {{ ?s ?p {entity.n3()} }} WHERE {{
         ?s ?p {entity.n3()}
         FILTER( ?p IN ({relation_str[:-1]}) )
     }}
@@ -567,14 +571,8 @@ def get_subgraphs_based_on_relations(
     regular_graph = Graph()
     inverse_graph = Graph()
 
-    sparql = SPARQLWrapper("https://dbpedia.org/sparql/")
-    sparql.setMethod("POST")
-
-    sparql.setQuery(query_regular)
-    regular_graph += sparql.query().convert()
-
-    sparql.setQuery(query_inverse)
-    inverse_graph += sparql.query().convert()
+    regular_graph += get_backend().construct(query_regular)
+    inverse_graph += get_backend().construct(query_inverse)
 
     return regular_graph, inverse_graph
 
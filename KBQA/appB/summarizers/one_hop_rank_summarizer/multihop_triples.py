@@ -6,12 +6,11 @@ from typing import Dict
 from typing import List
 from typing import Tuple
 
+from KBQA.appB.summarizers.graph_backend import get_backend
 from rdflib.graph import Graph
 from rdflib.term import Literal
 from rdflib.term import URIRef
 import requests
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.Wrapper import RDFXML
 
 
 class Triples_for_pred(ABC):
@@ -63,13 +62,14 @@ class Triples_for_pred(ABC):
         """
         string1 = ""
         string2 = ""
-        subj1 = "<" + str(entity) + ">"
+        # the terms are separated by whitespace, which local SPARQL parsers require
+        subj1 = "<" + str(entity) + "> "
         first_predicate = True
         num = 1
         for pred in list_of_predicates:
-            object1 = "?o" + str(num) + "."
+            object1 = "?o" + str(num) + " . "
             if len(pred[0]) != 2:
-                pred1 = "<" + str(pred[0]) + ">"
+                pred1 = "<" + str(pred[0]) + "> "
                 string1 = string1 + subj1 + pred1 + object1
                 if first_predicate:
                     string2 = (
@@ -80,11 +80,11 @@ class Triples_for_pred(ABC):
                     string2 = string2 + """UNION{""" + subj1 + pred1 + object1 + """}"""
                 num = num + 1
             elif len(pred[0]) == 2:
-                pred1 = "<" + str(pred[0][0]) + ">"
-                pred2 = "<" + str(pred[0][1]) + ">"
-                object1 = "?o" + str(num) + "."
-                object11 = "?o" + str(num)
-                object2 = "?o" + str(num) + "1."
+                pred1 = "<" + str(pred[0][0]) + "> "
+                pred2 = "<" + str(pred[0][1]) + "> "
+                object1 = "?o" + str(num) + " . "
+                object11 = "?o" + str(num) + " "
+                object2 = "?o" + str(num) + "1 . "
                 string1 = string1 + subj1 + pred1 + object1 + object11 + pred2 + object2
                 if first_predicate:
                     string2 = (
@@ -130,18 +130,10 @@ class Triples_for_pred(ABC):
         :param list_of_predicates: predicates from data set in decreasing order according rank.
         :return: triples_list for all entities without duplicates.
         """
-        endpoint = "https://dbpedia.org/sparql"
         triples_list: List[Tuple] = []
         for entity in entities:
             sparql_string1 = self.generate_sparql_string(entity, list_of_predicates)
-            sparql = SPARQLWrapper(
-                endpoint,
-                agent="Mozilla/5.0 (Windows NT x.y; Win64; x64; X11; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
-            )
-            sparql.setQuery(sparql_string1)
-            sparql.method = "POST"
-            sparql.setReturnFormat(RDFXML)
-            graph_first_query = sparql.query().convert()
+            graph_first_query = get_backend().construct(sparql_string1)
             triples_list = self.add_new_triples_without_duplicates_to_triples_list(
                 triples_list, graph_first_query
             )
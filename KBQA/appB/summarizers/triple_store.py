@@ -0,0 +1,430 @@
+"""Indexed on-disk triple store for offline summarization.
+
+The triples are kept in an sqlite database. Every term is stored once and
+referenced by an integer id. The triples table is clustered by subject,
+predicate and object (SPO) and has the additional indexes POS and OSP, so
+every triple pattern is answered with an index range scan. The store is an
+rdflib Store, hence SPARQL-queries can be evaluated on it by rdflib.
+
+Run this module to load an N-Triples dump (optionally compressed with bz2
+or gzip) into a store:
+
+    python -m KBQA.appB.summarizers.triple_store <dump.nt> <store.sqlite>
+"""
+import argparse
+import bz2
+from functools import lru_cache
+import gzip
+import sqlite3
+import threading
+from typing import Any
+from typing import cast
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from rdflib import BNode
+from rdflib import Literal
+from rdflib import URIRef
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.store import Store
+from rdflib.store import VALID_STORE
+from rdflib.term import Node
+
+Triple = Tuple[Node, Node, Node]
+TriplePattern = Tuple[Optional[Node], Optional[Node], Optional[Node]]
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS triples ("
+    "s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL, "
+    "PRIMARY KEY (s, p, o)) WITHOUT ROWID",
+)
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS pos ON triples (p, o, s)",
+    "CREATE INDEX IF NOT EXISTS osp ON triples (o, s, p)",
+)
+
+
+def encode_term(term: Node) -> str:
+    """Encode an rdflib term as key of the terms table.
+
+    IRIs start with "<", blank nodes with "_" and literals with '"' followed
+    by the language tag, a space, the datatype and a space before the
+    lexical form. In contrast to N3 notation, the encoding does not escape
+    anything and accepts invalid IRIs, which are common in DBpedia.
+
+    Parameters
+    ----------
+    term : Node
+        URIRef, BNode or Literal.
+
+    Returns
+    -------
+    str
+        Encoded term.
+
+    Raises
+    ------
+    ValueError
+        If the term is of another type.
+    """
+    if isinstance(term, URIRef):
+        return "<" + str(term)
+
+    if isinstance(term, BNode):
+        return "_" + str(term)
+
+    if isinstance(term, Literal):
+        return f'"{term.language or ""} {term.datatype or ""} {term}'
+
+    raise ValueError(f"Unsupported term: {term!r}")
+
+
+@lru_cache(maxsize=100000)
+def decode_term(key: str) -> Node:
+    """Decode a key of the terms table into an rdflib term.
+
+    Parameters
+    ----------
+    key : str
+        Term encoded by encode_term.
+
+    Returns
+    -------
+    Node
+        Corresponding URIRef, BNode or Literal.
+    """
+    if key[0] == "<":
+        return URIRef(key[1:])
+
+    if key[0] == "_":
+        return BNode(key[1:])
+
+    language, datatype, value = key[1:].split(" ", 2)
+
+    return Literal(value, lang=language or None, datatype=datatype or None)
+
+
+class _LoadSink:
+    # receives the parsed triples of W3CNTriplesParser
+
+    def __init__(self, store: "TripleStore") -> None:
+        self.store = store
+        self.count = 0
+
+    def triple(self, subj: Node, pred: Node, obj: Node) -> None:
+        """Add a parsed triple to the store."""
+        self.store.add((subj, pred, obj), None)
+        self.count += 1
+
+
+# query and update are left to rdflib, which evaluates them on the triples
+class TripleStore(Store):  # pylint: disable=abstract-method
+    """rdflib Store in an indexed sqlite database.
+
+    Parameters
+    ----------
+    configuration : str, optional
+        Path of the sqlite database. The database is created, if it does not
+        exist (default: None, open the store later).
+    identifier : Node, optional
+        Identifier of the store (default: None).
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    # number of buffered triples, which are inserted together
+    BATCH_SIZE = 10000
+    # maximal number of term ids kept in memory while adding triples
+    MAX_CACHED_IDS = 1000000
+
+    def __init__(
+        self, configuration: Optional[str] = None, identifier: Optional[Node] = None
+    ) -> None:
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._ids: Dict[str, int] = dict()
+        self._pending: List[Tuple[int, int, int]] = list()
+
+        super().__init__(configuration, identifier)
+
+    def open(self, configuration: str, create: bool = True) -> int:
+        """Open the database of the store.
+
+        Parameters
+        ----------
+        configuration : str
+            Path of the sqlite database.
+        create : bool, optional
+            Create the tables, if they do not exist (default: True).
+
+        Returns
+        -------
+        int
+            VALID_STORE.
+        """
+        connection = sqlite3.connect(configuration, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+
+        if create:
+            for statement in _SCHEMA + _INDEXES:
+                connection.execute(statement)
+
+            connection.commit()
+
+        self._connection = connection
+
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        """Write the buffered triples and close the database."""
+        with self._lock:
+            if self._connection is None:
+                return
+
+            self.commit()
+            self._connection.close()
+            self._connection = None
+
+    def commit(self) -> None:
+        """Write the buffered triples."""
+        with self._lock:
+            connection = self._open_connection()
+
+            if len(self._pending) > 0:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO triples VALUES (?, ?, ?)", self._pending
+                )
+                self._pending = list()
+
+            connection.commit()
+
+    def add(self, triple: Triple, context: Any = None, quoted: bool = False) -> None:
+        """Add a triple. The triple is written with the next batch or commit."""
+        with self._lock:
+            subj, pred, obj = triple
+            self._pending.append(
+                (self._term_id(subj), self._term_id(pred), self._term_id(obj))
+            )
+
+            if len(self._pending) >= self.BATCH_SIZE:
+                self.commit()
+
+    def remove(self, triple: TriplePattern, context: Any = None) -> None:
+        """Remove all triples matching a pattern."""
+        with self._lock:
+            self.commit()
+
+            clauses, values = self._where(triple)
+
+            if clauses is not None:
+                connection = self._open_connection()
+                connection.execute(f"DELETE FROM triples AS t WHERE {clauses}", values)
+                connection.commit()
+
+    def triples(
+        self, triple_pattern: TriplePattern, context: Any = None
+    ) -> Iterator[Tuple[Triple, Iterator[Any]]]:
+        """Iterate over the triples matching a pattern.
+
+        Parameters
+        ----------
+        triple_pattern : tuple
+            Pattern (subj, pred, obj), in which None matches every term.
+        context : Graph, optional
+            Ignored, since the store has no named graphs.
+
+        Yields
+        ------
+        tuple
+            Matching triple and an empty iterator of its contexts.
+        """
+        for triple in self.match(*triple_pattern):
+            yield triple, iter(())
+
+    def match(
+        self,
+        subj: Optional[Node] = None,
+        pred: Optional[Node] = None,
+        obj: Optional[Node] = None,
+        limit: int = -1,
+    ) -> List[Triple]:
+        """Get the triples matching a pattern.
+
+        Parameters
+        ----------
+        subj : Node, optional
+            Subject of the triples (default: every subject).
+        pred : Node, optional
+            Predicate of the triples (default: every predicate).
+        obj : Node, optional
+            Object of the triples (default: every object).
+        limit : int, optional
+            Limit the number of triples (use -1 to not use any limit).
+
+        Returns
+        -------
+        list
+            Matching triples in index order.
+        """
+        with self._lock:
+            self.commit()
+
+            clauses, values = self._where((subj, pred, obj))
+
+            if clauses is None:
+                return list()
+
+            rows = (
+                self._open_connection()
+                .execute(
+                    "SELECT s.term, p.term, o.term FROM triples AS t "
+                    "JOIN terms AS s ON s.id = t.s "
+                    "JOIN terms AS p ON p.id = t.p "
+                    "JOIN terms AS o ON o.id = t.o "
+                    f"WHERE {clauses} LIMIT ?",
+                    values + [limit],
+                )
+                .fetchall()
+            )
+
+        return [
+            (decode_term(subj_key), decode_term(pred_key), decode_term(obj_key))
+            for subj_key, pred_key, obj_key in rows
+        ]
+
+    def __len__(self, context: Any = None) -> int:
+        """Count the triples of the store."""
+        with self._lock:
+            self.commit()
+
+            row = self._open_connection().execute("SELECT COUNT(*) FROM triples")
+
+            return row.fetchone()[0]
+
+    def load(self, path: str) -> int:
+        """Load an N-Triples file into the store.
+
+        Files ending with .bz2 or .gz are decompressed while they are read.
+
+        Parameters
+        ----------
+        path : str
+            Path of the N-Triples file.
+
+        Returns
+        -------
+        int
+            Number of parsed triples.
+        """
+        sink = _LoadSink(self)
+
+        with self._lock:
+            connection = self._open_connection()
+            connection.execute("PRAGMA synchronous=OFF")
+
+            with _open_text(path) as file:
+                W3CNTriplesParser(sink).parse(file)
+
+            self.commit()
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.execute("ANALYZE")
+
+        return sink.count
+
+    def _open_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise ValueError("The triple store is not open.")
+
+        return self._connection
+
+    def _term_id(self, term: Node) -> int:
+        key = encode_term(term)
+        term_id = self._ids.get(key)
+
+        if term_id is not None:
+            return term_id
+
+        connection = self._open_connection()
+        row = connection.execute(
+            "SELECT id FROM terms WHERE term = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            term_id = cast(
+                int,
+                connection.execute(
+                    "INSERT INTO terms (term) VALUES (?)", (key,)
+                ).lastrowid,
+            )
+        else:
+            term_id = row[0]
+
+        if len(self._ids) >= self.MAX_CACHED_IDS:
+            self._ids.clear()
+
+        self._ids[key] = term_id
+
+        return term_id
+
+    def _where(self, pattern: TriplePattern) -> Tuple[Optional[str], List[Any]]:
+        # the clauses are None, if a term of the pattern is not in the store
+        clauses = ["1"]
+        values: List[Any] = list()
+
+        for column, term in zip(("s", "p", "o"), pattern):
+            if term is None:
+                continue
+
+            row = (
+                self._open_connection()
+                .execute("SELECT id FROM terms WHERE term = ?", (encode_term(term),))
+                .fetchone()
+            )
+
+            if row is None:
+                return None, values
+
+            clauses.append(f"t.{column} = ?")
+            values.append(row[0])
+
+        return " AND ".join(clauses), values
+
+
+def _open_text(path: str) -> TextIO:
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+
+    return open(path, encoding="utf-8")
+
+
+def main() -> None:
+    """Load N-Triples files into a store."""
+    parser = argparse.ArgumentParser(
+        description="Load N-Triples files into an indexed triple store."
+    )
+    parser.add_argument("files", nargs="+", help="N-Triples files (.nt, .bz2, .gz)")
+    parser.add_argument("store", help="path of the sqlite database of the store")
+    args = parser.parse_args()
+
+    store = TripleStore(args.store)
+
+    for path in args.files:
+        print(f"Loaded {store.load(path)} triples from {path}.")
+
+    print(f"The store contains {len(store)} triples.")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
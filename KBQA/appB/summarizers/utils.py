@@ -8,10 +8,12 @@ from typing import Tuple
 from typing import Union
 
 from rdflib import URIRef
-import requests
 from SPARQLWrapper import JSON
 from SPARQLWrapper import SPARQLWrapper
 
+from . import endpoints
+from .graph_backend import get_backend
+
 
 def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
     """Query the endpoint of DBspotlight for entity recognition.
@@ -32,7 +34,7 @@ def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
     endpoint = "https://api.dbpedia-spotlight.org/en/annotate/"
 
     try:
-        response = requests.post(
+        response = endpoints.post(
             endpoint,
             headers={"Accept": "application/json"},
             data={"text": question, "confidence": confidence},
@@ -62,7 +64,7 @@ def query_falcon(question: str) -> Dict[str, Any]:
     endpoint = "https://labs.tib.eu/falcon/falcon2/api?mode=long&db=1"
 
     try:
-        response = requests.post(
+        response = endpoints.post(
             endpoint,
             headers={"Content-Type": "application/json"},
             data=json.dumps({"text": question}),
@@ -164,7 +166,7 @@ def query_tagme(question: str) -> Dict[str, Any]:
         "include_categories": "false",
     }
 
-    response = requests.post(endpoint, data=data)
+    response = endpoints.post(endpoint, data=data)
 
     return response.json()
 
@@ -341,7 +343,8 @@ def query_dbpedia(query: str, ret_format: str = JSON) -> Dict[str, Any]:
     query : str
         SPARQL-query.
     ret_format : str
-        Return format from the SPARQL Wrapper.
+        Return format from the SPARQL Wrapper. JSON results are requested
+        from the graph backend (see graph_backend.set_backend).
 
     Returns
     -------
@@ -350,6 +353,9 @@ def query_dbpedia(query: str, ret_format: str = JSON) -> Dict[str, Any]:
     """
     endpoint = "https://dbpedia.org/sparql/"
 
+    if ret_format == JSON:
+        return get_backend().select(query)
+
     sparql = SPARQLWrapper(endpoint)
     sparql.setMethod("POST")
     sparql.setQuery(query)
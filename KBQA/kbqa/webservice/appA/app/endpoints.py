@@ -0,0 +1,496 @@
+"""Shared HTTP client for DBpedia and the entity linkers.
+
+All requests go through one requests.Session, which keeps the connections
+alive in a pool per host, retries failed requests with an exponential backoff
+and applies a default timeout.
+
+CONSTRUCT-queries are answered in N-Triples, which are parsed line by line
+while the response is streamed instead of using the RDF/XML parser of rdflib.
+
+The results of SPARQL-queries can be kept in a SparqlCache, which is enabled
+with configure_cache.
+
+The module is copied into the summarizers and the services of approach A and
+B. The copies are kept identical, which is checked by the tests.
+"""
+import json
+import re
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from rdflib import BNode
+from rdflib import Graph
+from rdflib import Literal
+from rdflib import URIRef
+from rdflib.parser import Parser
+from rdflib.plugin import get as get_plugin
+from rdflib.plugin import PluginException
+from rdflib.term import Node
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .sparql_cache import cache_key
+from .sparql_cache import SparqlCache
+
+DBPEDIA_ENDPOINT = "https://dbpedia.org/sparql/"
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+NTRIPLES_TYPES = ("application/n-triples", "text/plain")
+NTRIPLES_ACCEPT = "application/n-triples, text/plain;q=0.9"
+JSON_ACCEPT = "application/sparql-results+json"
+
+_IRI = r"<[^>]*>"
+_BNODE = r"_:\S+"
+_LITERAL = r'"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?'
+_NTRIPLE_LINE = re.compile(
+    rf"\s*({_IRI}|{_BNODE})\s*({_IRI})\s*({_IRI}|{_BNODE}|{_LITERAL})\s*\.\s*"
+)
+_LITERAL_PARTS = re.compile(r'"(.*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?', re.DOTALL)
+_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_ESCAPED_CHARS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f"}
+
+
+def create_session(
+    max_connections: int = 16, retries: int = 3, backoff_factor: float = 0.5
+) -> requests.Session:
+    """Create a session with a connection pool and retries.
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        Maximal number of kept-alive connections per host (default: 16).
+    retries : int, optional
+        Number of retries for connection errors and the status codes in
+        RETRY_STATUS_CODES (default: 3).
+    backoff_factor : float, optional
+        Factor for the exponential backoff between retries in seconds
+        (default: 0.5).
+
+    Returns
+    -------
+    requests.Session
+        Session for all requests to the endpoints.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max_connections,
+        pool_maxsize=max_connections,
+        max_retries=retry,
+    )
+
+    new_session = requests.Session()
+    new_session.mount("http://", adapter)
+    new_session.mount("https://", adapter)
+
+    return new_session
+
+
+class SharedClient:
+    """Session, default timeout and cache shared by all requests.
+
+    The state is kept in one mutable object, so configure and configure_cache
+    do not need global statements.
+    """
+
+    def __init__(self) -> None:
+        self.session = create_session()
+        self.default_timeout = 30.0
+        self.cache: Optional[SparqlCache] = None
+
+
+client = SharedClient()
+
+
+def configure(
+    max_connections: int = 16,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    timeout: float = 30.0,
+) -> None:
+    """Replace the shared session with a newly configured one.
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        Maximal number of kept-alive connections per host (default: 16).
+    retries : int, optional
+        Number of retries (default: 3).
+    backoff_factor : float, optional
+        Factor for the exponential backoff between retries (default: 0.5).
+    timeout : float, optional
+        Default timeout of a request in seconds (default: 30.0).
+    """
+    client.session = create_session(max_connections, retries, backoff_factor)
+    client.default_timeout = timeout
+
+
+def configure_cache(
+    enabled: bool = True,
+    max_entries: int = 1024,
+    ttl: float = 86400.0,
+    path: Optional[str] = None,
+    max_disk_entries: int = 100000,
+) -> None:
+    """Enable or disable the cache for the results of SPARQL-queries.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Cache the results if True, otherwise remove the cache (default: True).
+    max_entries : int, optional
+        Maximal number of results in memory (default: 1024).
+    ttl : float, optional
+        Time in seconds, after which a result expires (default: 86400).
+    path : str, optional
+        Path of the sqlite database for persisting the results (default: None).
+    max_disk_entries : int, optional
+        Maximal number of results on disk (default: 100000).
+    """
+    if enabled:
+        client.cache = SparqlCache(max_entries, ttl, path, max_disk_entries)
+    else:
+        client.cache = None
+
+
+def post(url: str, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+    """Send a POST request with the shared session.
+
+    Parameters
+    ----------
+    url : str
+        URL of the endpoint.
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+    **kwargs
+        Further arguments for requests.Session.post.
+
+    Returns
+    -------
+    requests.Response
+        Response of the endpoint.
+    """
+    if timeout is None:
+        timeout = client.default_timeout
+
+    return client.session.post(url, timeout=timeout, **kwargs)
+
+
+def get(url: str, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+    """Send a GET request with the shared session.
+
+    Parameters
+    ----------
+    url : str
+        URL of the endpoint.
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+    **kwargs
+        Further arguments for requests.Session.get.
+
+    Returns
+    -------
+    requests.Response
+        Response of the endpoint.
+    """
+    if timeout is None:
+        timeout = client.default_timeout
+
+    return client.session.get(url, timeout=timeout, **kwargs)
+
+
+def query_sparql(
+    query: str,
+    accept: str,
+    endpoint: str = DBPEDIA_ENDPOINT,
+    timeout: Optional[float] = None,
+) -> requests.Response:
+    """Send a SPARQL-query with a POST request.
+
+    Parameters
+    ----------
+    query : str
+        SPARQL-query.
+    accept : str
+        Requested media type of the result.
+    endpoint : str, optional
+        SPARQL endpoint (default: DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+
+    Returns
+    -------
+    requests.Response
+        Response of the endpoint.
+
+    Raises
+    ------
+    requests.HTTPError
+        If the endpoint answers with an error.
+    """
+    response = post(
+        endpoint, timeout=timeout, data={"query": query}, headers={"Accept": accept}
+    )
+    response.raise_for_status()
+
+    return response
+
+
+def fetch_sparql(
+    query: str,
+    accept: str,
+    endpoint: str = DBPEDIA_ENDPOINT,
+    timeout: Optional[float] = None,
+) -> Tuple[str, bytes]:
+    """Send a SPARQL-query or look up its result in the cache.
+
+    Only successful results are cached.
+
+    Parameters
+    ----------
+    query : str
+        SPARQL-query.
+    accept : str
+        Requested media type of the result.
+    endpoint : str, optional
+        SPARQL endpoint (default: DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+
+    Returns
+    -------
+    tuple
+        Media type and body of the result.
+    """
+    # keep a reference, since the cache can be replaced concurrently
+    current_cache = client.cache
+
+    if current_cache is not None:
+        key = cache_key(query, accept, endpoint)
+        result = current_cache.get(key)
+
+        if result is not None:
+            return result
+
+    response = query_sparql(query, accept, endpoint, timeout)
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    body = response.content
+
+    if current_cache is not None:
+        current_cache.put(key, content_type, body)
+
+    return content_type, body
+
+
+def query_sparql_json(
+    query: str, endpoint: str = DBPEDIA_ENDPOINT, timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Send a SELECT- or ASK-query and return the SPARQL-JSON result.
+
+    Parameters
+    ----------
+    query : str
+        SELECT- or ASK-SPARQL-query.
+    endpoint : str, optional
+        SPARQL endpoint (default: DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+
+    Returns
+    -------
+    dict
+        Result in the SPARQL 1.1 JSON format.
+    """
+    _, body = fetch_sparql(query, JSON_ACCEPT, endpoint, timeout)
+
+    return json.loads(body)
+
+
+def query_sparql_triples(
+    query: str, endpoint: str = DBPEDIA_ENDPOINT, timeout: Optional[float] = None
+) -> List[Tuple[Node, Node, Node]]:
+    """Send a CONSTRUCT-query and return the constructed triples.
+
+    The triples are requested as N-Triples and parsed while the response is
+    streamed. A response without a media type is parsed as N-Triples. If the
+    endpoint answers with another RDF format, rdflib is used as a fallback.
+    With an enabled cache, the whole response is read, so it can be cached.
+
+    Parameters
+    ----------
+    query : str
+        CONSTRUCT-SPARQL-query.
+    endpoint : str, optional
+        SPARQL endpoint (default: DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+
+    Returns
+    -------
+    list
+        Triples (subj, pred, obj) of rdflib terms in the order of the response.
+
+    Raises
+    ------
+    ValueError
+        If the media type of the response is no RDF format known to rdflib.
+    """
+    if client.cache is not None:
+        content_type, body = fetch_sparql(query, NTRIPLES_ACCEPT, endpoint, timeout)
+
+        # bytes.splitlines does not split at unicode separators
+        return _parse_triples(content_type, body.splitlines())
+
+    response = post(
+        endpoint,
+        timeout=timeout,
+        data={"query": query},
+        headers={"Accept": NTRIPLES_ACCEPT},
+        stream=True,
+    )
+
+    with response:
+        response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+
+        return _parse_triples(content_type, response.iter_lines())
+
+
+def query_sparql_graph(
+    query: str, endpoint: str = DBPEDIA_ENDPOINT, timeout: Optional[float] = None
+) -> Graph:
+    """Send a CONSTRUCT-query and return the resulting graph.
+
+    Parameters
+    ----------
+    query : str
+        CONSTRUCT-SPARQL-query.
+    endpoint : str, optional
+        SPARQL endpoint (default: DBPEDIA_ENDPOINT).
+    timeout : float, optional
+        Timeout of the request in seconds (default: client.default_timeout).
+
+    Returns
+    -------
+    Graph
+        Graph constructed by the query.
+    """
+    graph = Graph()
+    graph += query_sparql_triples(query, endpoint, timeout)
+
+    return graph
+
+
+def iter_ntriples(lines: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """Split N-Triples into their terms.
+
+    Empty lines, comments and lines, which are no valid triples, are skipped.
+
+    Parameters
+    ----------
+    lines : iterable
+        Lines of an N-Triples document.
+
+    Yields
+    ------
+    tuple
+        Triple (subj, pred, obj) of terms in N-Triples notation.
+    """
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+
+        match = _NTRIPLE_LINE.fullmatch(line)
+
+        if match is None:
+            print("WARNING: Skipped invalid N-Triples line:", line)
+            continue
+
+        yield match.group(1), match.group(2), match.group(3)
+
+
+def to_term(term: str) -> Node:
+    """Convert a term in N-Triples notation into an rdflib term.
+
+    Parameters
+    ----------
+    term : str
+        IRI, blank node or literal in N-Triples notation.
+
+    Returns
+    -------
+    Node
+        Corresponding URIRef, BNode or Literal.
+
+    Raises
+    ------
+    ValueError
+        If the term is not a valid N-Triples term.
+    """
+    if term.startswith("<"):
+        return URIRef(_unescape(term[1:-1]))
+
+    if term.startswith("_:"):
+        return BNode(term[2:])
+
+    match = _LITERAL_PARTS.fullmatch(term)
+
+    if match is None:
+        raise ValueError(f"Invalid N-Triples term: {term}")
+
+    value, language, datatype = match.groups()
+
+    if datatype is not None:
+        return Literal(_unescape(value), datatype=URIRef(_unescape(datatype)))
+
+    return Literal(_unescape(value), lang=language)
+
+
+def _parse_triples(
+    content_type: str, lines: Iterable[bytes]
+) -> List[Tuple[Node, Node, Node]]:
+    if content_type and content_type not in NTRIPLES_TYPES:
+        try:
+            get_plugin(content_type, Parser)
+        except PluginException as exception:
+            raise ValueError(
+                f"Unsupported media type of the CONSTRUCT result: {content_type}"
+            ) from exception
+
+        graph = Graph()
+        graph.parse(data=b"\n".join(lines), format=content_type)
+
+        return list(graph)
+
+    return [
+        (to_term(subj), to_term(pred), to_term(obj))
+        for subj, pred, obj in iter_ntriples(line.decode("utf-8") for line in lines)
+    ]
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+
+    def replace(match: "re.Match[str]") -> str:
+        code = match.group(1) or match.group(2)
+
+        if code is not None:
+            return chr(int(code, 16))
+
+        return _ESCAPED_CHARS.get(match.group(3), match.group(3))
+
+    return _ESCAPE.sub(replace, value)
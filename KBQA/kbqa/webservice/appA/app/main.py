@@ -2,13 +2,12 @@
 from typing import Any
 from typing import Dict
 
+from app import endpoints
 from app.nspm.interpreter import process_question
 from app.qald_builder import qald_builder_ask_answer
 from app.qald_builder import qald_builder_empty_answer
 from app.qald_builder import qald_builder_select_answer
-from SPARQLWrapper import JSON
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.SPARQLExceptions import SPARQLWrapperException
+from requests import RequestException
 
 
 def main(query: str, lang: str = "en") -> Dict[str, Any]:
@@ -83,12 +82,9 @@ def ask_dbpedia(question: str, sparql_query: str, lang: str) -> Dict[str, Any]:
     print("SPARQL-Query:", sparql_query.encode("utf-8"))
 
     try:
-        sparql = SPARQLWrapper("http://dbpedia.org/sparql/")
-        sparql.setReturnFormat(JSON)
-        sparql.setQuery(sparql_query)
-        answer = sparql.query().convert()
-    except SPARQLWrapperException as exception:
-        print("SPARQLWrapperException", exception)
+        answer = endpoints.query_sparql_json(sparql_query)
+    except (RequestException, ValueError) as exception:
+        print("SPARQL request failed", exception)
         qald_answer = qald_builder_empty_answer("", question, lang)
         return qald_answer
 
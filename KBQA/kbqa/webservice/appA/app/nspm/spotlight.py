@@ -1,10 +1,27 @@
 """DBpedia spotlight service for app A."""
 from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Tuple
 
+from spacy.language import Language
+from spacy.tokens import Doc
 import spacy_dbpedia_spotlight
 
 
+def init_spotlight() -> Language:
+    """Initialize the spaCy pipeline with the DBpedia spotlight annotator.
+
+    The pipeline is built once at import and shared by all requests.
+
+    Returns
+    -------
+    nlp : Language
+        spaCy pipeline, which links the entities using dbpedia spotlight.
+    """
+    return spacy_dbpedia_spotlight.create("en")
+
+
 def find_entity(sentence: str) -> Dict[str, Tuple[str, str]]:
     """Find the entities in the sentence.
 
@@ -20,8 +37,47 @@ def find_entity(sentence: str) -> Dict[str, Tuple[str, str]]:
     entities : dict
         Dictionary with the placeholders as keys and the entities as values.
     """
-    nlp = spacy_dbpedia_spotlight.create("en")
-    doc = nlp(sentence)
+    return _collect_entities(nlp(sentence))
+
+
+def find_entities(
+    sentences: Iterable[str], batch_size: int = 32
+) -> List[Dict[str, Tuple[str, str]]]:
+    """Find the entities in several sentences.
+
+    Stream the sentences through the shared pipeline with nlp.pipe, e.g.
+    for the generation of datasets.
+
+    Parameters
+    ----------
+    sentences : iterable
+        Natural language questions.
+    batch_size : int, optional
+        Number of sentences, which are processed together (default is 32).
+
+    Returns
+    -------
+    entities : list
+        Dictionary with the placeholders as keys and the entities as values
+        for each sentence.
+    """
+    docs = nlp.pipe(sentences, batch_size=batch_size)
+    return [_collect_entities(doc) for doc in docs]
+
+
+def _collect_entities(doc: Doc) -> Dict[str, Tuple[str, str]]:
+    """Assign placeholders to the linked entities of a document.
+
+    Parameters
+    ----------
+    doc : Doc
+        Document annotated by the dbpedia spotlight pipeline.
+
+    Returns
+    -------
+    entities : dict
+        Dictionary with the placeholders as keys and the entities as values.
+    """
     placeholder = 65
     entities = dict()
     for ent in doc.ents:
@@ -96,3 +152,6 @@ def restore_entity(sparql: str, entities: Dict[str, Tuple[str, str]]) -> str:
         if placeholder in sparql in sparql:
             sparql = sparql.replace(placeholder, " <" + uri + "> ")
     return sparql
+
+
+nlp = init_spotlight()
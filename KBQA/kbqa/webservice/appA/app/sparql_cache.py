@@ -0,0 +1,311 @@
+"""Cache for the results of SPARQL-queries.
+
+The raw results are kept in an in-memory LRU tier and optionally in a
+persistent sqlite tier, which is shared by all processes using the same
+file and survives restarts. Entries are identified by the endpoint, the
+requested media type and the query text with normalized whitespace.
+"""
+from collections import OrderedDict
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+_STRING_LITERAL = re.compile(r"(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Collapse the whitespace of a SPARQL-query outside of string literals.
+
+    Parameters
+    ----------
+    query : str
+        SPARQL-query.
+
+    Returns
+    -------
+    str
+        Query, in which every whitespace sequence outside of string literals
+        is replaced by a single space.
+    """
+    parts = _STRING_LITERAL.split(query)
+
+    # the string literals are at the odd positions
+    for i in range(0, len(parts), 2):
+        parts[i] = _WHITESPACE.sub(" ", parts[i])
+
+    return "".join(parts).strip()
+
+
+def cache_key(query: str, accept: str, endpoint: str) -> str:
+    """Create the key of a query result.
+
+    Parameters
+    ----------
+    query : str
+        SPARQL-query.
+    accept : str
+        Requested media type of the result.
+    endpoint : str
+        SPARQL endpoint.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the result.
+    """
+    text = "\n".join((endpoint, accept, normalize_query(query)))
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SparqlCache:
+    """Two tiered cache for raw SPARQL results.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximal number of results in memory (default: 1024).
+    ttl : float, optional
+        Time in seconds, after which a result expires. Results never expire,
+        if the value is not greater than 0 (default: 86400).
+    path : str, optional
+        Path of the sqlite database of the disk tier. Only the memory tier is
+        used, if no path is given (default: None).
+    max_disk_entries : int, optional
+        Maximal number of results on disk (default: 100000).
+    """
+
+    # number of writes between two prunings of the disk tier
+    PRUNE_INTERVAL = 256
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400.0,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100000,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, Tuple[float, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[_DiskTier] = None
+
+        if path is not None:
+            self._disk = _DiskTier(path, max_disk_entries)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """Look up a result.
+
+        Parameters
+        ----------
+        key : str
+            Key of the result (see cache_key).
+
+        Returns
+        -------
+        tuple or None
+            Content type and body of the result or None, if the result is not
+            cached or expired.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+
+                return entry[1], entry[2]
+
+            if entry is not None:
+                del self._memory[key]
+
+            if self._disk is not None:
+                entry = self._disk.get(key)
+
+                if entry is not None and not self._expired(entry[0]):
+                    self._remember(key, entry)
+                    self.disk_hits += 1
+
+                    return entry[1], entry[2]
+
+            self.misses += 1
+
+            return None
+
+    def put(self, key: str, content_type: str, body: bytes) -> None:
+        """Store a result.
+
+        Parameters
+        ----------
+        key : str
+            Key of the result (see cache_key).
+        content_type : str
+            Media type of the result.
+        body : bytes
+            Raw result.
+        """
+        entry = (time.time(), content_type, body)
+
+        with self._lock:
+            self._remember(key, entry)
+
+            if self._disk is not None:
+                self._disk.put(key, entry, self.PRUNE_INTERVAL, self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the counters of the cache.
+
+        Returns
+        -------
+        dict
+            Number of hits in memory, hits on disk, misses and results in
+            memory.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+            }
+
+    def clear(self) -> None:
+        """Remove all results from both tiers."""
+        with self._lock:
+            self._memory.clear()
+
+            if self._disk is not None:
+                self._disk.clear()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def _remember(self, key: str, entry: Tuple[float, str, bytes]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+class _DiskTier:
+    """Persistent sqlite tier of the SparqlCache.
+
+    The tier is not locked itself, it is only used under the lock of the
+    cache.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database.
+    max_entries : int
+        Maximal number of results on disk.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.writes = 0
+
+        self.connection = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, created REAL, content_type TEXT, body BLOB)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, str, bytes]]:
+        """Look up a result.
+
+        Parameters
+        ----------
+        key : str
+            Key of the result (see cache_key).
+
+        Returns
+        -------
+        tuple or None
+            Creation time, content type and body of the result or None, if the
+            result is not stored.
+        """
+        row = self.connection.execute(
+            "SELECT created, content_type, body FROM results WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return row[0], row[1], bytes(row[2])
+
+    def put(
+        self,
+        key: str,
+        entry: Tuple[float, str, bytes],
+        prune_interval: int,
+        ttl: float,
+    ) -> None:
+        """Store a result and prune the tier after every prune_interval writes.
+
+        Parameters
+        ----------
+        key : str
+            Key of the result (see cache_key).
+        entry : tuple
+            Creation time, content type and body of the result.
+        prune_interval : int
+            Number of writes between two prunings.
+        ttl : float
+            Time in seconds, after which a result expires.
+        """
+        created, content_type, body = entry
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (key, created, content_type, sqlite3.Binary(body)),
+        )
+        self.writes += 1
+
+        if self.writes % prune_interval == 0:
+            self.prune(ttl)
+
+        self.connection.commit()
+
+    def clear(self) -> None:
+        """Remove all results."""
+        self.connection.execute("DELETE FROM results")
+        self.connection.commit()
+
+    def prune(self, ttl: float) -> None:
+        """Remove the expired results and the oldest results above the limit.
+
+        Parameters
+        ----------
+        ttl : float
+            Time in seconds, after which a result expires. Results never
+            expire, if the value is not greater than 0.
+        """
+        if ttl > 0:
+            self.connection.execute(
+                "DELETE FROM results WHERE created < ?", (time.time() - ttl,)
+            )
+
+        # drop the oldest results above the limit
+        self.connection.execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
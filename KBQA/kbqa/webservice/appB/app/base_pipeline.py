@@ -6,6 +6,7 @@ class and implement the pipeline for predicting a sparql query.
 from abc import ABC
 from abc import abstractmethod
 from types import SimpleNamespace
+from typing import List
 
 
 class BasePipeline(ABC):
@@ -24,18 +25,48 @@ class BasePipeline(ABC):
         self.arguments = arguments
 
     @abstractmethod
-    def predict_sparql_query(self, question: str) -> str:
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Predict a SPARQL query using the pipeline for the architecture.
 
         Override this function to implement the pipeline for the architecture.
+        The question and the triples are passed in memory through the
+        preprocessing, the model and the postprocessing.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question in the format "<s> <p> <o>".
 
         Returns
         -------
         str
             Predicted SPARQL query.
         """
+
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions.
+
+        Override this function, if the architecture can run several
+        questions through the model at once. By default the questions
+        are predicted one after another.
+
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        return [
+            self.predict_sparql_query(question, question_triples)
+            for question, question_triples in zip(questions, triples)
+        ]
@@ -0,0 +1,162 @@
+"""Micro-batching of concurrent SPARQL query predictions.
+
+The BatchScheduler wraps a pipeline and collects the questions of
+concurrent requests for a short time window. The collected questions
+are run through the model as one batch and the predicted queries are
+handed back to the waiting requests.
+"""
+import queue
+import threading
+import time
+from typing import List
+from typing import Optional
+
+from app.base_pipeline import BasePipeline
+
+
+class _PendingPrediction:
+    """A question waiting for its predicted SPARQL query."""
+
+    def __init__(self, question: str, triples: List[str]) -> None:
+        self.question = question
+        self.triples = triples
+        self.query: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+
+class BatchScheduler(BasePipeline):
+    """Pipeline wrapper, which batches the predictions of concurrent requests."""
+
+    def __init__(
+        self, pipeline: BasePipeline, max_batch_size: int = 8, max_wait_ms: float = 10.0
+    ) -> None:
+        """Start the scheduler for the given pipeline.
+
+        Parameters
+        ----------
+        pipeline : BasePipeline
+            Pipeline, which predicts the batches.
+        max_batch_size : int, optional
+            Maximal number of questions in one batch (default is 8).
+        max_wait_ms : float, optional
+            Maximal time in milliseconds the first question of a batch waits
+            for further questions (default is 10.0).
+        """
+        super().__init__(pipeline.arguments)
+
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: "queue.Queue[_PendingPrediction]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="appB-batch-scheduler", daemon=True
+        )
+        self._worker.start()
+
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
+        """Predict a SPARQL query together with the questions of other requests.
+
+        Blocks until the batch containing the question has been predicted.
+
+        Parameters
+        ----------
+        question : str
+            Natural language question.
+        triples : list
+            Summarized triples for the question.
+
+        Returns
+        -------
+        str
+            Predicted SPARQL query.
+        """
+        pending = _PendingPrediction(question, triples)
+
+        self._queue.put(pending)
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+
+        return str(pending.query)
+
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions directly.
+
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        return self.pipeline.predict_sparql_queries(questions, triples)
+
+    def _run(self) -> None:
+        """Collect the pending questions into batches and predict them."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    break
+
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._predict_batch(batch)
+
+    def _predict_batch(self, batch: List[_PendingPrediction]) -> None:
+        """Predict a batch and hand the results back to the waiting requests.
+
+        Parameters
+        ----------
+        batch : list
+            Pending predictions of the batch.
+        """
+        try:
+            queries = self.pipeline.predict_sparql_queries(
+                [pending.question for pending in batch],
+                [pending.triples for pending in batch],
+            )
+        except Exception:  # pylint: disable=broad-except
+            # predict the questions one by one, so that only the failing
+            # questions fail their requests
+            for pending in batch:
+                self._predict_one(pending)
+            return
+
+        for pending, query in zip(batch, queries):
+            pending.query = query
+            pending.done.set()
+
+    def _predict_one(self, pending: _PendingPrediction) -> None:
+        """Predict a single question and hand the result back to its request.
+
+        Parameters
+        ----------
+        pending : _PendingPrediction
+            Pending prediction of the question.
+        """
+        try:
+            pending.query = self.pipeline.predict_sparql_query(
+                pending.question, pending.triples
+            )
+        except Exception as exception:  # pylint: disable=broad-except
+            pending.error = exception
+
+        pending.done.set()
@@ -1,12 +1,12 @@
 """Wrapper class for the BERT_SPBERT pipeline."""
 from types import SimpleNamespace
+from typing import List
 
 from app.base_pipeline import BasePipeline
 from app.bert_spbert.spbert.run import init
-from app.bert_spbert.spbert.run import run
+from app.bert_spbert.spbert.run import predict_queries
 from app.postprocessing import postprocess_prediction
-from app.preprocessing import preprocessing_qtq
-from app.preprocessing import seperate_qtq
+from app.preprocessing import preprocess_qtq
 
 
 class BertSPBertPipeline(BasePipeline):
@@ -25,25 +25,49 @@ class BertSPBertPipeline(BasePipeline):
 
         init(self.arguments)
 
-    def predict_sparql_query(self, question: str) -> str:
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Predict a SPARQL query for a given question using BERT_SPBERT.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question. They are not used by
+            this architecture.
 
         Returns
         -------
         str
             Predicted SPARQL query for the question from BERT_SPBERT.
         """
-        seperate_qtq()
-        preprocessing_qtq()
+        return self.predict_sparql_queries([question], [triples])[0]
 
-        run(self.arguments)
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions using BERT_SPBERT.
 
-        query_pairs = postprocess_prediction()
-        query = query_pairs["0"]
+        The questions are run through the model together in batches of
+        `eval_batch_size`.
 
-        return query
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        sources = [
+            preprocess_qtq(question, question_triples)[0]
+            for question, question_triples in zip(questions, triples)
+        ]
+
+        predictions = predict_queries(self.arguments, sources)
+
+        return [postprocess_prediction(prediction) for prediction in predictions]
@@ -29,6 +29,7 @@ import re
 from pathlib import Path
 
 from app.bert_spbert.spbert.model import BertSeq2Seq
+from app.postprocessing import format_prediction    # modified
 from nltk.translate.bleu_score import corpus_bleu
 import numpy as np
 import torch
@@ -894,5 +895,43 @@ def run(args):
             logger.info("  " + "*" * 20)
 
 
+def predict_queries(args, sources):
+    """Predict the encoded queries for in-memory questions."""
+    eval_examples = [
+        Example(idx=idx, source=source.strip(), target="")
+        for idx, source in enumerate(sources)
+    ]
+    eval_features = convert_examples_to_features(
+        eval_examples, tokenizer, args, stage="predict"
+    )
+    all_source_ids = torch.tensor(
+        [f.source_ids for f in eval_features], dtype=torch.long
+    )
+    all_source_mask = torch.tensor(
+        [f.source_mask for f in eval_features], dtype=torch.long
+    )
+
+    model.eval()
+    p = []
+    for start in range(0, len(eval_features), args.eval_batch_size):
+        end = start + args.eval_batch_size
+        source_ids = all_source_ids[start:end].to(device)
+        source_mask = all_source_mask[start:end].to(device)
+        with torch.no_grad():
+            preds = model(
+                source_ids=source_ids,
+                source_mask=source_mask,
+            )
+            for pred in preds:
+                t = pred[0].cpu().numpy()
+                t = list(t)
+                if 0 in t:
+                    t = t[: t.index(0)]
+                text = tokenizer.decode(t, clean_up_tokenization_spaces=False)
+                p.append(format_prediction(text))
+    model.train()
+    return p
+
+
 if __name__ == "__main__":
     main()
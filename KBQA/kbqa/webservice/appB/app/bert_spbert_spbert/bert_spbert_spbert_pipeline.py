@@ -1,12 +1,12 @@
 """Wrapper class for the BERT_SPBERT_SPBERT pipeline."""
 from types import SimpleNamespace
+from typing import List
 
 from app.base_pipeline import BasePipeline
 from app.bert_spbert_spbert.spbert.run import init
-from app.bert_spbert_spbert.spbert.run import run
+from app.bert_spbert_spbert.spbert.run import predict_queries
 from app.postprocessing import postprocess_prediction
-from app.preprocessing import preprocessing_qtq
-from app.preprocessing import seperate_qtq
+from app.preprocessing import preprocess_qtq
 
 
 class BertSPBertSPBertPipeline(BasePipeline):
@@ -25,25 +25,50 @@ class BertSPBertSPBertPipeline(BasePipeline):
 
         init(self.arguments)
 
-    def predict_sparql_query(self, question: str) -> str:
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Predict a SPARQL query for a given question using BERT_SPBERT_SPBERT.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question.
 
         Returns
         -------
         str
             Predicted SPARQL query for the question from BERT_SPBERT_SPBERT.
         """
-        seperate_qtq()
-        preprocessing_qtq()
+        return self.predict_sparql_queries([question], [triples])[0]
 
-        run(self.arguments)
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions using BERT_SPBERT_SPBERT.
 
-        query_pairs = postprocess_prediction()
-        query = query_pairs["0"]
+        The questions are run through the model together in batches of
+        `eval_batch_size`.
 
-        return query
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        sources = list()
+        triples_strs = list()
+        for question, question_triples in zip(questions, triples):
+            source, triples_str = preprocess_qtq(question, question_triples)
+            sources.append(source)
+            triples_strs.append(triples_str)
+
+        predictions = predict_queries(self.arguments, sources, triples_strs)
+
+        return [postprocess_prediction(prediction) for prediction in predictions]
@@ -36,6 +36,8 @@ class BertSeq2Seq(nn.Module):
     * `max_length`- max length of target for beam search.
     * `sos_id`- start of symbol ids in target for beam search.
     * `eos_id`- end of symbol ids in target for beam search.
+    * `use_cache`- cache the decoder key/values during beam search and only
+      feed the newest token at each step.
     """
 
     def __init__(
@@ -48,7 +50,8 @@ class BertSeq2Seq(nn.Module):
         max_length=None,
         sos_id=None,
         eos_id=None,
-        device=None
+        device=None,
+        use_cache=True
     ):
         super(BertSeq2Seq, self).__init__()
         self.encoder = encoder
@@ -66,6 +69,7 @@ class BertSeq2Seq(nn.Module):
         self.max_length = max_length
         self.sos_id = sos_id
         self.eos_id = eos_id
+        self.use_cache = use_cache
 
     def _tie_or_clone_weights(self, first_module, second_module):
         """Tie or clone module weights depending of weither we are using TorchScript or not"""
@@ -123,48 +127,82 @@ class BertSeq2Seq(nn.Module):
             return outputs
         else:
             # Predict
-            preds = []
-            zero = torch.full(size=(1,), fill_value=0, dtype=torch.long, device=self.device)
-            for i in range(encoder_output.shape[0]):
-                context = encoder_output[i: i + 1, :]
-                context_mask = encoder_attention_mask[i: i + 1, :]
-                beam = Beam(
-                    self.beam_size, self.sos_id, self.eos_id, device=self.device
+            beam = BatchBeam(
+                encoder_output.shape[0],
+                self.beam_size,
+                self.sos_id,
+                self.eos_id,
+                device=encoder_output.device,
+            )
+            input_ids = beam.getCurrentState()
+            context = encoder_output.repeat_interleave(self.beam_size, dim=0)
+            context_mask = encoder_attention_mask.repeat_interleave(
+                self.beam_size, dim=0
+            )
+            past_key_values = None
+            for _ in range(self.max_length):
+                attn_mask = input_ids > 0
+                if past_key_values is None:
+                    decoder_input_ids = input_ids
+                else:
+                    decoder_input_ids = input_ids[:, -1:]
+                out = self.decoder(
+                    input_ids=decoder_input_ids,
+                    attention_mask=attn_mask,
+                    encoder_hidden_states=context,
+                    encoder_attention_mask=context_mask,
+                    past_key_values=past_key_values,
+                    use_cache=self.use_cache,
+                    return_dict=True,
                 )
-                input_ids = beam.getCurrentState()
-                context = context.repeat(self.beam_size, 1, 1)
-                context_mask = context_mask.repeat(self.beam_size, 1)
-                for _ in range(self.max_length):
-                    if beam.done():
-                        break
-
-                    attn_mask = input_ids > 0
-                    out = self.decoder(
-                        input_ids=input_ids,
-                        attention_mask=attn_mask,
-                        encoder_hidden_states=context,
-                        encoder_attention_mask=context_mask,
-                    )
-                    hidden_states = torch.tanh(self.dense(out[0]))[:, -1, :]
-                    out = self.lsm(self.lm_head(hidden_states)).data
-                    beam.advance(out)
-                    input_ids.data.copy_(
-                        input_ids.data.index_select(0, beam.getCurrentOrigin())
+                hidden_states = torch.tanh(self.dense(out[0]))[:, -1, :]
+                log_probs = self.lsm(self.lm_head(hidden_states)).data
+                origin = beam.advance(log_probs)
+                input_ids = torch.cat(
+                    (input_ids.index_select(0, origin), beam.getCurrentState()), -1
+                )
+                if self.use_cache:
+                    past_key_values = self._reorder_cache(
+                        out.past_key_values, origin
                     )
-                    input_ids = torch.cat((input_ids, beam.getCurrentState()), -1)
-                hyp = beam.getHyp(beam.getFinal())
-                pred = beam.buildTargetTokens(hyp)[: self.beam_size]
-                pred = [
-                    torch.cat(
-                        [x.view(-1) for x in p] + [zero] * (self.max_length - len(p))
-                    ).view(1, -1)
-                    for p in pred
-                ]
-                preds.append(torch.cat(pred, 0).unsqueeze(0))
 
-            preds = torch.cat(preds, 0)
+                # Drop the questions whose beams are done from the batch.
+                keep = beam.prune()
+                if beam.done():
+                    break
+                if keep is not None:
+                    input_ids = input_ids.index_select(0, keep)
+                    context = context.index_select(0, keep)
+                    context_mask = context_mask.index_select(0, keep)
+                    if past_key_values is not None:
+                        past_key_values = self._reorder_cache(
+                            past_key_values, keep, cross_attention=True
+                        )
+
+            preds = beam.getPreds(self.max_length)
             return preds
 
+    @staticmethod
+    def _reorder_cache(past_key_values, beam_idx, cross_attention=False):
+        """Reorder the cached self-attention key/values to follow the beams.
+
+        The cross-attention projections (entries 2 and 3 of each layer) are
+        computed once from the encoder output, which is the same for every
+        beam of a question, so they are reused as they are unless rows are
+        dropped from the batch (`cross_attention=True`).
+        """
+        return tuple(
+            (
+                layer_past[0].index_select(0, beam_idx),
+                layer_past[1].index_select(0, beam_idx),
+            )
+            + tuple(
+                past.index_select(0, beam_idx) if cross_attention else past
+                for past in layer_past[2:]
+            )
+            for layer_past in past_key_values
+        )
+
 
 class Seq2Seq(nn.Module):
     """
@@ -265,162 +303,204 @@ class Seq2Seq(nn.Module):
             return outputs
         else:
             # Predict
-            preds = []
-            zero = torch.tensor(1, dtype=torch.long, device=self.device).fill_(0)
-            for i in range(source_ids.shape[0]):
-                context = encoder_output[:, i : i + 1]
-                context_mask = source_mask[i : i + 1, :]
-                beam = Beam(
-                    self.beam_size, self.sos_id, self.eos_id, device=self.devise
+            beam = BatchBeam(
+                source_ids.shape[0],
+                self.beam_size,
+                self.sos_id,
+                self.eos_id,
+                device=source_ids.device,
+            )
+            input_ids = beam.getCurrentState()
+            context = encoder_output.repeat_interleave(self.beam_size, dim=1)
+            context_mask = source_mask.repeat_interleave(self.beam_size, dim=0)
+            for _ in range(self.max_length):
+                attn_mask = -1e4 * (
+                    1 - self.bias[: input_ids.shape[1], : input_ids.shape[1]]
                 )
-                input_ids = beam.getCurrentState()
-                context = context.repeat(1, self.beam_size, 1)
-                context_mask = context_mask.repeat(self.beam_size, 1)
-                for _ in range(self.max_length):
-                    if beam.done():
-                        break
-                    attn_mask = -1e4 * (
-                        1 - self.bias[: input_ids.shape[1], : input_ids.shape[1]]
-                    )
-                    tgt_embeddings = (
-                        self.encoder.embeddings(input_ids)
-                        .permute([1, 0, 2])
-                        .contiguous()
-                    )
-                    out = self.decoder(
-                        tgt_embeddings,
-                        context,
-                        tgt_mask=attn_mask,
-                        memory_key_padding_mask=(1 - context_mask).bool(),
-                    )
-                    out = torch.tanh(self.dense(out))
-                    hidden_states = out.permute([1, 0, 2]).contiguous()[:, -1, :]
-                    out = self.lsm(self.lm_head(hidden_states)).data
-                    beam.advance(out)
-                    input_ids.data.copy_(
-                        input_ids.data.index_select(0, beam.getCurrentOrigin())
-                    )
-                    input_ids = torch.cat((input_ids, beam.getCurrentState()), -1)
-                hyp = beam.getHyp(beam.getFinal())
-                pred = beam.buildTargetTokens(hyp)[: self.beam_size]
-                pred = [
-                    torch.cat(
-                        [x.view(-1) for x in p] + [zero] * (self.max_length - len(p))
-                    ).view(1, -1)
-                    for p in pred
-                ]
-                preds.append(torch.cat(pred, 0).unsqueeze(0))
+                tgt_embeddings = (
+                    self.encoder.embeddings(input_ids).permute([1, 0, 2]).contiguous()
+                )
+                out = self.decoder(
+                    tgt_embeddings,
+                    context,
+                    tgt_mask=attn_mask,
+                    memory_key_padding_mask=(1 - context_mask).bool(),
+                )
+                out = torch.tanh(self.dense(out))
+                hidden_states = out.permute([1, 0, 2]).contiguous()[:, -1, :]
+                log_probs = self.lsm(self.lm_head(hidden_states)).data
+                origin = beam.advance(log_probs)
+                input_ids = torch.cat(
+                    (input_ids.index_select(0, origin), beam.getCurrentState()), -1
+                )
+
+                # Drop the questions whose beams are done from the batch.
+                keep = beam.prune()
+                if beam.done():
+                    break
+                if keep is not None:
+                    input_ids = input_ids.index_select(0, keep)
+                    context = context.index_select(1, keep)
+                    context_mask = context_mask.index_select(0, keep)
 
-            preds = torch.cat(preds, 0)
+            preds = beam.getPreds(self.max_length)
             return preds
 
 
-class Beam(object):
-    def __init__(self, size, sos, eos, device):
+class BatchBeam(object):
+    """
+    Beam search over a batch of questions at once.
+
+    The beams of all questions are kept as `(batch, beam)` tensors and the
+    decoder is run on a `(batch*beam, seq)` input. Questions whose beams are
+    done are dropped from the decoder input via `prune`, while their history
+    is kept for `getPreds`.
+    """
+
+    def __init__(self, batch_size, size, sos, eos, device):
         self.device = device
+        self.batch_size = batch_size
         self.size = size
+        self._eos = eos
+        # Indices of the questions that are still decoded.
+        self.alive = torch.arange(batch_size, device=device)
         # The score for each translation on the beam.
-        self.scores = torch.zeros(size, dtype=torch.float32, device=device)
-        # The backpointers at each time-step.
+        self.scores = torch.zeros(
+            (batch_size, size), dtype=torch.float32, device=device
+        )
+        # The outputs of the last time-step.
+        self.last = torch.zeros((batch_size, size), dtype=torch.int64, device=device)
+        self.last[:, 0] = sos
+        # Number of finished hypotheses, whether EOS has topped the beam and
+        # number of time-steps per question.
+        self.numFinished = torch.zeros(batch_size, dtype=torch.int64, device=device)
+        self.eosTop = torch.zeros(batch_size, dtype=torch.bool, device=device)
+        self.numSteps = torch.zeros(batch_size, dtype=torch.int64, device=device)
+        # The backpointers, outputs and scores at each time-step.
         self.prevKs = []
-        # The outputs at each time-step.
-        self.nextYs = [torch.zeros(size, dtype=torch.int64, device=device)]
-        self.nextYs[0][0] = sos
-        # Has EOS topped the beam yet.
-        self._eos = eos
-        self.eosTop = False
-        # Time and k pair for finished.
-        self.finished = []
+        self.nextYs = []
+        self.stepScores = []
 
     def getCurrentState(self):
-        "Get the outputs for the current timestep."
-        batch = torch.tensor(
-            self.nextYs[-1], dtype=torch.int64, device=self.device
-        ).view(-1, 1)
-        return batch
-
-    def getCurrentOrigin(self):
-        "Get the backpointers for the current timestep."
-        return self.prevKs[-1]
+        "Get the outputs for the current timestep of the alive questions."
+        return self.last[self.alive].view(-1, 1)
 
     def advance(self, wordLk):
         """
-        Given prob over words for every last beam `wordLk` and attention
-        `attnOut`: Compute and update the beam search.
+        Given prob over words for every last beam `wordLk`: Compute and update
+        the beam search for all alive questions.
         Parameters:
-        * `wordLk`- probs of advancing from the last step (K x words)
-        * `attnOut`- attention at the last step
-        Returns: True if beam search is complete.
+        * `wordLk`- probs of advancing from the last step (alive*K x words)
+        Returns: row indices into `wordLk` the new beams originate from.
         """
-        numWords = wordLk.size(1)
+        numAlive = self.alive.size(0)
+        numWords = wordLk.size(-1)
+        wordLk = wordLk.view(numAlive, self.size, numWords)
 
         # Sum the previous scores.
         if len(self.prevKs) > 0:
-            beamLk = wordLk + self.scores.unsqueeze(1).expand_as(wordLk)
+            beamLk = wordLk + self.scores[self.alive].unsqueeze(-1)
 
             # Don't let EOS have children.
-            for i in range(self.nextYs[-1].size(0)):
-                if self.nextYs[-1][i] == self._eos:
-                    beamLk[i] = -1e20
+            isEos = self.last[self.alive].eq(self._eos).unsqueeze(-1)
+            beamLk = beamLk.masked_fill(isEos, -1e20)
         else:
-            beamLk = wordLk[0]
-        flatBeamLk = beamLk.view(-1)
-        bestScores, bestScoresId = flatBeamLk.topk(self.size, 0, True, True)
-
-        self.scores = bestScores
+            beamLk = wordLk[:, :1]
+        flatBeamLk = beamLk.view(numAlive, -1)
+        bestScores, bestScoresId = flatBeamLk.topk(self.size, 1, True, True)
 
         # bestScoresId is flattened beam x word array, so calculate which
         # word and beam each score came from
         prevK = bestScoresId // numWords
-        self.prevKs.append(prevK)
-        self.nextYs.append(bestScoresId - prevK * numWords)
+        nextY = bestScoresId - prevK * numWords
 
-        for i in range(self.nextYs[-1].size(0)):
-            if self.nextYs[-1][i] == self._eos:
-                s = self.scores[i]
-                self.finished.append((s, len(self.nextYs) - 1, i))
+        self.scores[self.alive] = bestScores
+        self.last[self.alive] = nextY
+        self.prevKs.append(self._expand(prevK))
+        self.nextYs.append(self._expand(nextY))
+        self.stepScores.append(self._expand(bestScores))
 
+        isEos = nextY.eq(self._eos)
+        self.numFinished[self.alive] += isEos.sum(1)
         # End condition is when top-of-beam is EOS and no global score.
-        if self.nextYs[-1][0] == self._eos:
-            self.eosTop = True
+        self.eosTop[self.alive] |= isEos[:, 0]
+        self.numSteps[self.alive] += 1
+
+        offset = torch.arange(numAlive, device=self.device).unsqueeze(1) * self.size
+        return (offset + prevK).view(-1)
+
+    def _expand(self, values):
+        "Scatter the values of the alive questions into a batch sized tensor."
+        expanded = values.new_zeros((self.batch_size, self.size))
+        expanded[self.alive] = values
+        return expanded
+
+    def prune(self):
+        """
+        Remove the questions whose beams are done from the alive questions.
+        Returns: row indices of the remaining beams in the current
+        (alive*K) layout, or None if no question has finished.
+        """
+        done = self.eosTop[self.alive] & (
+            self.numFinished[self.alive] >= self.size
+        )
+        if not bool(done.any()):
+            return None
+        keep = (~done).nonzero(as_tuple=False).view(-1)
+        self.alive = self.alive[keep]
+        rows = keep.unsqueeze(1) * self.size + torch.arange(
+            self.size, device=self.device
+        )
+        return rows.view(-1)
 
     def done(self):
-        return self.eosTop and len(self.finished) >= self.size
-
-    def getFinal(self):
-        if len(self.finished) == 0:
-            self.finished.append((self.scores[0], len(self.nextYs) - 1, 0))
-        self.finished.sort(key=lambda a: -a[0])
-        if len(self.finished) != self.size:
-            unfinished = []
-            for i in range(self.nextYs[-1].size(0)):
-                if self.nextYs[-1][i] != self._eos:
-                    s = self.scores[i]
-                    unfinished.append((s, len(self.nextYs) - 1, i))
-            unfinished.sort(key=lambda a: -a[0])
-            self.finished += unfinished[: self.size - len(self.finished)]
-        return self.finished[: self.size]
-
-    def getHyp(self, beam_res):
+        return self.alive.size(0) == 0
+
+    def getPreds(self, max_length):
         """
-        Walk back to construct the full hypothesis.
+        Walk back to construct the best hypotheses of every question.
+        Returns: tensor of shape (batch, K, max_length) padded with 0.
         """
-        hyps = []
-        for _, timestep, k in beam_res:
-            hyp = []
-            for j in range(len(self.prevKs[:timestep]) - 1, -1, -1):
-                hyp.append(self.nextYs[j + 1][k])
-                k = self.prevKs[j][k]
-            hyps.append(hyp[::-1])
-        return hyps
-
-    def buildTargetTokens(self, preds):
-        sentence = []
-        for pred in preds:
-            tokens = []
-            for tok in pred:
-                if tok == self._eos:
-                    break
-                tokens.append(tok)
-            sentence.append(tokens)
-        return sentence
+        prevKs = torch.stack(self.prevKs).tolist()
+        nextYs = torch.stack(self.nextYs).tolist()
+        stepScores = torch.stack(self.stepScores).tolist()
+        numSteps = self.numSteps.tolist()
+
+        preds = []
+        for b in range(self.batch_size):
+            timesteps = numSteps[b]
+            finished = [
+                (stepScores[t][b][i], t + 1, i)
+                for t in range(timesteps)
+                for i in range(self.size)
+                if nextYs[t][b][i] == self._eos
+            ]
+            if len(finished) == 0:
+                finished.append((stepScores[timesteps - 1][b][0], timesteps, 0))
+            finished.sort(key=lambda a: -a[0])
+            if len(finished) != self.size:
+                unfinished = [
+                    (stepScores[timesteps - 1][b][i], timesteps, i)
+                    for i in range(self.size)
+                    if nextYs[timesteps - 1][b][i] != self._eos
+                ]
+                unfinished.sort(key=lambda a: -a[0])
+                finished += unfinished[: self.size - len(finished)]
+
+            sentence = []
+            for _, timestep, k in finished[: self.size]:
+                hyp = []
+                for j in range(timestep - 1, -1, -1):
+                    hyp.append(nextYs[j][b][k])
+                    k = prevKs[j][b][k]
+                tokens = []
+                for tok in hyp[::-1]:
+                    if tok == self._eos:
+                        break
+                    tokens.append(tok)
+                sentence.append(tokens + [0] * (max_length - len(tokens)))
+            while len(sentence) < self.size:
+                sentence.append([0] * max_length)
+            preds.append(sentence)
+
+        return torch.tensor(preds, dtype=torch.int64, device=self.device)
@@ -26,9 +26,11 @@ import logging
 import os
 import random
 import re
+import threading    # modified
 
 from app.bert_spbert_spbert.spbert.model import BertSeq2Seq     # modified
 from app.bert_spbert_spbert.spbert.model import Seq2Seq         # modified
+from app.postprocessing import format_prediction    # modified
 from nltk.translate.bleu_score import corpus_bleu
 import numpy as np
 import torch
@@ -435,11 +437,13 @@ parser.add_argument(
 tokenizer = None
 model = None
 device = None
+session = None    # modified
 
 def init(args):
     global tokenizer
     global model
     global device
+    global session    # modified
 
     logger.info(args)
 
@@ -554,6 +558,8 @@ def init(args):
         # multi-gpu training
         model = torch.nn.DataParallel(model)
 
+    session = InferenceSession(model, tokenizer, args, device)    # modified
+
 # ------------------------------------- end inlining -------------------------------------
 
 def run(args):    # modified
@@ -929,5 +935,83 @@ def run(args):    # modified
             logger.info("  " + "*" * 20)
 
 
+class InferenceSession:    # modified
+    """Long-lived inference state for answering single questions.
+
+    The model is switched to eval mode once and the input tensors are
+    allocated once with shape (eval_batch_size, max_*_length), so a request
+    only pays for filling the buffers and the forward pass. The buffers are
+    shared, hence concurrent calls of predict are serialized by a lock.
+    """
+
+    def __init__(self, model, tokenizer, args, device):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.args = args
+        self.device = device
+        self.batch_size = args.eval_batch_size
+
+        self.source_ids = torch.zeros(
+            (self.batch_size, args.max_source_length), dtype=torch.long, device=device
+        )
+        self.source_mask = torch.zeros_like(self.source_ids)
+        self.triples_ids = torch.zeros(
+            (self.batch_size, args.max_triples_length), dtype=torch.long, device=device
+        )
+        self.triples_mask = torch.zeros_like(self.triples_ids)
+        self.lock = threading.Lock()
+
+        self.model.eval()
+
+    def convert(self, sources, triples):
+        """Convert in-memory questions and triples into input features."""
+        examples = [
+            Example(idx=idx, source=source.strip(), triples=triple.strip(), target="")
+            for idx, (source, triple) in enumerate(zip(sources, triples))
+        ]
+        return convert_examples_to_features(
+            examples, self.tokenizer, self.args, stage="predict"
+        )
+
+    def predict(self, features):
+        """Predict the encoded queries for a list of input features."""
+        with self.lock:
+            return self._predict(features)
+
+    def _predict(self, features):
+        if self.model.training:
+            # run() switches back to training mode after do_test/do_predict.
+            self.model.eval()
+
+        p = []
+        for start in range(0, len(features), self.batch_size):
+            batch = features[start : start + self.batch_size]
+            n = len(batch)
+            self.source_ids[:n].copy_(torch.tensor([f.source_ids for f in batch]))
+            self.source_mask[:n].copy_(torch.tensor([f.source_mask for f in batch]))
+            self.triples_ids[:n].copy_(torch.tensor([f.triples_ids for f in batch]))
+            self.triples_mask[:n].copy_(torch.tensor([f.triples_mask for f in batch]))
+            with torch.no_grad():
+                preds = self.model(
+                    source_ids=self.source_ids[:n],
+                    source_mask=self.source_mask[:n],
+                    triples_ids=self.triples_ids[:n],
+                    triples_mask=self.triples_mask[:n],
+                )
+            for pred in preds:
+                t = pred[0].cpu().numpy()
+                t = list(t)
+                if 0 in t:
+                    t = t[: t.index(0)]
+                text = self.tokenizer.decode(t, clean_up_tokenization_spaces=False)
+                p.append(format_prediction(text))
+        return p
+
+
+def predict_queries(args, sources, triples):    # modified
+    """Predict the encoded queries for in-memory questions and triples."""
+    return session.predict(session.convert(sources, triples))
+
+
 if __name__ == "__main__":
     run()
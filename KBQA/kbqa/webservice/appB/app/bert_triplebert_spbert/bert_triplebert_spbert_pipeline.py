@@ -1,12 +1,12 @@
 """Wrapper class for the BERT_TRIPLEBERT_SPBERT pipeline."""
 from types import SimpleNamespace
+from typing import List
 
 from app.base_pipeline import BasePipeline
 from app.bert_triplebert_spbert.triplebert.run import init
-from app.bert_triplebert_spbert.triplebert.run import run
+from app.bert_triplebert_spbert.triplebert.run import predict_queries
 from app.postprocessing import postprocess_prediction
-from app.preprocessing import preprocessing_qtq
-from app.preprocessing import seperate_qtq
+from app.preprocessing import preprocess_qtq
 
 
 class BertTripleBertSPBertPipeline(BasePipeline):
@@ -25,24 +25,50 @@ class BertTripleBertSPBertPipeline(BasePipeline):
 
         init(self.arguments)  # used to make the linters work, can be removed
 
-    def predict_sparql_query(self, question: str) -> str:
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Precit a SPARQL query for a given question.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question.
 
         Returns
         -------
         str
             Predicted SPARQL query for the question.
         """
-        seperate_qtq()
-        preprocessing_qtq()
-        run(self.arguments)
+        return self.predict_sparql_queries([question], [triples])[0]
 
-        query_pairs = postprocess_prediction()
-        query = query_pairs["0"]
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions using BERT_TRIPLEBERT_SPBERT.
 
-        return query
+        The questions are run through the model together in batches of
+        `eval_batch_size`.
+
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        sources = list()
+        triples_strs = list()
+        for question, question_triples in zip(questions, triples):
+            source, triples_str = preprocess_qtq(question, question_triples)
+            sources.append(source)
+            triples_strs.append(triples_str)
+
+        predictions = predict_queries(self.arguments, sources, triples_strs)
+
+        return [postprocess_prediction(prediction) for prediction in predictions]
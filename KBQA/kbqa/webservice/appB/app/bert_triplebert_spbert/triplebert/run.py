@@ -26,9 +26,14 @@ import logging
 import os
 import random
 import re
+from types import SimpleNamespace    # modified
+from typing import Any    # modified
+from typing import List    # modified
+from typing import Optional    # modified
 
 from app.bert_triplebert_spbert.triplebert.model import BertSeq2Seq
 from app.bert_triplebert_spbert.triplebert.model import Seq2Seq
+from app.postprocessing import format_prediction    # modified
 from nltk.translate.bleu_score import corpus_bleu
 import numpy as np
 import torch
@@ -67,7 +72,9 @@ logger = logging.getLogger(__name__)
 class Example:
     """A single training/test example."""
 
-    def __init__(self, idx, source, triples, target):
+    def __init__(    # modified
+        self, idx: int, source: str, triples: str, target: str
+    ) -> None:
         self.idx = idx
         self.source = source
         self.triples = triples
@@ -114,16 +121,16 @@ def read_examples_without_target(source_file, triples_file):
 class InputFeatures:
     """A single training/test features for a example."""
 
-    def __init__(
+    def __init__(    # modified
         self,
-        example_id,
-        source_ids,
-        triples_ids,
-        target_ids,
-        source_mask,
-        triples_mask,
-        target_mask,
-    ):
+        example_id: int,
+        source_ids: List[int],
+        triples_ids: List[int],
+        target_ids: List[int],
+        source_mask: List[int],
+        triples_mask: List[int],
+        target_mask: List[int],
+    ) -> None:
         self.example_id = example_id
         self.source_ids = source_ids
         self.triples_ids = triples_ids
@@ -133,7 +140,9 @@ class InputFeatures:
         self.target_mask = target_mask
 
 
-def convert_examples_to_features(examples, tokenizer, args, stage=None):
+def convert_examples_to_features(    # modified
+    examples: List[Example], tokenizer: Any, args: Any, stage: Optional[str] = None
+) -> List[InputFeatures]:
     features = []
     for example_index, example in enumerate(examples):
         # source
@@ -1014,5 +1023,56 @@ def run(args):
             logger.info("  " + "*" * 20)
 
 
+def predict_queries(    # modified
+    args: SimpleNamespace, sources: List[str], triples: List[str]
+) -> List[str]:
+    """Predict the encoded queries for in-memory questions and triples."""
+    assert model is not None and tokenizer is not None    # modified
+    eval_examples = [
+        Example(idx=idx, source=source.strip(), triples=triple.strip(), target="")
+        for idx, (source, triple) in enumerate(zip(sources, triples))
+    ]
+    eval_features = convert_examples_to_features(
+        eval_examples, tokenizer, args, stage="predict"
+    )
+    all_source_ids = torch.tensor(
+        [f.source_ids for f in eval_features], dtype=torch.long
+    )
+    all_source_mask = torch.tensor(
+        [f.source_mask for f in eval_features], dtype=torch.long
+    )
+    all_triples_ids = torch.tensor(
+        [f.triples_ids for f in eval_features], dtype=torch.long
+    )
+    all_triples_mask = torch.tensor(
+        [f.triples_mask for f in eval_features], dtype=torch.long
+    )
+
+    model.eval()
+    p = []
+    for start in range(0, len(eval_features), args.eval_batch_size):
+        end = start + args.eval_batch_size
+        source_ids = all_source_ids[start:end].to(device)
+        source_mask = all_source_mask[start:end].to(device)
+        triples_ids = all_triples_ids[start:end].to(device)
+        triples_mask = all_triples_mask[start:end].to(device)
+        with torch.no_grad():
+            preds = model(
+                source_ids=source_ids,
+                source_mask=source_mask,
+                triples_ids=triples_ids,
+                triples_mask=triples_mask,
+            )
+            for pred in preds:
+                t = pred[0].cpu().numpy()
+                t = list(t)
+                if 0 in t:
+                    t = t[: t.index(0)]
+                text = tokenizer.decode(t, clean_up_tokenization_spaces=False)
+                p.append(format_prediction(text))
+    model.train()
+    return p
+
+
 if __name__ == "__main__":
     run()
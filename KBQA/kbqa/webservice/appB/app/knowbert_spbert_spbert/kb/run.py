@@ -31,6 +31,7 @@ from app.knowbert_spbert_spbert.kb.knowbert import KnowBert
 from app.knowbert_spbert_spbert.kb.knowbert_utils import KnowBertBatchifier
 
 from app.knowbert_spbert_spbert.kb.model import BertSeq2Seq     # modified
+from app.postprocessing import format_prediction    # modified
 from nltk.translate.bleu_score import corpus_bleu
 import numpy as np
 import torch
@@ -1123,4 +1124,76 @@ def predict(model, batcher, tokenizer, device, args):
                 pred_str.append(ref.split())
                 line = str(example.idx) + "\t" + ref    #modified
                 f.write(line + "\n")    # modified
-        logger.info("  " + "*" * 20)
\ No newline at end of file
+        logger.info("  " + "*" * 20)
+
+
+def predict_queries(model, batcher, tokenizer, device, args, sources, triples):    # modified
+    """Predict the encoded queries for in-memory questions and triples."""
+    eval_examples = [
+        Example(idx=idx, source=source.strip(), triples=triple.strip(), target="")
+        for idx, (source, triple) in enumerate(zip(sources, triples))
+    ]
+    all_eval_features = convert_examples_to_features(
+        eval_examples,
+        tokenizer,
+        batcher,
+        args,
+        stage="test"
+    )
+
+    model.eval()
+    p = []
+    for start in range(0, len(eval_examples), args.eval_batch_size):
+        end = start + args.eval_batch_size
+        batch = tuple(t[start:end].to(device) for t in all_eval_features)
+        (
+            source_ids,
+            source_segment_ids,
+            source_mask,
+            source_wiki_candidate_priors,
+            source_wiki_candidate_ids,
+            source_wiki_candidate_spans,
+            source_wiki_candidate_segment_ids,
+            source_wordnet_candidate_priors,
+            source_wordnet_candidate_ids,
+            source_wordnet_candidate_spans,
+            source_wordnet_candidate_segment_ids,
+            triples_ids,
+            triples_mask,
+            _,
+            _
+        ) = batch
+        source_candidates = {
+            'wiki' : {
+                'candidate_entity_priors' : source_wiki_candidate_priors,
+                'candidate_entities' : {'ids' : source_wiki_candidate_ids},
+                'candidate_spans' : source_wiki_candidate_spans,
+                'candidate_segment_ids' : source_wiki_candidate_segment_ids
+            },
+            'wordnet' : {
+                'candidate_entity_priors' : source_wordnet_candidate_priors,
+                'candidate_entities' : {'ids' : source_wordnet_candidate_ids},
+                'candidate_spans' : source_wordnet_candidate_spans,
+                'candidate_segment_ids' : source_wordnet_candidate_segment_ids
+            }
+        }
+
+        tokens = {'tokens' : source_ids}
+        with torch.no_grad():
+            preds = model(
+                source_ids=tokens,
+                source_segment_ids=source_segment_ids,
+                source_mask=source_mask,
+                source_candidates=source_candidates,
+                triples_ids=triples_ids,
+                triples_mask=triples_mask,
+            )
+            for pred in preds:
+                t = pred[0].cpu().numpy()
+                t = list(t)
+                if 0 in t:
+                    t = t[: t.index(0)]
+                text = tokenizer.decode(t, clean_up_tokenization_spaces=False)
+                p.append(format_prediction(text))
+    model.train()
+    return p
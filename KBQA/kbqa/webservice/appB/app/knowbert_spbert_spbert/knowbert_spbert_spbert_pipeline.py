@@ -1,15 +1,15 @@
 """Wrapper class for the KNOWBERT_SPBERT_SPBERT pipeline."""
 import logging
 from types import SimpleNamespace
+from typing import List
 
 from app.base_pipeline import BasePipeline
 from app.knowbert_spbert_spbert.kb.run import init
-from app.knowbert_spbert_spbert.kb.run import predict
+from app.knowbert_spbert_spbert.kb.run import predict_queries
 from app.knowbert_spbert_spbert.kb.run import test
 from app.knowbert_spbert_spbert.kb.run import train
 from app.postprocessing import postprocess_prediction
-from app.preprocessing import preprocessing_qtq
-from app.preprocessing import seperate_qtq
+from app.preprocessing import preprocess_qtq
 
 
 class KnowBertSPBertSPBertPipeline(BasePipeline):
@@ -26,13 +26,8 @@ class KnowBertSPBertSPBertPipeline(BasePipeline):
         """
         super().__init__(arguments)
 
-        from app.preprocessing.preprocessing_qtq.preprocessing_qtq import (
-            PREPROCESSING_QTQ,
-        )
-
         knowbert_logger = logging.getLogger("knowbert-logger")
         knowbert_logger.setLevel(logging.INFO)
-        PREPROCESSING_QTQ.uncased_NL = self.arguments.uncased_NL
 
         self.model, self.batcher, self.tokenizer, self.device = init(arguments)
 
@@ -44,25 +39,60 @@ class KnowBertSPBertSPBertPipeline(BasePipeline):
         """Wrap test function from run.py."""
         test(self.model, self.batcher, self.tokenizer, self.device, self.arguments)
 
-    def predict_sparql_query(self, question: str) -> str:
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Predict a SPARQL query for a given question using BERT_SPBERT_SPBERT.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question.
 
         Returns
         -------
         str
             Predicted SPARQL query for the question from BERT_SPBERT_SPBERT.
         """
-        seperate_qtq()
-        preprocessing_qtq()
+        return self.predict_sparql_queries([question], [triples])[0]
+
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions using KNOWBERT_SPBERT_SPBERT.
 
-        predict(self.model, self.batcher, self.tokenizer, self.device, self.arguments)
+        The questions are run through the model together in batches of
+        `eval_batch_size`.
+
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question.
 
-        query_pairs = postprocess_prediction()
-        query = query_pairs["0"]
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        sources = list()
+        triples_strs = list()
+        for question, question_triples in zip(questions, triples):
+            source, triples_str = preprocess_qtq(
+                question, question_triples, uncased=self.arguments.uncased_NL
+            )
+            sources.append(source)
+            triples_strs.append(triples_str)
+
+        predictions = predict_queries(
+            self.model,
+            self.batcher,
+            self.tokenizer,
+            self.device,
+            self.arguments,
+            sources,
+            triples_strs,
+        )
 
-        return query
+        return [postprocess_prediction(prediction) for prediction in predictions]
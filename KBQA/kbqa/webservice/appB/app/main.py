@@ -1,24 +1,19 @@
 """Main module for the application logic of approach B."""
 from configparser import ConfigParser
 from configparser import SectionProxy
-import json
-import os
 from typing import Any
 from typing import Dict
 from typing import List
 from typing import Tuple
 from typing import Union
 
+from app import endpoints
 from app.base_pipeline import BasePipeline
-from app.preprocessing import QTQ_DATA_DIR
-from app.preprocessing import SPLIT_NAME
 from app.qald_builder import qald_builder_ask_answer
 from app.qald_builder import qald_builder_empty_answer
 from app.qald_builder import qald_builder_select_answer
 from app.summarizer import BaseSummarizer
-from SPARQLWrapper import JSON
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.SPARQLExceptions import SPARQLWrapperException
+from requests import RequestException
 
 config_path = "/config/app_b_config.ini"
 
@@ -43,9 +38,9 @@ def main(query: str, lang: str = "en") -> Dict[str, Any]:
     """
     print("Question:", query.encode("utf-8"))
 
-    summarize(query)
+    triples = summarize(query)
 
-    sparql_query = pipeline_.predict_sparql_query(query)
+    sparql_query = pipeline_.predict_sparql_query(query, triples)
     answer_qald = ask_dbpedia(query, sparql_query, lang)
 
     return answer_qald
@@ -71,12 +66,9 @@ def ask_dbpedia(question: str, sparql_query: str, lang: str) -> Dict[str, Any]:
     print("SPARQL-Query:", sparql_query.encode("utf-8"))
 
     try:
-        sparql = SPARQLWrapper("http://dbpedia.org/sparql/")
-        sparql.setReturnFormat(JSON)
-        sparql.setQuery(sparql_query)
-        answer = sparql.query().convert()
-    except SPARQLWrapperException as exception:
-        print("SPARQLWrapperException", exception)
+        answer = endpoints.query_sparql_json(sparql_query)
+    except (RequestException, ValueError) as exception:
+        print("SPARQL request failed", exception)
 
         qald_answer = qald_builder_empty_answer("", question, lang)
 
@@ -100,36 +92,25 @@ def ask_dbpedia(question: str, sparql_query: str, lang: str) -> Dict[str, Any]:
     return qald_answer
 
 
-def summarize(question: str) -> None:
-    """Summarize a subgraph and store the resulting triples in a qtq-file.
+def summarize(question: str) -> List[str]:
+    """Summarize a subgraph for the given question.
 
     Parameters
     ----------
     question : str
         Natural language question.
+
+    Returns
+    -------
+    list
+        Summarized triples, which are passed to the pipeline in memory.
     """
     if summarizer_ is None:
-        summarized_triples = list()
+        summarized_triples: List[str] = list()
     else:
         summarized_triples = summarizer_.summarize(question)
 
-    data_dir = QTQ_DATA_DIR
-
-    if os.path.exists(data_dir) is False:
-        os.makedirs(data_dir)
-
-    filename = f"{SPLIT_NAME}.json"
-
-    dataset: Dict[str, List[Dict[str, Any]]] = {"questions": list()}
-
-    qtq: Dict[str, Any] = dict()
-    qtq["question"] = question
-    qtq["query"] = ""
-    qtq["triples"] = summarized_triples
-    dataset["questions"].append(qtq)
-
-    with open(f"{data_dir}/{filename}", "w", encoding="utf-8") as file:
-        json.dump(dataset, file, indent=4, separators=(",", ": "))
+    return summarized_triples
 
 
 def load_config(path: str) -> Tuple[Union[BaseSummarizer, None], BasePipeline]:
@@ -139,7 +120,10 @@ def load_config(path: str) -> Tuple[Union[BaseSummarizer, None], BasePipeline]:
     a section 'general' with the attributes 'summarizer' and 'architecture'.
     The values of those attributes should have there own section with all
     dynamic parameters, which are used to initialize the corresponding
-    archtecture.
+    archtecture. An optional section 'batching' enables the micro-batching
+    of concurrent requests, an optional section 'http' configures the
+    connections to DBpedia and the entity linkers and an optional section
+    'cache' enables the cache for the results of SPARQL-queries.
 
     Parameters
     ----------
@@ -164,6 +148,9 @@ def load_config(path: str) -> Tuple[Union[BaseSummarizer, None], BasePipeline]:
 
     parser.read(path)
 
+    init_http(parser)
+    init_cache(parser)
+
     if "general" in parser.sections():
         general = parser["general"]
 
@@ -199,9 +186,58 @@ def load_config(path: str) -> Tuple[Union[BaseSummarizer, None], BasePipeline]:
     else:
         raise ValueError(f"Architecture {architecture_name} is not supported.")
 
+    pline = init_batching(parser, pline)
+
     return smrzr, pline
 
 
+def init_http(parser: ConfigParser) -> None:
+    """Configure the shared HTTP client, if the config file has a section 'http'.
+
+    Parameters
+    ----------
+    parser : ConfigParser
+        Parsed configuration file. The section 'http' has the optional
+        attributes 'max_connections', 'retries', 'backoff_factor' and
+        'timeout'.
+    """
+    if "http" not in parser.sections():
+        return
+
+    section = parser["http"]
+
+    endpoints.configure(
+        max_connections=section.getint("max_connections", fallback=16),
+        retries=section.getint("retries", fallback=3),
+        backoff_factor=section.getfloat("backoff_factor", fallback=0.5),
+        timeout=section.getfloat("timeout", fallback=30.0),
+    )
+
+
+def init_cache(parser: ConfigParser) -> None:
+    """Configure the cache for SPARQL results, if the config file has a section 'cache'.
+
+    Parameters
+    ----------
+    parser : ConfigParser
+        Parsed configuration file. The section 'cache' has the optional
+        attributes 'enabled', 'max_entries', 'ttl', 'path' and
+        'max_disk_entries'.
+    """
+    if "cache" not in parser.sections():
+        return
+
+    section = parser["cache"]
+
+    endpoints.configure_cache(
+        enabled=section.getboolean("enabled", fallback=True),
+        max_entries=section.getint("max_entries", fallback=1024),
+        ttl=section.getfloat("ttl", fallback=86400.0),
+        path=section.get("path", fallback=None),
+        max_disk_entries=section.getint("max_disk_entries", fallback=100000),
+    )
+
+
 def init_one_hop_rank_summarizer(section: SectionProxy) -> BaseSummarizer:
     """Initialize the OneHopRankSummarizer with the given values in the config section.
 
@@ -216,6 +252,7 @@ def init_one_hop_rank_summarizer(section: SectionProxy) -> BaseSummarizer:
     OneHopRankSummarizer
         Initialized instance of the OneHopRankSummarizer.
     """
+    from app.summarizer.one_hop_rank_summarizer import FetchConfig
     from app.summarizer.one_hop_rank_summarizer import OneHopRankSummarizer
 
     datasets = str(section["datasets"])
@@ -223,7 +260,15 @@ def init_one_hop_rank_summarizer(section: SectionProxy) -> BaseSummarizer:
     lower_rank = int(section["lower_rank"])
     max_triples = int(section["max_triples"])
     limit = int(section["limit"])
-    timeout = float(section["timeout"])
+
+    fetch = FetchConfig(
+        timeout=float(section["timeout"]),
+        max_workers=section.getint("max_workers", fallback=8),
+        deadline=section.getfloat("deadline", fallback=30.0),
+        neighborhood_entities=section.getint("neighborhood_entities", fallback=0),
+        neighborhood_ttl=section.getfloat("neighborhood_ttl", fallback=3600.0),
+        neighborhood_size=section.getint("neighborhood_size", fallback=5000),
+    )
 
     ohrs = OneHopRankSummarizer(
         datasets=datasets,
@@ -231,7 +276,7 @@ def init_one_hop_rank_summarizer(section: SectionProxy) -> BaseSummarizer:
         lower_rank=lower_rank,
         max_triples=max_triples,
         limit=limit,
-        timeout=timeout,
+        fetch=fetch,
     )
 
     return ohrs
@@ -423,6 +468,50 @@ def init_t5(section: SectionProxy) -> BasePipeline:
     return t5_pipeline
 
 
+def init_batching(parser: ConfigParser, pipeline: BasePipeline) -> BasePipeline:
+    """Wrap the pipeline into a BatchScheduler, if batching is enabled.
+
+    Parameters
+    ----------
+    parser : ConfigParser
+        Parsed configuration file. The optional section 'batching' has the
+        attributes 'enabled', 'max_batch_size' and 'max_wait_ms'.
+    pipeline : BasePipeline
+        Initialized pipeline for the specified architecture.
+
+    Returns
+    -------
+    BasePipeline
+        BatchScheduler for the pipeline or the pipeline itself, if batching
+        is disabled.
+    """
+    from app.batching import BatchScheduler
+
+    if "batching" not in parser.sections():
+        return pipeline
+
+    section = parser["batching"]
+
+    if not section.getboolean("enabled", fallback=False):
+        return pipeline
+
+    max_batch_size = section.getint("max_batch_size", fallback=8)
+    max_wait_ms = section.getfloat("max_wait_ms", fallback=10.0)
+
+    eval_batch_size = getattr(pipeline.arguments, "eval_batch_size", max_batch_size)
+    if eval_batch_size < max_batch_size:
+        print(
+            f"WARNING: eval_batch_size ({eval_batch_size}) is smaller than "
+            f"max_batch_size ({max_batch_size}). Batches will be split."
+        )
+
+    scheduler = BatchScheduler(
+        pipeline, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+    )
+
+    return scheduler
+
+
 def parse_section(section: SectionProxy) -> List[Tuple[str, Union[int, float, str]]]:
     """Parse a section into a list of tuples.
 
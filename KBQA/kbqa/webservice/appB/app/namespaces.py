@@ -320,6 +320,9 @@ T5 = SimpleNamespace(
         "output_dir": "app/output/",
         # help="The prediction filename."
         "predict_filename": "app/data/output/question",  # "./data/output/qald_9_test",
+        # --eval_batch_size, default=8, type=int,
+        # help="Batch size per GPU/CPU for translation."
+        "eval_batch_size": 8,
         # --source, default="en", type=str,
         # help="The source language (for file extension)"
         "source": "en",
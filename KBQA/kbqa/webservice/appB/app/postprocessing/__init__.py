@@ -1,4 +1,5 @@
 """Root of the postprocessing for the results from SPBERT."""
+from .postprocessing import format_prediction
 from .postprocessing import postprocess_prediction
 
-__all__ = ["postprocess_prediction"]
+__all__ = ["format_prediction", "postprocess_prediction"]
@@ -1,47 +1,50 @@
 """Module for postprocessing a query predicted by SPBERT."""
 import re
-from types import SimpleNamespace
-from typing import Dict
 
 from app.utils.generator_utils import decode
 
-POSTPROCESSING = SimpleNamespace(
-    **{
-        # path tp predict_file
-        "predict_dir": "app/output/",
-        # predict file
-        "predict_file": "predict_0.output",
-    }
-)
 
+def postprocess_prediction(prediction: str) -> str:
+    """Postprocessing of a query predicted by SPBERT.
 
-def postprocess_prediction() -> Dict[str, str]:
-    """Postprocessing of a predicted query written in a file.
+    Parameters
+    ----------
+    prediction : str
+        Encoded SPARQL-query as predicted by the model.
 
     Returns
     -------
-    queries : dict
-        Dictionary containing the ids of the queries as keys and
-        the postprocessed SPARQL-queries as values.
+    query : str
+        Postprocessed SPARQL-query.
     """
-    args = POSTPROCESSING
-    predict_dir = args.predict_dir
-    predict_file = args.predict_file
+    prediction = re.sub(r"\s+", " ", prediction)
 
-    predict_dir = predict_dir.rstrip("/")
+    query = decode(prediction)
+    # query = fix_URI(query)
+    query = query.replace("<", "").replace(">", "")
 
-    queries = {}
+    return query
 
-    with open(f"{predict_dir}/{predict_file}", "r", encoding="utf-8") as output_file:
-        for line in output_file:
-            line = re.sub(r"\s+", " ", line)
-            query_pair = line.split(" ", 1)
 
-            query_number = query_pair[0]
-            query_decoded = decode(query_pair[1])
-            # query_decoded = fix_URI(query_decoded)
-            query_decoded = query_decoded.replace("<", "").replace(">", "")
+def format_prediction(text: str) -> str:
+    """Format a decoded prediction like the lines in the predict output file.
 
-            queries[query_number] = query_decoded
+    Parameters
+    ----------
+    text : str
+        Prediction as decoded by the tokenizer.
 
-    return queries
+    Returns
+    -------
+    str
+        Prediction without the spaces, which the tokenizer inserts around
+        brackets and punctuation.
+    """
+    ref = text.strip().replace("< ", "<").replace(" >", ">")
+    ref = re.sub(r' ?([!"#$%&\'(’)*+,-./:;=?@\\^_`{|}~]) ?', r"\1", ref)
+    ref = ref.replace("attr_close>", "attr_close >").replace(
+        "_attr_open", "_ attr_open"
+    )
+    ref = ref.replace(" [ ", " [").replace(" ] ", "] ")
+    ref = ref.replace("_obd_", " _obd_ ").replace("_oba_", " _oba_ ")
+    return ref
@@ -1,24 +1,26 @@
-"""Preprocess a seperated QTQ dataset to prepare it for the use of SPBert."""
-import os
+"""Preprocess questions and triples to prepare them for the use of SPBert."""
 import re
-from types import SimpleNamespace
 from typing import List
+from typing import Tuple
 
 from app.utils.generator_utils import encode
 from app.utils.generator_utils import SPARQL_KEYWORDS
 
-PREPROCESSING_QTQ = SimpleNamespace(
-    **{
-        # --data, dest="data_dir", required=True
-        "data_dir": "app/data/sep",
-        # --subset, dest="subset", required=True
-        "subset": "question",
-        # --output, dest="output_dir", required=True
-        "output_dir": "app/data/output",
-        # --cased-NL, dest="uncased-NL", action="store_false"
-        "uncased_NL": True,
-    }
-)
+
+def filter_triples(triples: List[str]) -> List[str]:
+    """Filter out triples containing new line character.
+
+    Parameters
+    ----------
+    triples : list
+        List of triples.
+
+    Returns
+    -------
+    filtered_triples : list
+        List of filtered triples.
+    """
+    return [triple for triple in triples if "\n" not in triple]
 
 
 def preprocess_sentence(words: str, uncased: bool = True) -> str:
@@ -116,42 +118,32 @@ def preprocess_triples(triples: List[str]) -> List[str]:
     return [preprocess_sparql(triple) for triple in triples]
 
 
-def preprocessing_qtq() -> None:
-    """Preprocess a QTQ dataset splitted into an en, sparql and triples file."""
-    args = PREPROCESSING_QTQ
-
-    data_dir = args.data_dir
-    subset = args.subset
-    output_dir = args.output_dir
-
-    data_dir = data_dir.rstrip("/")
-    output_dir = output_dir.rstrip("/")
-
-    # create output directory to store output files for SPBERT
-    if os.path.exists(output_dir) is False:
-        os.makedirs(output_dir)
-
-    with open(f"{output_dir}/{subset}.en", "w", encoding="utf-8") as out:
-        with open(f"{data_dir}/{subset}.en", encoding="utf-8") as file:
-            for line in file:
-                if "\n" == line[-1]:
-                    line = line[:-1]
-                out.write(preprocess_sentence(line, args.uncased_NL))
-                out.write("\n")
-
-    with open(f"{output_dir}/{subset}.sparql", "w", encoding="utf-8") as out:
-        with open(f"{data_dir}/{subset}.sparql", encoding="utf-8") as file:
-            for line in file:
-                if "\n" == line[-1]:
-                    line = line[:-1]
-                out.write(preprocess_sparql(line))
-                out.write("\n")
-
-    with open(f"{output_dir}/{subset}.triple", "w", encoding="utf-8") as out:
-        with open(f"{data_dir}/{subset}.triple", encoding="utf-8") as file:
-            for line in file:
-                if "\n" == line[-1]:
-                    line = line[:-1]
-                triples = line.split("\t")
-                out.write("\t".join(preprocess_triples(triples)))
-                out.write("\n")
+def preprocess_qtq(
+    question: str, triples: List[str], uncased: bool = True
+) -> Tuple[str, str]:
+    """Preprocess a question and its summarized triples for the use of SPBert.
+
+    The question and the triples are kept in memory. The result corresponds
+    to a single line of the .en file and the .triple file of a seperated and
+    preprocessed QTQ dataset.
+
+    Parameters
+    ----------
+    question : str
+        Natural language question.
+    triples : list
+        Summarized triples for the question in the format "<s> <p> <o>".
+    uncased : bool
+        Flag for whether to preprocess the question cased or uncased.
+
+    Returns
+    -------
+    source : str
+        Preprocessed natural language question.
+    triples : str
+        Preprocessed triples seperated by a tab.
+    """
+    source = preprocess_sentence(question, uncased)
+    triples_str = "\t".join(preprocess_triples(filter_triples(triples)))
+
+    return source, triples_str
@@ -3,8 +3,8 @@ from typing import Dict
 from typing import List
 from typing import Union
 
+from app import endpoints
 from app.summarizer import BaseSummarizer
-import requests
 
 
 class LaurenSummarizer(BaseSummarizer):
@@ -47,7 +47,7 @@ class LaurenSummarizer(BaseSummarizer):
         data["question"] = question
         data["size"] = self.limit
 
-        response = requests.get(
+        response = endpoints.get(
             "http://qa-collab.cs.upb.de:5000/get-triples-by-text", json=data
         ).json()
 
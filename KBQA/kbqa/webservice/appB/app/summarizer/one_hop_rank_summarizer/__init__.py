@@ -1,4 +1,5 @@
 """Root of the OneHopRankSummarizer."""
+from .one_hop_rank_summarizer import FetchConfig
 from .one_hop_rank_summarizer import OneHopRankSummarizer
 
-__all__ = ["OneHopRankSummarizer"]
+__all__ = ["FetchConfig", "OneHopRankSummarizer"]
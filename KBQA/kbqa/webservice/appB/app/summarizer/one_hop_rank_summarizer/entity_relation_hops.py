@@ -1,14 +1,63 @@
 """Module to extract subgraphs from DBpedia based one or two hops."""
 import argparse
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import time
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
-from app.summarizer.utils import entity_recognition_dbspotlight_confidence
-from app.summarizer.utils import entity_recognition_tagme
-from app.summarizer.utils import entity_relation_recognition
+from app import endpoints
+from app.summarizer.utils import get_filter_clauses
+from app.summarizer.utils import link_entities
+from app.summarizer.utils import LinkingContext
 from rdflib import Graph
 from rdflib import URIRef
-from SPARQLWrapper import SPARQLWrapper
+from rdflib.term import Node
+
+from .neighborhood_cache import NeighborhoodCache
+
+
+class SubgraphOptions:
+    """Options for fetching the subgraphs of the entities.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Limit the number of triples in the subgraphs. Use -1 to not use any limit
+        (default: 10).
+    max_workers : int, optional
+        Maximal number of concurrent queries to DBpedia (default: 8).
+    deadline : float, optional
+        Overall time in seconds for fetching all subgraphs. Queries, which are
+        not answered in time, are missing in the subgraphs (default: 30.0).
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
+    neighborhoods : NeighborhoodCache, optional
+        Cache, which answers one hop queries locally (default: query DBpedia).
+    """
+
+    def __init__(
+        self,
+        limit: int = 10,
+        max_workers: int = 8,
+        deadline: float = 30.0,
+        exclude: Sequence[str] = (),
+        language: Optional[str] = None,
+        neighborhoods: Optional[NeighborhoodCache] = None,
+    ) -> None:
+        self.limit = limit
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.exclude = exclude
+        self.language = language
+        self.neighborhoods = neighborhoods
 
 
 def entity_relation_hops(
@@ -16,9 +65,12 @@ def entity_relation_hops(
     confidence: float = 0.5,
     hops: int = 1,
     relation_pos: int = 1,
-    limit: int = 10,
     ignore: bool = False,
-) -> List[Tuple[str, Graph, Graph, float]]:
+    context: Optional[LinkingContext] = None,
+    options: Optional[SubgraphOptions] = None,
+) -> List[
+    Tuple[URIRef, List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]], float]
+]:
     """Extract subgraphs from DBpedia.
 
     Given a natural language question, extract a subgraph from DBpedia for each
@@ -37,39 +89,30 @@ def entity_relation_hops(
     relation_pos : int
         Position of the recognized relations in the graph. If this parameter is greater
         than the number of hops, the relations are ignored (default: 1).
-    limit : int
-        Limit the number of triples in the result graphs. Use -1 to use not any limit (default: 10).
     ignore : bool
         Set this parameter to ignore all recognized relations.
+    context : LinkingContext, optional
+        Linking results of the question shared with other stages (default: a
+        new context for the question).
+    options : SubgraphOptions, optional
+        Limit, concurrency, deadline and filters for fetching the subgraphs
+        (default: SubgraphOptions()).
 
     Return
     ------
     sub_graphs : list
         List of subgraphs. The list contains tuples (entity, reg_graph, inv_graph, conf),
                 where entity is the entity, from which the subgraphs are extracted (i.e. entity
-                is the center node of the subgraph), reg_graph is the regular subgraph, inv_graph
-                is the inverse subgraph and conf the confidence of the recognized entity.
+                is the center node of the subgraph), reg_graph are the triples of the regular
+                subgraph, inv_graph are the triples of the inverse subgraph and conf the
+                confidence of the recognized entity.
     """
-    _, relations = entity_relation_recognition(question)
-    # print("Relations", relations)
-    entities_dbs = entity_recognition_dbspotlight_confidence(
-        question, confidence=confidence
+    merged_dict, relations = link_entities(
+        question, confidence=confidence, context=context
     )
-    entities_tagme = entity_recognition_tagme(question, conf=confidence)
-    # print("Entities DBS:", entities_dbs)
-
-    dbs_dict = dict(entities_dbs)
-    # print("DBS", dbs_dict)
-    tagme_dict = dict(entities_tagme)
-    # print("Tagme", tagme_dict)
-
-    merged_dict = {
-        k: max(i for i in (dbs_dict.get(k), tagme_dict.get(k)) if i)
-        for k in dbs_dict.keys() | tagme_dict
-    }
 
     sub_graphs = get_subgraph(
-        list(merged_dict.keys()), relations, hops, relation_pos, limit, ignore
+        list(merged_dict.keys()), relations, hops, relation_pos, ignore, options
     )
 
     result = list()
@@ -87,13 +130,18 @@ def get_subgraph(
     relations: List[URIRef],
     hops: int,
     relation_pos: int,
-    limit: int,
     ignore: bool,
-) -> List[Tuple[URIRef, Graph, Graph]]:
+    options: Optional[SubgraphOptions] = None,
+) -> List[Tuple[URIRef, List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]]]]:
     """Extract a subgraph for all entities using the relations.
 
     Given a list of entities and relations, extract a subgraph for each entity.
     Depending on the chosen parameters the relations can also be excluded from the subgraph.
+    The CONSTRUCT-queries for all entities are sent to DBpedia concurrently. With a
+    neighborhood cache, one hop queries are answered from the cached neighborhoods of
+    the entities and only the remaining queries are sent to DBpedia. The neighborhoods
+    get half of the deadline; the queries of the entities, whose neighborhoods are not
+    fetched in time, are sent to DBpedia instead.
 
     Parameters
     ----------
@@ -105,16 +153,18 @@ def get_subgraph(
         Number of hops. This value should be in [1,2].
     relation_pos : int
         Position of the relation in the subgraph. This value should be in [1,2].
-    limit : int
-        Limit the number of triples in the subgraphs. Use -1 to not use any limit.
     ignore : bool
         Setting this parameter will ignore all relations.
+    options : SubgraphOptions, optional
+        Limit, concurrency, deadline and filters for fetching the subgraphs
+        (default: SubgraphOptions()).
 
     Returns
     -------
     sub_graphs : list
-        List of all subgraphs. An element is a tuple (entity, subgraph), where subgraph is the
-        corresponding subgraph to an entity with entity as the center node.
+        List of all subgraphs. An element is a tuple (entity, reg_triples, inv_triples), where
+        reg_triples and inv_triples are the triples of the regular and inverse subgraph with
+        entity as the center node.
 
     Raises
     ------
@@ -130,34 +180,154 @@ def get_subgraph(
     if hops == 1 and relation_pos == 2:
         raise ValueError("Relation cannot be at position 2, if there is only one hop.")
 
-    sub_graphs = []
+    if options is None:
+        options = SubgraphOptions()
+
+    start = time.monotonic()
+
+    entity_queries, entity_patterns = _get_entity_queries(
+        entities, relations, hops, relation_pos, ignore, options
+    )
+
+    # the local results of a query are None, if it has to be sent to DBpedia
+    entity_results: List[List[Optional[List[Tuple[Node, Node, Node]]]]] = [
+        [None] * (len(regular_queries) + len(inverse_queries))
+        for regular_queries, inverse_queries in entity_queries
+    ]
+
+    # the neighborhoods get half of the remaining time, so the queries of the
+    # entities without a neighborhood in time are still sent to DBpedia
+    if hops == 1:
+        _select_from_neighborhoods(
+            entities,
+            entity_patterns,
+            entity_results,
+            options,
+            (options.deadline - (time.monotonic() - start)) / 2,
+        )
+
+    remote_queries = [
+        query
+        for (regular_queries, inverse_queries), local_results in zip(
+            entity_queries, entity_results
+        )
+        for query, local_result in zip(regular_queries + inverse_queries, local_results)
+        if local_result is None
+    ]
+    remote_results = ask_dbpedia_concurrently(
+        remote_queries,
+        options.max_workers,
+        options.deadline - (time.monotonic() - start),
+    )
+
+    return _merge_entity_results(
+        entities, entity_queries, entity_results, remote_results
+    )
+
+
+def _get_entity_queries(
+    entities: List[URIRef],
+    relations: List[URIRef],
+    hops: int,
+    relation_pos: int,
+    ignore: bool,
+    options: SubgraphOptions,
+) -> Tuple[
+    List[Tuple[List[str], List[str]]], List[List[Tuple[Optional[URIRef], bool]]]
+]:
+    # the patterns (relation, inverse) of the queries are used to answer them
+    # from the neighborhood of the entity
+    entity_queries = list()
+    entity_patterns = list()
 
     for entity in entities:
         if len(relations) > 0 and not ignore:
-            (
-                regular_subgraph,
-                inverse_subgraph,
-            ) = get_subgraphs_for_entity_with_relations(
-                entity, relations, hops, relation_pos, limit
+            queries = get_queries_for_entity_with_relations(
+                entity,
+                relations,
+                hops,
+                relation_pos,
+                options.limit,
+                options.exclude,
+                options.language,
             )
-
-            sub_graphs.append((entity, regular_subgraph, inverse_subgraph))
+            patterns: List[Tuple[Optional[URIRef], bool]] = [
+                (relation, False) for relation in relations
+            ] + [(relation, True) for relation in relations]
         elif len(relations) == 0 and not ignore:
-            sub_graphs.append((entity, Graph(), Graph()))
+            queries = (list(), list())
+            patterns = list()
         else:
-            (
-                regular_subgraph,
-                inverse_subgraph,
-            ) = get_subgraphs_for_entity_without_relations(entity, hops, limit)
+            queries = get_queries_for_entity_without_relations(
+                entity, hops, options.limit, options.exclude, options.language
+            )
+            patterns = [(None, False), (None, True)]
+
+        entity_queries.append(queries)
+        entity_patterns.append(patterns)
+
+    return entity_queries, entity_patterns
+
+
+def _select_from_neighborhoods(
+    entities: List[URIRef],
+    entity_patterns: List[List[Tuple[Optional[URIRef], bool]]],
+    entity_results: List[List[Optional[List[Tuple[Node, Node, Node]]]]],
+    options: SubgraphOptions,
+    budget: float,
+) -> None:
+    # the queries, which a neighborhood cannot answer, stay None
+    if options.neighborhoods is None or not any(entity_patterns) or budget <= 0:
+        return
+
+    entity_neighborhoods = options.neighborhoods.get_all(
+        entities, options.max_workers, budget
+    )
+
+    for index, neighborhood in enumerate(entity_neighborhoods):
+        if neighborhood is not None:
+            entity_results[index] = [
+                neighborhood.select(
+                    relation, inverse, options.limit, options.exclude, options.language
+                )
+                for relation, inverse in entity_patterns[index]
+            ]
+
+
+def _merge_entity_results(
+    entities: List[URIRef],
+    entity_queries: List[Tuple[List[str], List[str]]],
+    entity_results: List[List[Optional[List[Tuple[Node, Node, Node]]]]],
+    remote_results: List[List[Tuple[Node, Node, Node]]],
+) -> List[Tuple[URIRef, List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]]]]:
+    # the remote results are in the order of the queries, which were not
+    # answered locally
+    remaining = iter(remote_results)
+    sub_graphs = []
 
-            sub_graphs.append((entity, regular_subgraph, inverse_subgraph))
+    for entity, (regular_queries, _), local_results in zip(
+        entities, entity_queries, entity_results
+    ):
+        results = [
+            next(remaining) if local_result is None else local_result
+            for local_result in local_results
+        ]
+        regular_subgraph, inverse_subgraph = _merge_subgraphs(
+            results, len(regular_queries)
+        )
+
+        sub_graphs.append((entity, regular_subgraph, inverse_subgraph))
 
     return sub_graphs
 
 
 def get_subgraphs_for_entity_with_relations(
-    entity: URIRef, relations: List[URIRef], hops: int, relation_pos: int, limit: int
-) -> Graph:
+    entity: URIRef,
+    relations: List[URIRef],
+    hops: int,
+    relation_pos: int,
+    options: Optional[SubgraphOptions] = None,
+) -> Tuple[List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]]]:
     """Extract a subgraph, which takes all relations into consideration.
 
     Given an entity as the center node, extract a subgraph, which contains
@@ -175,56 +345,32 @@ def get_subgraphs_for_entity_with_relations(
         Position of the relations. Setting this parameter to 1 puts the relations
         in the first hop and setting this parameter to 2 puts the relations in the
         second hop.
-    limit : int
-        Limit the number of triples in the subgraphs. Use -1 to not use any limit.
+    options : SubgraphOptions, optional
+        Limit, concurrency, deadline and filters for fetching the subgraph
+        (default: SubgraphOptions()).
 
     Returns
     -------
-    subgraph : Graph
-        The resulting subgraph.
+    regular_triples : list
+        Triples of the regular subgraph.
+    inverse_triples : list
+        Triples of the inverse subgraph.
 
     Raises
     ------
     ValueError
         If a parameter is not valid.
     """
-    regular_subgraph = Graph()
-    inverse_subgraph = Graph()
+    _, regular_triples, inverse_triples = get_subgraph(
+        [entity], relations, hops, relation_pos, False, options
+    )[0]
 
-    for relation in relations:
-        if hops == 1:
-            regular_subgraph += get_regular_subgraph_for_one_hop(
-                entity.n3(), relation.n3(), limit
-            )
-            inverse_subgraph += get_inverse_subgraph_for_one_hop(
-                entity.n3(), relation.n3(), limit
-            )
-        elif hops == 2:
-            if relation_pos == 1:
-                regular_subgraph += get_regular_subgraph_for_two_hops(
-                    entity.n3(), relation.n3(), "?p2", limit
-                )
-                inverse_subgraph += get_inverse_subgraph_for_two_hops(
-                    entity.n3(), relation.n3(), "?p2", limit
-                )
-            elif relation_pos == 2:
-                regular_subgraph += get_regular_subgraph_for_two_hops(
-                    entity.n3(), "?p1", relation.n3(), limit
-                )
-                inverse_subgraph += get_inverse_subgraph_for_two_hops(
-                    entity.n3(), "?p1", relation.n3(), limit
-                )
-            else:
-                raise ValueError("Relation can be only at position 1 or 2.")
-        else:
-            raise ValueError("Number of hops should be in [1, 2]")
-
-    return regular_subgraph, inverse_subgraph
+    return regular_triples, inverse_triples
 
 
 def get_subgraphs_for_entity_without_relations(
-    entity: URIRef, hops: int, limit: int
-) -> Graph:
+    entity: URIRef, hops: int, options: Optional[SubgraphOptions] = None
+) -> Tuple[List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]]]:
     """Extract a subgraph only based on an entity.
 
     Given an entity as the center node, extract a subgraph with all outgoing and
@@ -236,183 +382,263 @@ def get_subgraphs_for_entity_without_relations(
         The entity, which is the center node of the subgraph.
     hops : int
         Number of hops.
-    limit : int
-        Limit the number of triples in the subgraphs. Use -1 to not use any limit.
+    options : SubgraphOptions, optional
+        Limit, concurrency, deadline and filters for fetching the subgraph
+        (default: SubgraphOptions()).
 
     Returns
     -------
-    subgraph : Graph
-        The resulting subgraph.
+    regular_triples : list
+        Triples of the regular subgraph.
+    inverse_triples : list
+        Triples of the inverse subgraph.
 
     Raises
     ------
     ValueError
         If a parameter is not valid.
     """
-    regular_subgraph = Graph()
-    inverse_subgraph = Graph()
+    _, regular_triples, inverse_triples = get_subgraph(
+        [entity], list(), hops, 1, True, options
+    )[0]
 
-    if hops == 1:
-        regular_subgraph += get_regular_subgraph_for_one_hop(entity.n3(), "?p", limit)
-        inverse_subgraph += get_inverse_subgraph_for_one_hop(entity.n3(), "?p", limit)
-    elif hops == 2:
-        regular_subgraph += get_regular_subgraph_for_two_hops(
-            entity.n3(), "?p1", "?p2", limit
-        )
-        inverse_subgraph += get_inverse_subgraph_for_two_hops(
-            entity.n3(), "?p1", "?p2", limit
-        )
-    else:
-        raise ValueError("Number of hops should be in [1, 2]")
+    return regular_triples, inverse_triples
 
-    return regular_subgraph, inverse_subgraph
 
+def _merge_subgraphs(
+    results: List[List[Tuple[Node, Node, Node]]], num_regular: int
+) -> Tuple[List[Tuple[Node, Node, Node]], List[Tuple[Node, Node, Node]]]:
+    # the first results belong to the regular queries, the others to the
+    # inverse queries; dict.fromkeys removes duplicates and keeps the order
+    regular_subgraph = list(
+        dict.fromkeys(triple for result in results[:num_regular] for triple in result)
+    )
+    inverse_subgraph = list(
+        dict.fromkeys(triple for result in results[num_regular:] for triple in result)
+    )
 
-def ask_dbpedia(query: str) -> Graph:
-    """Send a SPARQL-query to DBpedia and get the resulting subgraph.
+    return regular_subgraph, inverse_subgraph
 
-    The query is expected to be a CONSTRUCT-query s.t. a subgraph can be returned.
+
+def get_queries_for_entity_with_relations(
+    entity: URIRef,
+    relations: List[URIRef],
+    hops: int,
+    relation_pos: int,
+    limit: int,
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
+    """Get the CONSTRUCT-queries for a subgraph, which takes all relations into consideration.
 
     Parameters
     ----------
-    query : str
-        A CONSTRUCT-SPARQL-query.
+    entity : URIRef
+        The entity, which is the center node of the subgraph.
+    relations : list
+        List of DBpedia-properties describing the relations.
+    hops : int
+        Number of hops.
+    relation_pos : int
+        Position of the relations in the first or second hop.
+    limit : int
+        Limit the number of triples in the subgraphs. Use -1 to not use any limit.
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
 
     Returns
     -------
-    result : Graph
-        Subgraph contructed by the SPARQL-query.
+    regular_queries : list
+        Queries for the regular subgraph.
+    inverse_queries : list
+        Queries for the inverse subgraph.
+
+    Raises
+    ------
+    ValueError
+        If a parameter is not valid.
     """
-    sparql = SPARQLWrapper("http://dbpedia.org/sparql/")
-    sparql.setQuery(query)
+    regular_queries = list()
+    inverse_queries = list()
 
-    result = sparql.query().convert()
+    for relation in relations:
+        if hops == 1:
+            # entity --relation--> ?o
+            regular_queries.append(
+                get_query_for_one_hop(
+                    entity.n3(), relation.n3(), "?o", limit, exclude, language
+                )
+            )
+            # ?s --relation--> entity
+            inverse_queries.append(
+                get_query_for_one_hop(
+                    "?s", relation.n3(), entity.n3(), limit, exclude, language
+                )
+            )
+        elif hops == 2:
+            if relation_pos == 1:
+                p_1, p_2 = relation.n3(), "?p2"
+            elif relation_pos == 2:
+                p_1, p_2 = "?p1", relation.n3()
+            else:
+                raise ValueError("Relation can be only at position 1 or 2.")
 
-    return result
+            regular_queries.append(
+                get_query_for_two_hops(entity.n3(), p_1, p_2, limit, exclude, language)
+            )
+            inverse_queries.append(
+                get_query_for_two_hops_inverse(
+                    entity.n3(), p_1, p_2, limit, exclude, language
+                )
+            )
+        else:
+            raise ValueError("Number of hops should be in [1, 2]")
 
+    return regular_queries, inverse_queries
 
-def get_regular_subgraph_for_one_hop(entity: str, relation: str, limit: int) -> Graph:
-    """Get the subgraph for a given entity with one hop in regular direction.
 
-    Given an entity, get the the subgraph of the form
-        entity ---> e1
-    where e1 is an entity found by DBpedia.
+def get_queries_for_entity_without_relations(
+    entity: URIRef,
+    hops: int,
+    limit: int,
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
+    """Get the CONSTRUCT-queries for a subgraph only based on an entity.
 
     Parameters
     ----------
-    entity : str
-        Entity as DBpedia-resource or as variable.
-    relation : str
-        Relation as DBpedia-property or as variable.
+    entity : URIRef
+        The entity, which is the center node of the subgraph.
+    hops : int
+        Number of hops.
     limit : int
-        Limit the number of triples in the graph (use -1 to not use any limit).
+        Limit the number of triples in the subgraphs. Use -1 to not use any limit.
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
 
     Returns
     -------
-    regular_graph : Graph
-        Graph, which contains all triples (entity, relation, e1).
-    """
-    regular_graph = Graph()
-
-    # entity --relation--> ?o
-    query = get_query_for_one_hop(entity, relation, "?o", limit)
+    regular_queries : list
+        Queries for the regular subgraph.
+    inverse_queries : list
+        Queries for the inverse subgraph.
 
-    regular_graph += ask_dbpedia(query)
+    Raises
+    ------
+    ValueError
+        If a parameter is not valid.
+    """
+    if hops == 1:
+        regular_query = get_query_for_one_hop(
+            entity.n3(), "?p", "?o", limit, exclude, language
+        )
+        inverse_query = get_query_for_one_hop(
+            "?s", "?p", entity.n3(), limit, exclude, language
+        )
+    elif hops == 2:
+        regular_query = get_query_for_two_hops(
+            entity.n3(), "?p1", "?p2", limit, exclude, language
+        )
+        inverse_query = get_query_for_two_hops_inverse(
+            entity.n3(), "?p1", "?p2", limit, exclude, language
+        )
+    else:
+        raise ValueError("Number of hops should be in [1, 2]")
 
-    return regular_graph
+    return [regular_query], [inverse_query]
 
 
-def get_inverse_subgraph_for_one_hop(entity: str, relation: str, limit: int) -> Graph:
-    """Get the subgraph for a given entity with one hop in inverse direction.
+def ask_dbpedia_concurrently(
+    queries: List[str], max_workers: int = 8, deadline: float = 30.0
+) -> List[List[Tuple[Node, Node, Node]]]:
+    """Send several CONSTRUCT-queries to DBpedia at once.
 
-    Given an entity, get the the subgraph of the form
-        e1 ---> entity
-    where e1 is an entity found by DBpedia.
+    The queries are sent by a bounded pool of threads. Queries, which fail or
+    are not answered before the deadline, result in no triples.
 
     Parameters
     ----------
-    entity : str
-        Entity as DBpedia-resource or as variable.
-    relation : str
-        Relation as DBpedia-property or as variable.
-    limit : int
-        Limit the number of triples in the graph (use -1 to not use any limit).
+    queries : list
+        CONSTRUCT-SPARQL-queries.
+    max_workers : int
+        Maximal number of concurrent queries (default: 8).
+    deadline : float
+        Overall time in seconds for all queries (default: 30.0).
 
     Returns
     -------
-    regular_graph : Graph
-        Graph, which contains all triples (e1, relation, entity).
+    results : list
+        Triples of the subgraphs in the order of the queries.
     """
-    inverse_graph = Graph()
-
-    # ?s --relation--> entity
-    query = get_query_for_one_hop("?s", relation, entity, limit)
-
-    inverse_graph += ask_dbpedia(query)
+    if len(queries) == 0:
+        return list()
 
-    return inverse_graph
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(queries)))
 
+    futures: Dict[Future, int] = {
+        executor.submit(ask_dbpedia, query, deadline): index
+        for index, query in enumerate(queries)
+    }
+    done, not_done = wait(futures, timeout=deadline - (time.monotonic() - start))
 
-def get_regular_subgraph_for_two_hops(
-    entity: str, p_1: str, p_2: str, limit: int
-) -> Graph:
-    """Get subgraph for an entity with two hops in forward direction.
+    executor.shutdown(wait=False, cancel_futures=True)
 
-    Given an entity, contruct a subgraph of the form
-        e1 ---> e2 ---> entity ---> e3 ---> e4
-    where e1, e2, e3, e4 are entities found by DBpedia. In order to
-    increase the performance, the contruction of this graph is splitted
-    into two parts. In the first part a subgraph of the form
-        entity --p_1--> e3 --p-2--> e4
-    is contructed. In the second part a subgraph of the form
-        e1 --p_2--> e2 --p_1--> entity
-    is contructed. Combining these two subgraphes gives the whole
-    graph with the entity as the center node and all outgoing edges
-    of length one or two (length one, if the second hop cannot be found).
+    if len(not_done) > 0:
+        print(
+            f"{len(not_done)} of {len(queries)} subgraph queries exceeded the deadline."
+        )
 
-    Parameters
-    ----------
-    entity : str
-        Entity as DBpedia-resource or as variable.
-    p_1 : str
-        Relation in the first hop as DBpedia-property or as variable.
-    p_2 : str
-        Relation in the second hop as DBpedia-property or as variable.
-    limit : int
-        Limit the number of triples in the graph (use -1 to not use any limit).
+    results: List[List[Tuple[Node, Node, Node]]] = [list() for _ in queries]
 
-    Returns
-    -------
-    result_graph : Graph
-        Graph with the entity as center node and outgoing edges of length one or two.
-    """
-    regular_graph = Graph()
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as exception:  # pylint: disable=broad-except
+            print("Subgraph query failed:", exception)
 
-    # entity --p1--> e1 --p2--> e2
-    query = get_query_for_two_hops(entity, p_1, p_2, limit)
-    regular_graph += ask_dbpedia(query)
+    return results
 
-    return regular_graph
 
+def ask_dbpedia(
+    query: str, timeout: Optional[float] = None
+) -> List[Tuple[Node, Node, Node]]:
+    """Send a SPARQL-query to DBpedia and get the triples of the resulting subgraph.
 
-def get_inverse_subgraph_for_two_hops(
-    entity: str, p_1: str, p_2: str, limit: int
-) -> Graph:
-    """Extract subgraph from entity with two hops.
+    The query is expected to be a CONSTRUCT-query s.t. a subgraph can be returned.
 
-    e2 --p_2--> e1 --p_1--> entity
+    Parameters
+    ----------
+    query : str
+        A CONSTRUCT-SPARQL-query.
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
+    Returns
+    -------
+    result : list
+        Triples (subj, pred, obj) of the subgraph contructed by the SPARQL-query.
     """
-    inverse_graph = Graph()
+    result = endpoints.query_sparql_triples(query, timeout=timeout)
 
-    # e1 --p2--> e2 --p1--> entity
-    query = get_query_for_two_hops_inverse(entity, p_1, p_2, limit)
-    inverse_graph += ask_dbpedia(query)
-
-    return inverse_graph
+    return result
 
 
-def get_query_for_one_hop(subj: str, pred: str, obj: str, limit: int) -> str:
+def get_query_for_one_hop(
+    subj: str,
+    pred: str,
+    obj: str,
+    limit: int,
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> str:
     """Get the query for extracting a subgraph with one hop.
 
     Get the CONSTRUCT-query, which constructs triples of the form
@@ -428,6 +654,11 @@ def get_query_for_one_hop(subj: str, pred: str, obj: str, limit: int) -> str:
         The object of the triples as DBpedia-resource or as variable.
     limit : int
         Limit the number of triples in the graph (use -1 to not use any limit).
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
 
     Returns
     -------
@@ -440,15 +671,26 @@ def get_query_for_one_hop(subj: str, pred: str, obj: str, limit: int) -> str:
         limit_str = f"LIMIT {limit}"
 
     # FILTER(STRSTARTS(STR({pred}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({pred}), "http://dbpedia.org/property/"))
-    # FILTER(STR({pred}) != STR(<http://dbpedia.org/ontology/wikiPageWikiLink>))
-    query = f"""CONSTRUCT WHERE {{
+    filter_str = get_filter_clauses([pred], [obj], exclude, language)
+
+    query = f"""CONSTRUCT {{
         {subj} {pred} {obj}
+    }} WHERE {{
+        {subj} {pred} {obj} .
+        {filter_str}
     }} {limit_str}"""
 
     return query
 
 
-def get_query_for_two_hops(entity: str, p_1: str, p_2: str, limit: int) -> str:
+def get_query_for_two_hops(
+    entity: str,
+    p_1: str,
+    p_2: str,
+    limit: int,
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> str:
     """Get the query for extracting a subgraph with two hops in forward direction.
 
     Get the CONSTRUCT-query, which constructs triples of the form
@@ -464,6 +706,11 @@ def get_query_for_two_hops(entity: str, p_1: str, p_2: str, limit: int) -> str:
         Relation in the second hop as DBpedia-property or as variable.
     limit : int
         Limit the number of triples in the graph (use -1 to not use any limit).
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
 
     Returns
     -------
@@ -477,16 +724,28 @@ def get_query_for_two_hops(entity: str, p_1: str, p_2: str, limit: int) -> str:
 
     # FILTER(STRSTARTS(STR({p_1}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_1}), "http://dbpedia.org/property/"))
     # FILTER(STRSTARTS(STR({p_2}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_2}), "http://dbpedia.org/property/"))
+    filter_str = get_filter_clauses([p_1, p_2], [entity, "?e3"], exclude, language)
 
-    query = f"""CONSTRUCT WHERE {{
+    query = f"""CONSTRUCT {{
+        {entity} {p_1} ?e2 .
+        ?e2 {p_2} ?e3 .
+    }} WHERE {{
         {entity} {p_1} ?e2 .
         ?e2 {p_2} ?e3 .
+        {filter_str}
     }} {limit_str}"""
 
     return query
 
 
-def get_query_for_two_hops_inverse(entity: str, p_1: str, p_2: str, limit: int) -> str:
+def get_query_for_two_hops_inverse(
+    entity: str,
+    p_1: str,
+    p_2: str,
+    limit: int,
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> str:
     """Get the query for extracting a subgraph with two hops in inverse direction.
 
     Get the CONSTRUCT-query, which constructs triples of the form
@@ -502,6 +761,11 @@ def get_query_for_two_hops_inverse(entity: str, p_1: str, p_2: str, limit: int)
         Relation in the second hop as DBpedia-property or as variable.
     limit : int
         Limit the number of triples in the graph (use -1 to not use any limit).
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded by the endpoint (default: none).
+    language : str, optional
+        Language tag of the literals to keep. The filter is evaluated by the
+        endpoint (default: keep all literals).
 
     Returns
     -------
@@ -515,10 +779,15 @@ def get_query_for_two_hops_inverse(entity: str, p_1: str, p_2: str, limit: int)
 
     # FILTER(STRSTARTS(STR({p_1}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_1}), "http://dbpedia.org/property/"))
     # FILTER(STRSTARTS(STR({p_2}), "http://dbpedia.org/ontology/") || STRSTARTS(STR({p_2}), "http://dbpedia.org/property/"))
+    filter_str = get_filter_clauses([p_1, p_2], [entity], exclude, language)
 
-    query = f"""CONSTRUCT WHERE {{
+    query = f"""CONSTRUCT {{
+        ?e1 {p_1} {entity} .
+        ?e2 {p_2} ?e1 .
+    }} WHERE {{
         ?e1 {p_1} {entity} .
         ?e2 {p_2} ?e1 .
+        {filter_str}
     }} {limit_str}"""
 
     return query
@@ -567,14 +836,8 @@ def get_subgraphs_based_on_relations(
     regular_graph = Graph()
     inverse_graph = Graph()
 
-    sparql = SPARQLWrapper("https://dbpedia.org/sparql/")
-    sparql.setMethod("POST")
-
-    sparql.setQuery(query_regular)
-    regular_graph += sparql.query().convert()
-
-    sparql.setQuery(query_inverse)
-    inverse_graph += sparql.query().convert()
+    regular_graph += endpoints.query_sparql_graph(query_regular)
+    inverse_graph += endpoints.query_sparql_graph(query_inverse)
 
     return regular_graph, inverse_graph
 
@@ -620,8 +883,8 @@ if __name__ == "__main__":
         args.question,
         hops=args.jumps,
         relation_pos=args.position,
-        limit=args.limit,
         ignore=args.ignore,
+        options=SubgraphOptions(limit=args.limit),
     )
 
     print("-" * 30)
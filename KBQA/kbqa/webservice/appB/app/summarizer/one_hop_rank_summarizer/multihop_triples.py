@@ -1,56 +1,189 @@
 """A module to summarize the triples for predicates from QALD8, QALD9 and LCQALD data set."""
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import pickle
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
 from typing import Tuple
+from typing import Union
 
-from rdflib.graph import Graph
+from app import endpoints
+from app.summarizer.utils import get_filter_clauses
+from app.summarizer.utils import LinkingContext
 from rdflib.term import Literal
+from rdflib.term import Node
 from rdflib.term import URIRef
-import requests
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.Wrapper import RDFXML
+
+from .neighborhood_cache import NeighborhoodCache
+
+
+class RankTable:
+    """Predicate rank table of a dataset permutation kept in memory.
+
+    The table is unpickled once and indexed by predicate. Additionally, the
+    predicates are split into rank-ordered chunks, which are queried
+    together in one CONSTRUCT query.
+    """
+
+    CHUNK_SIZE = 66
+    MAX_CHUNKS = 17
+
+    def __init__(self, predicate_table: str) -> None:
+        """Load the rank table from a pickle file.
+
+        :param predicate_table: name of the file with predicates from data sets qald8, qald9, lcquad.
+        """
+        with open(predicate_table, "rb") as file:
+            self.predicates: List[Tuple[Tuple, int]] = pickle.load(file)
+
+        self.ranks: Dict[Union[URIRef, Tuple[URIRef, URIRef]], int] = dict(
+            self.predicates
+        )
+        self.chunks: List[List[Tuple[Tuple, int]]] = [
+            self.predicates[start : start + self.CHUNK_SIZE]
+            for start in range(0, len(self.predicates), self.CHUNK_SIZE)
+        ][: self.MAX_CHUNKS]
+
+    def rank(self, predicate: Union[URIRef, Tuple[URIRef, URIRef]]) -> int:
+        """
+        Given a predicate or a two hop predicate path. Its rank is returned.
+
+        :param predicate: URIRef or tuple of two URIRefs.
+        :return: rank of the predicate or 0 if it is not in the table.
+        """
+        return self.ranks.get(predicate, 0)
+
+
+@lru_cache(maxsize=None)
+def load_rank_table(predicate_table: str) -> RankTable:
+    """
+    Given the path of a rank table. The shared in-memory rank table is returned.
+
+    Each table is only loaded once per process and shared by all summarizers and requests.
+    :param predicate_table: name of the file with predicates from data sets qald8, qald9, lcquad.
+    :return: loaded RankTable.
+    """
+    return RankTable(predicate_table)
+
+
+class TripleIndex:
+    """Triples of a query result with hash indexes for deduplication and joins.
+
+    The triples are kept in insertion order. Additionally, they are indexed
+    by subject and predicate, so the triples of an entity and a predicate
+    are found without scanning all triples.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self.triples: List[Tuple[URIRef, URIRef, URIRef]] = []
+        self._seen: Set[Tuple[URIRef, URIRef, URIRef]] = set()
+        self._by_subject: Dict[
+            URIRef, Dict[URIRef, List[Tuple[URIRef, URIRef, URIRef]]]
+        ] = {}
+
+    def __len__(self) -> int:
+        """Return the number of triples."""
+        return len(self.triples)
+
+    def __iter__(self) -> Iterator[Tuple[URIRef, URIRef, URIRef]]:
+        """Iterate over the triples in insertion order."""
+        return iter(self.triples)
+
+    def __contains__(self, triple: object) -> bool:
+        """Return True if the triple is in the index."""
+        return triple in self._seen
+
+    def add(self, triple: Tuple[URIRef, URIRef, URIRef]) -> bool:
+        """
+        Given a triple. The triple is added, if it is not in the index yet.
+
+        :param triple: triple (subject, predicate, object).
+        :return: True if the triple was added.
+        """
+        if triple in self._seen:
+            return False
+
+        self._seen.add(triple)
+        self.triples.append(triple)
+        self._by_subject.setdefault(triple[0], {}).setdefault(triple[1], []).append(
+            triple
+        )
+        return True
+
+    def match(
+        self, subject: URIRef, predicate: URIRef
+    ) -> List[Tuple[URIRef, URIRef, URIRef]]:
+        """
+        Given subject and predicate. All triples with this subject and predicate are returned in insertion order.
+
+        :param subject: subject of the triples.
+        :param predicate: predicate of the triples.
+        :return: list of matching triples.
+        """
+        return self._by_subject.get(subject, {}).get(predicate, [])
 
 
 class Triples_for_pred(ABC):
     """Abstract class for the summarizing triples for each entity."""
 
+    # language tag of the literals, which are kept by the endpoint
+    LANGUAGE: Optional[str] = None
+
+    def __init__(
+        self,
+        exclude: Sequence[str] = (),
+        neighborhoods: Optional[NeighborhoodCache] = None,
+    ) -> None:
+        """
+        Given predicates to exclude and a neighborhood cache. The summarizing object is created.
+
+        :param exclude: predicates in N3 notation, which are not queried as one hop predicates.
+        :param neighborhoods: cache, which answers the one hop predicates locally.
+        """
+        self.exclude = set(exclude)
+        self.neighborhoods = neighborhoods
+
     def ask_for_entities(
-        self, question: str, *, confidence: float
+        self,
+        question: str,
+        *,
+        confidence: float,
+        context: Optional[LinkingContext] = None,
     ) -> Tuple[List[URIRef], float]:
         """Named entities and confidence are returned for a given question.
 
+        If no named entity is found, the confidence is decreased in steps of 0.1. DBpedia spotlight is only asked
+        once with the lowest confidence of the linking context and its results are filtered for each step.
         :param question: The question to be annotated.
         :param confidence: The confidence of the annotation.
+        :param context: linking results of the question shared with other stages.
         :return: dictionary of rdflib.term.URIRef, which are objects for URIs and confidence.
         """
-        confid = round(confidence, 1)
-        # Ask dbpedia spotlight for an annotation of question
-        webserver_address = "https://api.dbpedia-spotlight.org/en/annotate"
-        response = requests.post(
-            webserver_address,
-            data={"text": question, "confidence": confidence},
-            headers={"Accept": "application/json"},
-        ).json()
+        if context is None:
+            context = LinkingContext(question)
+        annotations = context.dbspotlight(LinkingContext.MIN_CONFIDENCE)
+
         named_entities: List[URIRef] = []
-        # If no named entity found
-        if "Resources" not in response and confidence >= 0.1:
-            named_entities, confid = self.ask_for_entities(
-                question, confidence=confidence - 0.1
-            )
-        elif confidence < 0.1:
-            return named_entities, confid
-        elif "Resources" in response and confidence >= 0.1:
-            # Else gather all named entities
-            for resource in response["Resources"]:
-                named_entities.append(URIRef(resource["@URI"]))
-        return named_entities, confid
+        while confidence >= LinkingContext.MIN_CONFIDENCE:
+            named_entities = [
+                entity for entity, score in annotations if score >= confidence
+            ]
+            if named_entities:
+                break
+            confidence = confidence - 0.1
+        return named_entities, round(confidence, 1)
 
     def generate_sparql_string(
         self, entity: URIRef, list_of_predicates: List[Tuple[Tuple, int]]
-    ) -> str:
+    ) -> Optional[str]:
         """
         Given entity and list of predicates. Sparql string for all predicates are returned.
 
@@ -59,105 +192,144 @@ class Triples_for_pred(ABC):
 
         :param entity: URIRef for which the query will be generated.
         :param list_of_predicates: list of predicates one or two hops from data set in sorted order from highest ranked predicate to lowest.
-        :return: Construct sparql string.
+        :return: Construct sparql string or None, if all predicates are excluded.
         """
-        string1 = ""
-        string2 = ""
         subj1 = "<" + str(entity) + ">"
-        first_predicate = True
-        num = 1
+        patterns: List[Tuple[str, str]] = []
         for pred in list_of_predicates:
-            object1 = "?o" + str(num) + "."
-            if len(pred[0]) != 2:
-                pred1 = "<" + str(pred[0]) + ">"
-                string1 = string1 + subj1 + pred1 + object1
-                if first_predicate:
-                    string2 = (
-                        string2 + """WHERE{{""" + subj1 + pred1 + object1 + """}"""
-                    )
-                    first_predicate = False
-                else:
-                    string2 = string2 + """UNION{""" + subj1 + pred1 + object1 + """}"""
-                num = num + 1
-            elif len(pred[0]) == 2:
-                pred1 = "<" + str(pred[0][0]) + ">"
-                pred2 = "<" + str(pred[0][1]) + ">"
-                object1 = "?o" + str(num) + "."
-                object11 = "?o" + str(num)
-                object2 = "?o" + str(num) + "1."
-                string1 = string1 + subj1 + pred1 + object1 + object11 + pred2 + object2
-                if first_predicate:
-                    string2 = (
-                        string2
-                        + """WHERE{{"""
-                        + subj1
-                        + pred1
-                        + object1
-                        + object11
-                        + pred2
-                        + object2
-                        + """}"""
-                    )
-                    first_predicate = False
-                else:
-                    string2 = (
-                        string2
-                        + """UNION{"""
-                        + subj1
-                        + pred1
-                        + object1
-                        + object11
-                        + pred2
-                        + object2
-                        + """}"""
-                    )
-                num = num + 1
-        string1 = """CONSTRUCT{""" + string1 + """}"""
-        string2 = string2 + """}"""
+            pattern = self.get_predicate_pattern(subj1, pred[0], len(patterns) + 1)
+            if pattern is not None:
+                patterns.append(pattern)
+        if not patterns:
+            return None
+        string1 = (
+            """CONSTRUCT{""" + "".join(triples for triples, _ in patterns) + """}"""
+        )
+        string2 = (
+            """WHERE{"""
+            + """UNION""".join("""{""" + where + """}""" for _, where in patterns)
+            + """}"""
+        )
         sparql_string = string1 + string2
 
         return sparql_string
 
+    def get_predicate_pattern(
+        self, subj1: str, predicate: Union[URIRef, Tuple], num: int
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Given subject, predicate and number of the predicate. Triple patterns of the predicate are returned.
+
+        :param subj1: subject of the patterns in N3 notation.
+        :param predicate: predicate of one hop or tuple of the predicates of two hops.
+        :param num: number of the predicate, which names the object variables.
+        :return: patterns for the CONSTRUCT and the WHERE part or None, if the predicate is excluded.
+        """
+        object1 = "?o" + str(num) + "."
+        if len(predicate) != 2:
+            pred1 = "<" + str(predicate) + ">"
+            if pred1 in self.exclude:
+                return None
+            filter1 = get_filter_clauses([], ["?o" + str(num)], language=self.LANGUAGE)
+            triples = subj1 + pred1 + object1
+            return triples, triples + filter1
+        pred1 = "<" + str(predicate[0]) + ">"
+        pred2 = "<" + str(predicate[1]) + ">"
+        object11 = "?o" + str(num)
+        object2 = "?o" + str(num) + "1."
+        filter2 = get_filter_clauses(
+            [], ["?o" + str(num) + "1"], language=self.LANGUAGE
+        )
+        triples = subj1 + pred1 + object1 + object11 + pred2 + object2
+        return triples, triples + filter2
+
     def query_dbpedia_for_all_entities(
-        self, entities: List[URIRef], list_of_predicates: List[Tuple[Tuple, int]]
-    ) -> Graph:
+        self,
+        entities: List[URIRef],
+        list_of_predicates: List[Tuple[Tuple, int]],
+        max_workers: int = 8,
+    ) -> TripleIndex:
         """
         Given list of entities and list of predicates. Subgraph from DBPedia for all entities and predicates will be returned.
 
         This function generate sparql string, send request to DBPedia for all entities and given predicates and combined two subgraphs
-        without triples duplicates.
+        without triples duplicates. The entities are queried concurrently and merged in the order of the entities.
         :param entities: list of entities from the question.
         :param list_of_predicates: predicates from data set in decreasing order according rank.
-        :return: triples_list for all entities without duplicates.
-        """
-        endpoint = "https://dbpedia.org/sparql"
-        triples_list: List[Tuple] = []
-        for entity in entities:
-            sparql_string1 = self.generate_sparql_string(entity, list_of_predicates)
-            sparql = SPARQLWrapper(
-                endpoint,
-                agent="Mozilla/5.0 (Windows NT x.y; Win64; x64; X11; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
+        :param max_workers: maximal number of concurrent queries.
+        :return: triple_index for all entities without duplicates.
+        """
+        triple_index = TripleIndex()
+        if not entities:
+            return triple_index
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(entities)))
+        ) as executor:
+            graphs = list(
+                executor.map(
+                    lambda entity: self.query_dbpedia_for_entity(
+                        entity, list_of_predicates
+                    ),
+                    entities,
+                )
             )
-            sparql.setQuery(sparql_string1)
-            sparql.method = "POST"
-            sparql.setReturnFormat(RDFXML)
-            graph_first_query = sparql.query().convert()
-            triples_list = self.add_new_triples_without_duplicates_to_triples_list(
-                triples_list, graph_first_query
+
+        for graph in graphs:
+            triple_index = self.add_new_triples_without_duplicates_to_triples_list(
+                triple_index, graph
             )
-        return triples_list
+        return triple_index
+
+    def query_dbpedia_for_entity(
+        self, entity: URIRef, list_of_predicates: List[Tuple[Tuple, int]]
+    ) -> List[Tuple[Node, Node, Node]]:
+        """
+        Given entity and list of predicates. Triples of the entity for all predicates are returned.
+
+        The one hop predicates are answered from the cached neighborhood of the entity, if it contains all their
+        triples. Only the other predicates are sent to DBPedia in one construct query.
+        :param entity: URIRef for which the triples are queried.
+        :param list_of_predicates: predicates from data set in decreasing order according rank.
+        :return: triples of the entity, the local triples first.
+        """
+        neighborhood = None
+        if self.neighborhoods is not None:
+            neighborhood = self.neighborhoods.get(
+                entity, endpoints.client.default_timeout
+            )
+
+        triples: List[Tuple[Node, Node, Node]] = []
+        remote_predicates = []
+        for pred in list_of_predicates:
+            if len(pred[0]) != 2:
+                if "<" + str(pred[0]) + ">" in self.exclude:
+                    continue
+                if neighborhood is not None:
+                    local_triples = neighborhood.select(
+                        URIRef(pred[0]), False, -1, language=self.LANGUAGE
+                    )
+                    if local_triples is not None:
+                        triples.extend(local_triples)
+                        continue
+            remote_predicates.append(pred)
+
+        sparql_string = self.generate_sparql_string(entity, remote_predicates)
+        if sparql_string is not None:
+            triples.extend(endpoints.query_sparql_triples(sparql_string))
+        return triples
 
     @abstractmethod
     def add_new_triples_without_duplicates_to_triples_list(
-        self, triples_list: List[Tuple], graph: Graph
-    ) -> List[Tuple]:
+        self, triple_index: TripleIndex, graph: Iterable[Tuple[Node, Node, Node]]
+    ) -> TripleIndex:
         """
         Given a subgraph from DBPedia with triples. Triples added to previous triples list without duplicates are returned.
 
         This function adds triples from the DBPedia graph to list of all triples without duplicates
         and without triples with "Literal" not in English language.
-        :param graph: subgraph of DBPedia.
-        :param triples_list: previous triples list, where new triples will be added.
+        :param graph: triples of a subgraph of DBPedia.
+        :param triple_index: previous triples, where new triples will be added.
         """
 
     def add_new_triples_without_duplicates_to_dict(
@@ -184,7 +356,7 @@ class Triples_for_pred(ABC):
         self,
         entity: URIRef,
         predicate: URIRef,
-        triples_list: List[Tuple[URIRef, URIRef, URIRef]],
+        triple_index: TripleIndex,
         triples_dict_sorted: Dict[Tuple[URIRef, URIRef, URIRef], int],
         number_triples_each_predicate: int = 7,
     ) -> Dict[Tuple[URIRef, URIRef, URIRef], int]:
@@ -194,32 +366,26 @@ class Triples_for_pred(ABC):
         This function adds two hops triples with rank for given entity and predicate in right order and necessary number in final triples list.
         :param entity: URIRef of entity from the question.
         :param predicate: URIRef of predicate.
-        :param triples_list: triples_list to add.
+        :param triple_index: indexed triples to add.
         :param triples_dict_sorted: dictionary with triple-rank in decreasing order.
         :param number_triples_each_predicate: how many triples for each predicate are needed.
         :return: triples_dict_sorted with new triples.
         """
         break_flag = False
         i = 0
-        for triple in triples_list:
-            if predicate[0][0] == triple[1] and entity == triple[0]:
-                for triple1 in triples_list:
-                    if predicate[0][1] == triple1[1] and triple[2] == triple1[0]:
-                        triples_dict_sorted = (
-                            self.add_new_triples_without_duplicates_to_dict(
-                                triple, predicate, triples_dict_sorted
-                            )
-                        )
-                        i = i + 1
-                        triples_dict_sorted = (
-                            self.add_new_triples_without_duplicates_to_dict(
-                                triple1, predicate, triples_dict_sorted
-                            )
-                        )
-                        i = i + 1
-                        if i == number_triples_each_predicate:
-                            break_flag = True
-                            break
+        for triple in triple_index.match(entity, predicate[0][0]):
+            for triple1 in triple_index.match(triple[2], predicate[0][1]):
+                triples_dict_sorted = self.add_new_triples_without_duplicates_to_dict(
+                    triple, predicate, triples_dict_sorted
+                )
+                i = i + 1
+                triples_dict_sorted = self.add_new_triples_without_duplicates_to_dict(
+                    triple1, predicate, triples_dict_sorted
+                )
+                i = i + 1
+                if i == number_triples_each_predicate:
+                    break_flag = True
+                    break
             if break_flag:
                 break
         return triples_dict_sorted
@@ -228,7 +394,7 @@ class Triples_for_pred(ABC):
         self,
         entity: URIRef,
         predicate: URIRef,
-        triples_list: List[Tuple[URIRef, URIRef, URIRef]],
+        triple_index: TripleIndex,
         triples_dict_sorted: Dict[Tuple[URIRef, URIRef, URIRef], int],
         number_triples_each_predicate: int = 7,
     ) -> Dict[Tuple[URIRef, URIRef, URIRef], int]:
@@ -239,25 +405,22 @@ class Triples_for_pred(ABC):
         number in final triples list.
         :param entity: URIRef of entity from the question.
         :param predicate: URIRef of predicate.
-        :param triples_list: triples_list to add.
+        :param triple_index: indexed triples to add.
         :param triples_dict_sorted: dictionary with triple-rank in decreasing order.
         :param number_triples_each_predicate: how many triples for each predicate are needed.
         :return: triples_dict_sorted with new triples.
         """
-        i = 0
-        for triple in triples_list:
-            if predicate[0] == triple[1] and entity == triple[0]:
-                triples_dict_sorted = self.add_new_triples_without_duplicates_to_dict(
-                    triple, predicate, triples_dict_sorted
-                )
-                i = i + 1
-                if i == number_triples_each_predicate:
-                    break
+        for triple in triple_index.match(entity, predicate[0])[
+            0:number_triples_each_predicate
+        ]:
+            triples_dict_sorted = self.add_new_triples_without_duplicates_to_dict(
+                triple, predicate, triples_dict_sorted
+            )
         return triples_dict_sorted
 
     def sort_triples_from_the_query(
         self,
-        triples_list: List[Tuple[URIRef, URIRef, URIRef]],
+        triple_index: TripleIndex,
         entities: List[URIRef],
         rank_table: List[Tuple[URIRef, int]],
         triples_dict_sorted: Dict[Tuple[URIRef, URIRef, URIRef], int],
@@ -265,7 +428,7 @@ class Triples_for_pred(ABC):
         """
         Given a triples list from DBPedia and entities from the question, rank table with ranks in decreasing order. Triples for each predicate and each entity in sorted order will be returned.
 
-        :param triples_list: triples for each entity and each predicate.
+        :param triple_index: indexed triples for each entity and each predicate.
         :param entities: dictionary of entities from the question.
         :param rank_table: list with tuples predicate:rank.
         :param triples_dict_sorted: list with previous triples and ranks.
@@ -275,11 +438,11 @@ class Triples_for_pred(ABC):
             for entity in entities:
                 if len(predicate[0]) == 2:
                     triples_dict_sorted = self.add_triples_for_entity_hop(
-                        entity, predicate, triples_list, triples_dict_sorted
+                        entity, predicate, triple_index, triples_dict_sorted
                     )
                 else:
                     triples_dict_sorted = self.add_triples_for_entity(
-                        entity, predicate, triples_list, triples_dict_sorted
+                        entity, predicate, triple_index, triples_dict_sorted
                     )
         return triples_dict_sorted
 
@@ -308,7 +471,7 @@ class Triples_for_pred(ABC):
     def get_triples_final(
         self,
         question: str,
-        predicate_table: str,
+        predicate_table: Union[str, RankTable],
         number_of_trip: int,
         confidence: float,
     ) -> List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]:
@@ -319,89 +482,142 @@ class Triples_for_pred(ABC):
         in ranked order. The sparql requests will be sent until necessary number of triples are in the final list.
 
         :param question: question string in natural language.
-        :param predicate_table: name of the file with predicates from data sets qald8, qald9, lcquad.
+        :param predicate_table: loaded RankTable or name of the file with predicates from data sets qald8, qald9, lcquad.
         :param number_of_trip: how many triples are needed.
         :param confidence: confidence score.
 
         :return: triples_list_sorted with triples and rank.
         """
-        entities, confidence = self.ask_for_entities(question, confidence=confidence)
+        final_triples_list: List[
+            Tuple[Tuple[URIRef, URIRef, URIRef], float, float]
+        ] = []
+        for new_triples in self.iter_triples_final(
+            question, predicate_table, confidence
+        ):
+            final_triples_list.extend(new_triples)
+            if len(final_triples_list) >= number_of_trip:
+                break
+        return final_triples_list[0:number_of_trip]
+
+    def iter_triples_final(
+        self,
+        question: str,
+        predicate_table: Union[str, RankTable],
+        confidence: float = 0.8,
+        min_rank: int = 0,
+        min_confidence: float = 0.0,
+        max_workers: int = 8,
+        context: Optional[LinkingContext] = None,
+    ) -> Iterator[List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]]:
+        """
+        Given question string and predicate_table. The new ranked triples of each chunk of predicates are yielded.
+
+        This function sends one sparql query per entity for each chunk of predicates in ranked order. The next chunk is
+        only queried, when the caller asks for more triples, so the caller can stop as soon as it has enough triples.
+        No queries are sent, if the confidence of the entities is below min_confidence, and the trailing chunks with ranks
+        below min_rank are skipped, because their triples would be filtered anyway.
+
+        :param question: question string in natural language.
+        :param predicate_table: loaded RankTable or name of the file with predicates from data sets qald8, qald9, lcquad.
+        :param confidence: confidence score.
+        :param min_rank: lowest rank of the triples the caller keeps.
+        :param min_confidence: lowest confidence of the triples the caller keeps.
+        :param max_workers: maximal number of concurrent queries for the entities.
+        :param context: linking results of the question shared with other stages.
+        :return: iterator over the lists of new tuples (triple, rank, confidence) for each chunk.
+        """
+        entities, confidence = self.ask_for_entities(
+            question, confidence=confidence, context=context
+        )
         triples_dict_sorted: Dict[Tuple[URIRef, URIRef, URIRef], int] = {}
-        triples_list_sorted: List[Tuple[Tuple[URIRef, URIRef, URIRef], int]] = []
 
-        with open(predicate_table, "rb") as file:
-            predicates_table = pickle.load(file)
-
-        num_of_query = 0
-        first_pred = 0
-        last_pred = 66
-        while len(triples_list_sorted) < number_of_trip and num_of_query < 17:
-            triples_list = self.query_dbpedia_for_all_entities(
-                entities, predicates_table[first_pred:last_pred]
+        if isinstance(predicate_table, str):
+            predicate_table = load_rank_table(predicate_table)
+
+        if not entities or confidence < min_confidence:
+            return
+
+        for chunk in self.get_chunks(predicate_table, min_rank):
+            num_of_triples = len(triples_dict_sorted)
+            triple_index = self.query_dbpedia_for_all_entities(
+                entities, chunk, max_workers=max_workers
             )
             triples_dict_sorted = self.sort_triples_from_the_query(
-                triples_list,
+                triple_index,
                 entities,
-                predicates_table[first_pred:last_pred],
+                chunk,
                 triples_dict_sorted,
             )
-            triples_list_sorted = list(triples_dict_sorted.items())
-            num_of_query = num_of_query + 1
-            first_pred = first_pred + 66
-            last_pred = last_pred + 66
-        triples_list_sorted = triples_list_sorted[0:number_of_trip]
-        final_triples_list = self.add_confidence(triples_list_sorted, confidence)
-        return final_triples_list
+            triples_list_sorted = list(triples_dict_sorted.items())[num_of_triples:]
+            yield self.add_confidence(triples_list_sorted, confidence)
+
+    @staticmethod
+    def get_chunks(
+        predicate_table: RankTable, min_rank: int
+    ) -> List[List[Tuple[Tuple, int]]]:
+        """
+        Given predicate_table and min_rank. The chunks of predicates, which have to be queried, are returned.
+
+        Only the trailing chunks with ranks below min_rank are skipped. The earlier ones are still queried,
+        because the triples they claim first must not be yielded again for a later chunk.
+        :param predicate_table: loaded RankTable.
+        :param min_rank: lowest rank of the triples the caller keeps.
+        :return: chunks of (predicate, rank) in ranked order.
+        """
+        chunks = predicate_table.chunks
+        while chunks and max(rank for _, rank in chunks[-1]) < min_rank:
+            chunks = chunks[:-1]
+        return chunks
 
 
 class Triples_for_pred_with_filter(Triples_for_pred):
     """Class for the summarizing triples for each entity with filtering of triples."""
 
+    LANGUAGE = "en"
+
     def add_new_triples_without_duplicates_to_triples_list(
-        self, triples_list: List[Tuple], graph: Graph
-    ) -> List[Tuple]:
+        self, triple_index: TripleIndex, graph: Iterable[Tuple[Node, Node, Node]]
+    ) -> TripleIndex:
         """
         Given a subgraph from DBPedia with triples. Triples added to previous triples list without duplicates are returned.
 
         This function adds triples from the DBPedia graph to list of all triples without duplicates
         and without triples with "Literal" not in English language.
-        :param graph: subgraph of DBPedia.
-        :param triples_list: previous triples list, where new triples will be added.
-        :return: triples_list with new triples.
+        :param graph: triples of a subgraph of DBPedia.
+        :param triple_index: previous triples, where new triples will be added.
+        :return: triple_index with new triples.
         """
         for triple in graph:
-            if triple not in triples_list:
-                if not isinstance(triple[2], Literal):
-                    triples_list.append(triple)
-                elif isinstance(triple[2], Literal) and triple[2].language == "en":
-                    triples_list.append(triple)
+            if not isinstance(triple[2], Literal):
+                triple_index.add(triple)
+            elif isinstance(triple[2], Literal) and triple[2].language == "en":
+                triple_index.add(triple)
 
-        return triples_list
+        return triple_index
 
 
 class Triples_for_pred_no_filter(Triples_for_pred):
     """Class for the summarizing triples for each entity without filtering of triples."""
 
     def add_new_triples_without_duplicates_to_triples_list(
-        self, triples_list: List[Tuple], graph: Graph
-    ) -> List[Tuple]:
+        self, triple_index: TripleIndex, graph: Iterable[Tuple[Node, Node, Node]]
+    ) -> TripleIndex:
         """
         Given a subgraph from DBPedia with triples. Triples added to previous triples list without duplicates are returned.
 
-        :param graph: subgraph of DBPedia.
-        :param triples_list: previous triples list, where new triples will be added.
-        :return: triples_list with new triples.
+        :param graph: triples of a subgraph of DBPedia.
+        :param triple_index: previous triples, where new triples will be added.
+        :return: triple_index with new triples.
         """
         for triple in graph:
-            if triple not in triples_list:
-                triples_list.append(triple)
+            triple_index.add(triple)
 
-        return triples_list
+        return triple_index
 
 
 def triples_for_predicates_all_datasets(
     question: str,
-    predicate_table: str,
+    predicate_table: Union[str, RankTable],
     filtering: bool,
     number_of_triples: int = 100,
     confidence: float = 0.8,
@@ -410,7 +626,7 @@ def triples_for_predicates_all_datasets(
     Given question string, predicate_table. Necessary number of triples in ranked order are returned.
 
     :param question: question string in natural language.
-    :param predicate_table: name of the file with predicates from data sets qald8, qald9, lcquad.
+    :param predicate_table: loaded RankTable or name of the file with predicates from data sets qald8, qald9, lcquad.
     :param filtering: True if we need only triples, where Literal in English.
     :param number_of_triples: how many triples are needed.
     :param confidence: start confidence score.
@@ -435,6 +651,25 @@ def triples_for_predicates_all_datasets(
     return final_triples_list
 
 
+def create_triples_object(
+    filtering: bool,
+    exclude: Sequence[str] = (),
+    neighborhoods: Optional[NeighborhoodCache] = None,
+) -> Triples_for_pred:
+    """
+    Given filtering flag, predicates to exclude and a neighborhood cache. The summarizing object is returned.
+
+    The ranked triples are yielded chunk by chunk by its iter_triples_final.
+    :param filtering: True if we need only triples, where Literal in English.
+    :param exclude: predicates in N3 notation, which are not queried as one hop predicates.
+    :param neighborhoods: cache, which answers the one hop predicates locally.
+    :return: Triples_for_pred_with_filter or Triples_for_pred_no_filter.
+    """
+    if filtering:
+        return Triples_for_pred_with_filter(exclude, neighborhoods)
+    return Triples_for_pred_no_filter(exclude, neighborhoods)
+
+
 def main() -> None:
     """Call triples_for_predicates_all_datasets() to get triples with a rank for predicates from all data sets."""
     triples = triples_for_predicates_all_datasets(
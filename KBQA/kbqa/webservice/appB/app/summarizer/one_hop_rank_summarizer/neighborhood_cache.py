@@ -0,0 +1,350 @@
+"""Cache for the one hop neighborhoods of entities."""
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import threading
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from app import endpoints
+from app.summarizer.utils import get_filter_clauses
+from rdflib import Literal
+from rdflib import URIRef
+from rdflib.term import Node
+
+
+class Neighborhood:
+    """Regular and inverse one hop triples of an entity.
+
+    The triples of each direction are indexed by predicate, so the triples
+    of a relation are found by a dictionary lookup. A direction with more
+    than max_size triples is truncated and only answers selections, which
+    are satisfied by the kept triples.
+
+    Parameters
+    ----------
+    entity : URIRef
+        Center node of the neighborhood.
+    regular : list
+        Triples (entity, pred, obj) in the order of the response.
+    inverse : list
+        Triples (subj, pred, entity) in the order of the response.
+    max_size : int
+        Maximal number of triples of a complete direction.
+    excluded : list, optional
+        Predicates in N3 notation, which were excluded when fetching the
+        triples (default: none).
+    """
+
+    def __init__(
+        self,
+        entity: URIRef,
+        regular: List[Tuple[Node, Node, Node]],
+        inverse: List[Tuple[Node, Node, Node]],
+        max_size: int,
+        excluded: Sequence[str] = (),
+    ) -> None:
+        self.entity = entity
+        self.created = time.monotonic()
+        self.excluded = frozenset(excluded)
+
+        self.triples = (regular[:max_size], inverse[:max_size])
+        self.complete = (len(regular) <= max_size, len(inverse) <= max_size)
+        self._by_predicate: Tuple[Dict[Node, List[Tuple[Node, Node, Node]]], ...] = (
+            _index_by_predicate(self.triples[0]),
+            _index_by_predicate(self.triples[1]),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of kept triples of both directions."""
+        return len(self.triples[0]) + len(self.triples[1])
+
+    def select(
+        self,
+        relation: Optional[URIRef],
+        inverse: bool,
+        limit: int,
+        exclude: Sequence[str] = (),
+        language: Optional[str] = None,
+    ) -> Optional[List[Tuple[Node, Node, Node]]]:
+        """Select the triples of a one hop query locally.
+
+        The selection corresponds to the query of get_query_for_one_hop with
+        the entity as subject (regular) or object (inverse).
+
+        Parameters
+        ----------
+        relation : URIRef, optional
+            Predicate of the triples or None for all predicates.
+        inverse : bool
+            Select the triples with the entity as object if True.
+        limit : int
+            Limit the number of triples (use -1 to not use any limit).
+        exclude : list, optional
+            Predicates in N3 notation, which are excluded, if no relation is
+            given (default: none).
+        language : str, optional
+            Language tag of the literal objects to keep (default: keep all
+            literals).
+
+        Returns
+        -------
+        list or None
+            Selected triples or None, if the neighborhood does not contain
+            all triples of the selection.
+        """
+        direction = 1 if inverse else 0
+
+        if relation is None:
+            # triples of predicates, which were excluded when fetching, are missing
+            if not self.excluded.issubset(exclude):
+                return None
+
+            excluded = {URIRef(pred[1:-1]) for pred in exclude}
+            triples = [
+                triple
+                for triple in self.triples[direction]
+                if triple[1] not in excluded
+            ]
+        else:
+            if relation.n3() in self.excluded:
+                return None
+
+            triples = self._by_predicate[direction].get(relation, list())
+
+        # the object of inverse triples is the entity
+        if language is not None and not inverse:
+            triples = [
+                triple
+                for triple in triples
+                if not isinstance(triple[2], Literal) or triple[2].language == language
+            ]
+
+        if -1 < limit <= len(triples):
+            return triples[:limit]
+
+        if self.complete[direction]:
+            return list(triples)
+
+        return None
+
+
+class NeighborhoodCache:
+    """Cache for the one hop neighborhoods of frequent entities.
+
+    The neighborhood of an entity is fetched with two concurrent
+    CONSTRUCT-queries and kept for ttl seconds, so the relation specific and ranked one hop
+    queries of later questions are answered locally. The least recently used
+    neighborhoods are dropped, if more than max_entities are cached.
+
+    Parameters
+    ----------
+    max_entities : int, optional
+        Maximal number of cached neighborhoods (default: 256).
+    ttl : float, optional
+        Time in seconds, after which a neighborhood is fetched again
+        (default: 3600).
+    max_size : int, optional
+        Maximal number of triples of each direction of a neighborhood. Larger
+        neighborhoods are truncated (default: 5000).
+    exclude : list, optional
+        Predicates in N3 notation, which are not fetched (default: none).
+    """
+
+    def __init__(
+        self,
+        max_entities: int = 256,
+        ttl: float = 3600.0,
+        max_size: int = 5000,
+        exclude: Sequence[str] = (),
+    ) -> None:
+        self.max_entities = max_entities
+        self.ttl = ttl
+        self.max_size = max_size
+        self.exclude = list(exclude)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._neighborhoods: "OrderedDict[URIRef, Neighborhood]" = OrderedDict()
+        self._pending: Dict[URIRef, threading.Event] = dict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, entity: URIRef, timeout: Optional[float] = None
+    ) -> Optional[Neighborhood]:
+        """Get the neighborhood of an entity and fetch it, if it is not cached.
+
+        Concurrent calls for the same entity wait for the first fetch.
+
+        Parameters
+        ----------
+        entity : URIRef
+            Center node of the neighborhood.
+        timeout : float, optional
+            Timeout of the requests in seconds (default: endpoints.client.default_timeout).
+
+        Returns
+        -------
+        Neighborhood or None
+            Neighborhood of the entity or None, if it could not be fetched.
+        """
+        with self._lock:
+            neighborhood = self._lookup(entity)
+
+            if neighborhood is not None:
+                self.hits += 1
+
+                return neighborhood
+
+            event = self._pending.get(entity)
+            owner = event is None
+
+            if event is None:
+                self.misses += 1
+                event = threading.Event()
+                self._pending[entity] = event
+
+        if not owner:
+            event.wait(timeout)
+
+            with self._lock:
+                return self._lookup(entity)
+
+        try:
+            neighborhood = self._fetch(entity, timeout)
+        except Exception as exception:  # pylint: disable=broad-except
+            print("Neighborhood query failed:", exception)
+            neighborhood = None
+
+        with self._lock:
+            if neighborhood is not None:
+                self._neighborhoods[entity] = neighborhood
+
+                while len(self._neighborhoods) > self.max_entities:
+                    self._neighborhoods.popitem(last=False)
+
+            del self._pending[entity]
+
+        event.set()
+
+        return neighborhood
+
+    def get_all(
+        self,
+        entities: List[URIRef],
+        max_workers: int = 8,
+        timeout: Optional[float] = None,
+    ) -> List[Optional[Neighborhood]]:
+        """Get the neighborhoods of several entities at once.
+
+        The fetches, which are not finished after timeout seconds, are left
+        running in the background and still fill the cache for later calls.
+
+        Parameters
+        ----------
+        entities : list
+            Center nodes of the neighborhoods.
+        max_workers : int, optional
+            Maximal number of entities fetched concurrently (default: 8).
+        timeout : float, optional
+            Overall time in seconds for all neighborhoods (default: wait for
+            the requests with endpoints.client.default_timeout).
+
+        Returns
+        -------
+        list
+            Neighborhoods in the order of the entities. A neighborhood is None,
+            if it could not be fetched in time.
+        """
+        if len(entities) == 0:
+            return list()
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(entities)))
+        futures: List[Future] = [
+            executor.submit(self.get, entity, timeout) for entity in entities
+        ]
+        wait(futures, timeout=timeout)
+
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        return [
+            future.result() if future.done() and not future.cancelled() else None
+            for future in futures
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        """Get the counters of the cache.
+
+        Returns
+        -------
+        dict
+            Number of hits, misses and cached neighborhoods.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._neighborhoods),
+            }
+
+    def _lookup(self, entity: URIRef) -> Optional[Neighborhood]:
+        neighborhood = self._neighborhoods.get(entity)
+
+        if neighborhood is None:
+            return None
+
+        if self.ttl > 0 and time.monotonic() - neighborhood.created > self.ttl:
+            del self._neighborhoods[entity]
+
+            return None
+
+        self._neighborhoods.move_to_end(entity)
+
+        return neighborhood
+
+    def _fetch(self, entity: URIRef, timeout: Optional[float]) -> Neighborhood:
+        filter_str = get_filter_clauses(["?p"], [], self.exclude)
+
+        # one more triple than kept reveals a truncated direction
+        regular_query = f"""CONSTRUCT {{
+        {entity.n3()} ?p ?o
+    }} WHERE {{
+        {entity.n3()} ?p ?o .
+        {filter_str}
+    }} LIMIT {self.max_size + 1}"""
+        inverse_query = f"""CONSTRUCT {{
+        ?s ?p {entity.n3()}
+    }} WHERE {{
+        ?s ?p {entity.n3()} .
+        {filter_str}
+    }} LIMIT {self.max_size + 1}"""
+
+        # both directions are fetched concurrently within the timeout
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            regular = pool.submit(
+                endpoints.query_sparql_triples, regular_query, timeout=timeout
+            )
+            inverse = pool.submit(
+                endpoints.query_sparql_triples, inverse_query, timeout=timeout
+            )
+
+            return Neighborhood(
+                entity, regular.result(), inverse.result(), self.max_size, self.exclude
+            )
+
+
+def _index_by_predicate(
+    triples: List[Tuple[Node, Node, Node]]
+) -> Dict[Node, List[Tuple[Node, Node, Node]]]:
+    index: Dict[Node, List[Tuple[Node, Node, Node]]] = dict()
+
+    for triple in triples:
+        index.setdefault(triple[1], list()).append(triple)
+
+    return index
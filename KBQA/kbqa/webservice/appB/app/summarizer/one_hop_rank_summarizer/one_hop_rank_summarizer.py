@@ -2,15 +2,88 @@
 from math import inf
 import os
 import time
-from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 from app.summarizer import BaseSummarizer
+from app.summarizer.utils import LinkingContext
+import numpy as np
 from rdflib import URIRef
 
 from .entity_relation_hops import entity_relation_hops
-from .multihop_triples import triples_for_predicates_all_datasets
+from .entity_relation_hops import SubgraphOptions
+from .multihop_triples import create_triples_object
+from .multihop_triples import load_rank_table
+from .neighborhood_cache import NeighborhoodCache
+from .triple_table import TripleTable
+
+
+class FetchConfig:
+    """Settings for fetching the triples of the OneHopRankSummarizer.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        Set a timeout in seconds between requests. This might avoid some connection
+        errors (default: 0).
+    max_workers : int, optional
+        Maximal number of concurrent subgraph queries to DBpedia (default: 8).
+    deadline : float, optional
+        Overall time in seconds for fetching the one hop subgraphs of a question
+        (default: 30.0).
+    neighborhood_entities : int, optional
+        Maximal number of entities, whose one hop neighborhoods are cached to answer
+        the one hop queries locally. Use 0 to disable the cache (default: 0).
+    neighborhood_ttl : float, optional
+        Time in seconds, after which a cached neighborhood is fetched again
+        (default: 3600.0).
+    neighborhood_size : int, optional
+        Maximal number of triples in each direction of a cached neighborhood
+        (default: 5000).
+    """
+
+    def __init__(
+        self,
+        timeout: float = 0,
+        max_workers: int = 8,
+        deadline: float = 30.0,
+        neighborhood_entities: int = 0,
+        neighborhood_ttl: float = 3600.0,
+        neighborhood_size: int = 5000,
+    ) -> None:
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.neighborhood_entities = neighborhood_entities
+        self.neighborhood_ttl = neighborhood_ttl
+        self.neighborhood_size = neighborhood_size
+
+    def create_neighborhood_cache(
+        self, exclude: Sequence[str]
+    ) -> Optional[NeighborhoodCache]:
+        """Create the cache for the one hop neighborhoods, if it is enabled.
+
+        Parameters
+        ----------
+        exclude : list
+            Predicates in N3 notation, which are not fetched.
+
+        Returns
+        -------
+        NeighborhoodCache or None
+            Cache for the neighborhoods or None, if neighborhood_entities is 0.
+        """
+        if self.neighborhood_entities <= 0:
+            return None
+
+        return NeighborhoodCache(
+            self.neighborhood_entities,
+            self.neighborhood_ttl,
+            self.neighborhood_size,
+            exclude=exclude,
+        )
 
 
 class OneHopRankSummarizer(BaseSummarizer):
@@ -36,9 +109,9 @@ class OneHopRankSummarizer(BaseSummarizer):
         default: -1).
     filtering : bool, optional
         Filter all resources and predicates, which don't have an @en tag (default: True).
-    timeout : float, optional
-        Set a timeout in seconds between requests. This might avoid some connection
-        errors (default: 0).
+    fetch : FetchConfig, optional
+        Timeout, concurrency, deadline and neighborhood cache for fetching the
+        triples (default: FetchConfig()).
     verbose : bool
         Print some statemets if True (default: True).
 
@@ -60,6 +133,7 @@ class OneHopRankSummarizer(BaseSummarizer):
         "<http://dbpedia.org/ontology/abstract>",
         "<http://dbpedia.org/wikiPageWikiLink>",
     ]
+    EXCLUDED_PREDICATES = [URIRef(predicate[1:-1]) for predicate in EXCLUDE]
 
     def __init__(
         self,
@@ -69,7 +143,7 @@ class OneHopRankSummarizer(BaseSummarizer):
         max_triples: int = 3,
         limit: int = -1,
         filtering: bool = True,
-        timeout: float = 0,
+        fetch: Optional[FetchConfig] = None,
         verbose: bool = True,
     ) -> None:
 
@@ -79,15 +153,21 @@ class OneHopRankSummarizer(BaseSummarizer):
         if lower_rank < 1:
             raise ValueError("Lower rank cannot be smaller than 1")
 
-        self.datasets = datasets
         self.confidence = confidence
         self.lower_rank = lower_rank
         self.max_triples = max_triples
         self.limit = limit
-        self.filtering = filtering
-        self.timeout = timeout
+        self.fetch = FetchConfig() if fetch is None else fetch
         self.verbose = verbose
 
+        self.neighborhoods = self.fetch.create_neighborhood_cache(self.EXCLUDE)
+        self.ranked_triples = create_triples_object(
+            filtering, self.EXCLUDE, self.neighborhoods
+        )
+        self.rank_table = load_rank_table(
+            os.path.join(os.path.dirname(__file__), f"pickle_objects/{datasets}.pickle")
+        )
+
     def summarize(self, question: str) -> List[str]:
         """Summarize a subgraph for a given question.
 
@@ -101,12 +181,9 @@ class OneHopRankSummarizer(BaseSummarizer):
         list
             List containing the triples in the format <subj> <pred> <obj>.
         """
-        # ------------------------------ one hop triples ------------------------------
-        triples = self.summarize_ranks_confidence(question)
+        table, rows = self._summarize_table(question)
 
-        formated_triples = self._format_triples(triples)
-
-        return formated_triples
+        return table.format(rows)
 
     def summarize_ranks_confidence(
         self, question: str
@@ -126,8 +203,16 @@ class OneHopRankSummarizer(BaseSummarizer):
             the triple and confidence is the confidence score of the recognized entity
             in the triple.
         """
+        table, rows = self._summarize_table(question)
+
+        return table.to_list(rows)
+
+    def _summarize_table(self, question: str) -> Tuple[TripleTable, np.ndarray]:
+        table = TripleTable()
+
         # ------------------------------ one hop triples ------------------------------
-        entities, graph_triples = self._get_graph_triples(question)
+        context = LinkingContext(question)
+        entities = self._add_graph_triples(question, context, table)
 
         if self.verbose:
             print(
@@ -137,41 +222,53 @@ class OneHopRankSummarizer(BaseSummarizer):
         # ------------------------------ one hop triples ------------------------------
 
         # timeout
-        time.sleep(self.timeout)
+        time.sleep(self.fetch.timeout)
 
         # ------------------------------ ranking ------------------------------
-        dataset = os.path.join(
-            os.path.dirname(__file__), f"pickle_objects/{self.datasets}.pickle"
-        )
-        ranked_triples = triples_for_predicates_all_datasets(
-            question, dataset, self.filtering, number_of_triples=9999999
-        )
-        # ------------------------------ ranking ------------------------------
+        rows = self._select_triples(table)
+
+        # the chunks are fetched in rank order and only append triples, so
+        # fetching stops as soon as the limit is reached
+        if not self._limit_reached(rows):
+            for new_triples in self.ranked_triples.iter_triples_final(
+                question,
+                self.rank_table,
+                min_rank=self.lower_rank,
+                min_confidence=self.confidence,
+                max_workers=self.fetch.max_workers,
+                context=context,
+            ):
+                table.extend(new_triples)
 
-        all_triples = graph_triples + ranked_triples
+                rows = self._select_triples(table)
 
-        filtered_triples = self._filter_triples(all_triples)
-        aggregated_triples = self._aggregate_triples(filtered_triples)
+                if self._limit_reached(rows):
+                    break
+        # ------------------------------ ranking ------------------------------
 
         if self.limit > -1:
-            limited_triples = self._limit_triples(aggregated_triples)
-        else:
-            limited_triples = aggregated_triples
+            rows = rows[: self.limit]
 
-        return limited_triples
+        return table, rows
 
-    def _get_graph_triples(
-        self, question: str
-    ) -> Tuple[List[URIRef], List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]]:
+    def _add_graph_triples(
+        self, question: str, context: LinkingContext, table: TripleTable
+    ) -> List[URIRef]:
         entities = list()
-        triples = list()
 
         one_hop_graphs = entity_relation_hops(
             question,
             confidence=self.confidence,
             hops=1,
             relation_pos=1,
-            limit=self.max_triples,
+            context=context,
+            options=SubgraphOptions(
+                limit=self.max_triples,
+                max_workers=self.fetch.max_workers,
+                deadline=self.fetch.deadline,
+                exclude=self.EXCLUDE,
+                neighborhoods=self.neighborhoods,
+            ),
         )
 
         for one_hop_graph in one_hop_graphs:
@@ -182,77 +279,19 @@ class OneHopRankSummarizer(BaseSummarizer):
 
             entities.append(entity)
 
-            for subj, pred, obj in regular_graph:
-                triple = (subj, pred, obj)
-
-                triples.append((triple, inf, confidence))
-
-            for subj, pred, obj in inverse_graph:
-                triple = (subj, pred, obj)
-
-                triples.append((triple, inf, confidence))
+            for triple in regular_graph:
+                table.add(triple, inf, confidence)
 
-        return entities, triples
+            for triple in inverse_graph:
+                table.add(triple, inf, confidence)
 
-    def _filter_triples(
-        self, triples: List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]
-    ) -> List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]:
-        updated_triples = list()
-
-        for triple in triples:
-            # check rank, predicate and confidence
-            if (
-                triple[1] >= self.lower_rank
-                and triple[0][1].n3() not in self.EXCLUDE
-                and triple[2] >= self.confidence
-            ):
-                updated_triples.append(triple)
-
-        return updated_triples
-
-    def _aggregate_triples(
-        self, triples: List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]
-    ) -> List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]:
-        updated_triples = list()
-        counter_dict: Dict[Tuple, int] = dict()
-
-        for triple in triples:
-            subj, pred = triple[0][0], triple[0][1]
-            if (subj, pred) in counter_dict:
-                if counter_dict[(subj, pred)] < self.max_triples - 1:
-                    counter_dict[(subj, pred)] += 1
-
-                    updated_triples.append(triple)
-            else:
-                counter_dict[(subj, pred)] = 0
-                updated_triples.append(triple)
-
-        return updated_triples
+        return entities
 
-    def _limit_triples(
-        self, triples: List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]
-    ) -> List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]:
-        result = list()
-        counter = 0
-
-        for triple in triples:
-            if counter < self.limit:
-                result.append(triple)
-
-                counter += 1
-
-        return result
-
-    def _format_triples(
-        self, triples: List[Tuple[Tuple[URIRef, URIRef, URIRef], float, float]]
-    ) -> List[str]:
-        formated_triples = list()
-
-        for triple in triples:
-            formated_triple = (
-                f"{triple[0][0].n3()} {triple[0][1].n3()} {triple[0][2].n3()}"
-            )
+    def _select_triples(self, table: TripleTable) -> np.ndarray:
+        # check rank, predicate and confidence
+        rows = table.filter(self.lower_rank, self.confidence, self.EXCLUDED_PREDICATES)
 
-            formated_triples.append(formated_triple)
+        return table.aggregate(rows, self.max_triples)
 
-        return formated_triples
+    def _limit_reached(self, rows: np.ndarray) -> bool:
+        return self.limit > -1 and len(rows) >= self.limit
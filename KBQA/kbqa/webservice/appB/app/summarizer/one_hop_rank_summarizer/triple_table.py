@@ -0,0 +1,223 @@
+"""Compact table of the triples collected by the OneHopRankSummarizer."""
+from array import array
+from math import isinf
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import numpy as np
+from rdflib.term import Node
+
+
+class TripleTable:
+    """Triples with interned terms and parallel arrays for ranks and confidences.
+
+    Every distinct term is stored once and referenced by an integer id. The
+    triples are kept in insertion order in parallel arrays of term ids, ranks
+    and confidences. Hence, the filters of the summarizer run as vectorized
+    passes over the arrays and only the selected triples are formatted.
+    """
+
+    def __init__(self) -> None:
+        self.terms: List[Node] = list()
+        self._ids: Dict[Node, int] = dict()
+        self._n3: Dict[int, str] = dict()
+
+        self.subjects = array("q")
+        self.predicates = array("q")
+        self.objects = array("q")
+        self.ranks = array("d")
+        self.confidences = array("d")
+
+    def __len__(self) -> int:
+        """Return the number of triples."""
+        return len(self.ranks)
+
+    def intern(self, term: Node) -> int:
+        """Get the id of a term and add the term, if it is unknown.
+
+        Parameters
+        ----------
+        term : Node
+            URIRef, BNode or Literal.
+
+        Returns
+        -------
+        int
+            Id of the term.
+        """
+        term_id = self._ids.get(term)
+
+        if term_id is None:
+            term_id = len(self.terms)
+
+            self._ids[term] = term_id
+            self.terms.append(term)
+
+        return term_id
+
+    def add(
+        self, triple: Tuple[Node, Node, Node], rank: float, confidence: float
+    ) -> None:
+        """Add a triple with its rank and confidence.
+
+        Parameters
+        ----------
+        triple : tuple
+            Triple of the form (subj, pred, obj).
+        rank : float
+            Rank of the triple.
+        confidence : float
+            Confidence of the recognized entity of the triple.
+        """
+        self.subjects.append(self.intern(triple[0]))
+        self.predicates.append(self.intern(triple[1]))
+        self.objects.append(self.intern(triple[2]))
+        self.ranks.append(rank)
+        self.confidences.append(confidence)
+
+    def extend(
+        self, triples: Iterable[Tuple[Tuple[Node, Node, Node], float, float]]
+    ) -> None:
+        """Add triples of the form (triple, rank, confidence).
+
+        Parameters
+        ----------
+        triples : iterable
+            Objects of the form (triple, rank, confidence).
+        """
+        for triple, rank, confidence in triples:
+            self.add(triple, rank, confidence)
+
+    def filter(
+        self, lower_rank: float, min_confidence: float, exclude: Iterable[Node] = ()
+    ) -> np.ndarray:
+        """Select the triples with a minimal rank and confidence.
+
+        Parameters
+        ----------
+        lower_rank : float
+            Minimal rank of the selected triples.
+        min_confidence : float
+            Minimal confidence of the selected triples.
+        exclude : iterable, optional
+            Predicates, which are not selected (default: none).
+
+        Returns
+        -------
+        np.ndarray
+            Indices of the selected triples in insertion order.
+        """
+        ranks = np.frombuffer(self.ranks, dtype=np.float64)
+        confidences = np.frombuffer(self.confidences, dtype=np.float64)
+        predicates = np.frombuffer(self.predicates, dtype=np.int64)
+
+        exclude_ids = [self._ids[term] for term in exclude if term in self._ids]
+
+        mask = (ranks >= lower_rank) & (confidences >= min_confidence)
+        mask &= ~np.isin(predicates, exclude_ids)
+
+        return np.flatnonzero(mask)
+
+    def aggregate(self, rows: np.ndarray, max_triples: int) -> np.ndarray:
+        """Keep the first triples for each pair of subject and predicate.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Indices of the triples in insertion order.
+        max_triples : int
+            Maximal number of triples with the same subject and predicate. The
+            first triple of a pair is always kept.
+
+        Returns
+        -------
+        np.ndarray
+            Indices of the kept triples in insertion order.
+        """
+        if len(rows) == 0:
+            return rows
+
+        subjects = np.frombuffer(self.subjects, dtype=np.int64)[rows]
+        predicates = np.frombuffer(self.predicates, dtype=np.int64)[rows]
+        keys = subjects * len(self.terms) + predicates
+
+        # position of each triple within the triples of its (subject, predicate)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        positions = np.arange(len(rows))
+        group_starts = np.ones(len(rows), dtype=bool)
+        group_starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first_positions = np.maximum.accumulate(np.where(group_starts, positions, 0))
+
+        occurrences = np.empty(len(rows), dtype=np.int64)
+        occurrences[order] = positions - first_positions
+
+        return rows[occurrences < max(max_triples, 1)]
+
+    def format(self, rows: np.ndarray) -> List[str]:
+        """Format the triples as <subj> <pred> <obj>.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Indices of the triples.
+
+        Returns
+        -------
+        list
+            Triples in N3 notation.
+        """
+        return [
+            f"{self._term_n3(self.subjects[row])} "
+            f"{self._term_n3(self.predicates[row])} "
+            f"{self._term_n3(self.objects[row])}"
+            for row in rows.tolist()
+        ]
+
+    def to_list(
+        self, rows: np.ndarray
+    ) -> List[Tuple[Tuple[Node, Node, Node], float, float]]:
+        """Get the triples as objects of the form (triple, rank, confidence).
+
+        The ranks are returned as int like the ranks of the rank table, except
+        for the infinite rank of the one hop triples.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            Indices of the triples.
+
+        Returns
+        -------
+        list
+            Objects of the form (triple, rank, confidence).
+        """
+        return [
+            (
+                (
+                    self.terms[self.subjects[row]],
+                    self.terms[self.predicates[row]],
+                    self.terms[self.objects[row]],
+                ),
+                self._rank(row),
+                self.confidences[row],
+            )
+            for row in rows.tolist()
+        ]
+
+    def _rank(self, row: int) -> float:
+        rank = self.ranks[row]
+
+        return rank if isinf(rank) else int(rank)
+
+    def _term_n3(self, term_id: int) -> str:
+        # each term is only formatted once
+        n3 = self._n3.get(term_id)
+
+        if n3 is None:
+            n3 = self.terms[term_id].n3()
+            self._n3[term_id] = n3
+
+        return n3
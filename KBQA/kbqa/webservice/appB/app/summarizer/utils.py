@@ -1,19 +1,28 @@
 """Util functions for the summarizers."""
+from concurrent.futures import ThreadPoolExecutor
 import json
 from json.decoder import JSONDecodeError
+import threading
+import time
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+from app import endpoints
 from rdflib import URIRef
-import requests
-from SPARQLWrapper import JSON
-from SPARQLWrapper import SPARQLWrapper
 
+# Timeouts in seconds for the entity linkers.
+LINKER_TIMEOUTS = {"falcon": 10.0, "dbspotlight": 5.0, "tagme": 5.0}
 
-def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
+
+def query_dbspotlight(
+    question: str, confidence: float = 0.5, timeout: Optional[float] = None
+) -> Dict[str, Any]:
     """Query the endpoint of DBspotlight for entity recognition.
 
     Parameters
@@ -22,6 +31,8 @@ def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
         Natural language question.
     confidence : float, optional
         Lower bound for the confidence of recognized entities (default: 0.5).
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -32,10 +43,11 @@ def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
     endpoint = "https://api.dbpedia-spotlight.org/en/annotate/"
 
     try:
-        response = requests.post(
+        response = endpoints.post(
             endpoint,
             headers={"Accept": "application/json"},
             data={"text": question, "confidence": confidence},
+            timeout=timeout,
         ).json()
     except JSONDecodeError:
         print("It was not possible to parse the answer.")
@@ -45,13 +57,15 @@ def query_dbspotlight(question: str, confidence: float = 0.5) -> Dict[str, Any]:
     return response
 
 
-def query_falcon(question: str) -> Dict[str, Any]:
+def query_falcon(question: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """Query the endpoint of Falcon 2.0 for entity recognition.
 
     Parameters
     ----------
     question : str
         Natural language question.
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -62,10 +76,11 @@ def query_falcon(question: str) -> Dict[str, Any]:
     endpoint = "https://labs.tib.eu/falcon/falcon2/api?mode=long&db=1"
 
     try:
-        response = requests.post(
+        response = endpoints.post(
             endpoint,
             headers={"Content-Type": "application/json"},
             data=json.dumps({"text": question}),
+            timeout=timeout,
         ).json()
     except JSONDecodeError:
         print("It was not possible to parse the response.")
@@ -105,7 +120,7 @@ def entity_recognition_dbspotlight(
 
 
 def entity_recognition_dbspotlight_confidence(
-    question: str, confidence: float = 0.5
+    question: str, confidence: float = 0.5, timeout: Optional[float] = None
 ) -> List[Tuple[URIRef, float]]:
     """Entity recognition using DBspotlight.
 
@@ -119,6 +134,8 @@ def entity_recognition_dbspotlight_confidence(
         Natural language question.
     confidence : float, optional
         Lower bound for the confidence of recognized entities (default: 0.5).
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -127,7 +144,7 @@ def entity_recognition_dbspotlight_confidence(
         a recognized entity as URIRef and confidence is the confidence
         score computed by DBspotlight.
     """
-    response = query_dbspotlight(question, confidence)
+    response = query_dbspotlight(question, confidence, timeout=timeout)
 
     if "Resources" not in response:
         return list()
@@ -142,13 +159,15 @@ def entity_recognition_dbspotlight_confidence(
     return entities
 
 
-def query_tagme(question: str) -> Dict[str, Any]:
+def query_tagme(question: str, timeout: Optional[float] = None) -> Dict[str, Any]:
     """Query the endpoint of the TagMe API.
 
     Parameters
     ----------
     question : str
         Natural language question.
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -164,13 +183,13 @@ def query_tagme(question: str) -> Dict[str, Any]:
         "include_categories": "false",
     }
 
-    response = requests.post(endpoint, data=data)
+    response = endpoints.post(endpoint, data=data, timeout=timeout)
 
     return response.json()
 
 
 def entity_recognition_tagme(
-    question: str, conf: float = 0.5
+    question: str, conf: float = 0.5, timeout: Optional[float] = None
 ) -> List[Tuple[URIRef, float]]:
     """Entity recognition using the TagMe API.
 
@@ -181,6 +200,8 @@ def entity_recognition_tagme(
     conf : float, optional
         Lower bound for the confidence score. Exclude all entities with a lower
         confidence score.
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -189,7 +210,7 @@ def entity_recognition_tagme(
         is the URIRef of a recognized entity and confidence the corresponding
         confidence score.
     """
-    response = query_tagme(question)
+    response = query_tagme(question, timeout=timeout)
     annotations = response["annotations"]
 
     entities = list()
@@ -229,7 +250,9 @@ def get_uri_for_wiki_page_id(wiki_page_id: int) -> Union[str, None]:
     return uri
 
 
-def entity_relation_recognition(question: str) -> Tuple[List[URIRef], List[URIRef]]:
+def entity_relation_recognition(
+    question: str, timeout: Optional[float] = None
+) -> Tuple[List[URIRef], List[URIRef]]:
     """Extract all entities and relations from a question.
 
     Given a natural language question, extract all entities as DBpedia-resources
@@ -239,6 +262,8 @@ def entity_relation_recognition(question: str) -> Tuple[List[URIRef], List[URIRe
     ----------
     question : str
         Natural language question.
+    timeout : float, optional
+        Timeout of the request in seconds (default: endpoints.client.default_timeout).
 
     Returns
     -------
@@ -247,7 +272,7 @@ def entity_relation_recognition(question: str) -> Tuple[List[URIRef], List[URIRe
     relations : list
         List of all recognized relations as URIRef.
     """
-    response = query_falcon(question=question)
+    response = query_falcon(question=question, timeout=timeout)
     if "entities_dbpedia" not in response or "relations_dbpedia" not in response:
         return list(), list()
 
@@ -275,28 +300,262 @@ def entity_relation_recognition(question: str) -> Tuple[List[URIRef], List[URIRe
     return entities, relations
 
 
-def query_dbpedia(query: str, ret_format: str = JSON) -> Dict[str, Any]:
+class LinkingContext:
+    """Entity linking results for one question.
+
+    A context is created per request and shared by all stages of a
+    summarizer, so each linker is queried at most once per question.
+    DBspotlight is queried once with MIN_CONFIDENCE and the results are
+    filtered locally by their similarity score for higher confidences.
+
+    Parameters
+    ----------
+    question : str
+        Natural language question.
+    """
+
+    MIN_CONFIDENCE = 0.1
+
+    def __init__(self, question: str) -> None:
+        self.question = question
+
+        self._results: Dict[Tuple, Any] = dict()
+        self._locks: Dict[Tuple, threading.Lock] = dict()
+        self._lock = threading.Lock()
+
+    def dbspotlight(
+        self, confidence: float = 0.5, timeout: Optional[float] = None
+    ) -> List[Tuple[URIRef, float]]:
+        """Entities recognized by DBspotlight with at least the given confidence.
+
+        Parameters
+        ----------
+        confidence : float, optional
+            Lower bound for the confidence of recognized entities (default: 0.5).
+        timeout : float, optional
+            Timeout of the request in seconds (default: endpoints.client.default_timeout).
+
+        Returns
+        -------
+        list
+            List of tuples of the form (entity, confidence) in the order of
+            the DBspotlight response.
+        """
+        entities = self._memoize(
+            ("dbspotlight",),
+            lambda: entity_recognition_dbspotlight_confidence(
+                self.question, self.MIN_CONFIDENCE, timeout
+            ),
+        )
+
+        return [(entity, score) for entity, score in entities if score >= confidence]
+
+    def tagme(
+        self, confidence: float = 0.5, timeout: Optional[float] = None
+    ) -> List[Tuple[URIRef, float]]:
+        """Entities recognized by TagMe with at least the given confidence.
+
+        Parameters
+        ----------
+        confidence : float, optional
+            Lower bound for the confidence of recognized entities (default: 0.5).
+        timeout : float, optional
+            Timeout of the request in seconds (default: endpoints.client.default_timeout).
+
+        Returns
+        -------
+        list
+            List of tuples of the form (entity, confidence).
+        """
+        return self._memoize(
+            ("tagme", confidence),
+            lambda: entity_recognition_tagme(self.question, confidence, timeout),
+        )
+
+    def falcon(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[List[URIRef], List[URIRef]]:
+        """Entities and relations recognized by Falcon 2.0.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Timeout of the request in seconds (default: endpoints.client.default_timeout).
+
+        Returns
+        -------
+        entities : list
+            List of all recognized entities as URIRef.
+        relations : list
+            List of all recognized relations as URIRef.
+        """
+        return self._memoize(
+            ("falcon",), lambda: entity_relation_recognition(self.question, timeout)
+        )
+
+    def _memoize(self, key: Tuple, call: Callable[[], Any]) -> Any:
+        # one lock per linker, so different linkers still run in parallel and
+        # a second stage waits for a request, which is still in flight
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            if key not in self._results:
+                self._results[key] = call()
+
+            return self._results[key]
+
+
+def link_entities(
+    question: str,
+    confidence: float = 0.5,
+    linkers: Tuple[str, ...] = ("falcon", "dbspotlight", "tagme"),
+    timeouts: Optional[Dict[str, float]] = None,
+    context: Optional[LinkingContext] = None,
+) -> Tuple[Dict[URIRef, float], List[URIRef]]:
+    """Recognize entities and relations with all linkers at once.
+
+    The linkers are called in parallel, so the latency is the one of the
+    slowest linker. A linker, which fails or exceeds its timeout, does not
+    contribute to the result.
+
+    Parameters
+    ----------
+    question : str
+        Natural language question.
+    confidence : float, optional
+        Lower bound for the confidence of recognized entities (default: 0.5).
+    linkers : tuple, optional
+        Linkers to use out of "falcon", "dbspotlight" and "tagme" (default: all).
+        Falcon contributes the relations, DBspotlight and TagMe the entities.
+    timeouts : dict, optional
+        Timeout in seconds per linker. Linkers without a timeout in the dict
+        use the one of LINKER_TIMEOUTS (default: LINKER_TIMEOUTS).
+    context : LinkingContext, optional
+        Linking results of the question shared with other stages (default: a
+        new context for the question).
+
+    Returns
+    -------
+    entities : dict
+        Recognized entities as URIRefs and their highest confidence score
+        over all linkers.
+    relations : list
+        Recognized relations as URIRefs.
+    """
+    if context is None:
+        context = LinkingContext(question)
+
+    linking_context = context
+    calls: Dict[str, Callable[[float], Any]] = {
+        "falcon": lambda timeout: linking_context.falcon(timeout)[1],
+        "dbspotlight": lambda timeout: linking_context.dbspotlight(confidence, timeout),
+        "tagme": lambda timeout: linking_context.tagme(confidence, timeout),
+    }
+
+    results = _run_linkers(
+        {linker: calls[linker] for linker in linkers},
+        {**LINKER_TIMEOUTS, **(timeouts or {})},
+    )
+
+    relations = results.pop("falcon", list())
+    entities: Dict[URIRef, float] = dict()
+
+    for linked_entities in results.values():
+        for entity, score in linked_entities:
+            if score and score > entities.get(entity, 0):
+                entities[entity] = score
+
+    return entities, relations
+
+
+def _run_linkers(
+    calls: Dict[str, Callable[[float], Any]], timeouts: Dict[str, float]
+) -> Dict[str, Any]:
+    # the linkers run in parallel, each one until its own timeout
+    if len(calls) == 0:
+        return dict()
+
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(calls))
+    futures = {
+        linker: executor.submit(call, timeouts[linker])
+        for linker, call in calls.items()
+    }
+
+    results = dict()
+
+    for linker, future in futures.items():
+        remaining = max(timeouts[linker] - (time.monotonic() - start), 0)
+
+        try:
+            results[linker] = future.result(timeout=remaining)
+        except Exception as exception:  # pylint: disable=broad-except
+            print(f"Linker {linker} failed:", repr(exception))
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def get_filter_clauses(
+    predicates: Sequence[str],
+    objects: Sequence[str],
+    exclude: Sequence[str] = (),
+    language: Optional[str] = None,
+) -> str:
+    """Get FILTER clauses, which are evaluated by the SPARQL endpoint.
+
+    Only variables are filtered, since constant predicates and objects are
+    chosen by the caller.
+
+    Parameters
+    ----------
+    predicates : list
+        Predicates of the triple patterns as DBpedia-properties or variables.
+    objects : list
+        Objects of the triple patterns as DBpedia-resources or variables.
+    exclude : list, optional
+        Predicates in N3 notation, which are excluded (default: none).
+    language : str, optional
+        Language tag of the literals to keep. Literals with another or without
+        a language tag are excluded (default: keep all literals).
+
+    Returns
+    -------
+    str
+        FILTER clauses separated by spaces.
+    """
+    clauses = list()
+
+    if len(exclude) > 0:
+        for pred in predicates:
+            if pred.startswith("?"):
+                clauses.append(f"FILTER({pred} NOT IN ({', '.join(exclude)}))")
+
+    if language is not None:
+        for obj in objects:
+            if obj.startswith("?"):
+                clauses.append(
+                    f'FILTER(!isLiteral({obj}) || lang({obj}) = "{language}")'
+                )
+
+    return " ".join(clauses)
+
+
+def query_dbpedia(query: str) -> Dict[str, Any]:
     """Query DBpedia with a POST request.
 
     Parameters
     ----------
     query : str
         SPARQL-query.
-    ret_format : str
-        Return format from the SPARQL Wrapper.
 
     Returns
     -------
     dict
-        Response from DBpedia.
+        Response from DBpedia in the SPARQL-JSON format.
     """
-    endpoint = "https://dbpedia.org/sparql/"
-
-    sparql = SPARQLWrapper(endpoint)
-    sparql.setMethod("POST")
-    sparql.setQuery(query)
-    sparql.setReturnFormat(ret_format)
-
-    answer = sparql.query().convert()
+    answer = endpoints.query_sparql_json(query)
 
     return answer
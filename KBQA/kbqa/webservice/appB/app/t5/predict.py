@@ -1,116 +1,126 @@
-"""File to perfrom prediction using t5 module."""
-
-from __future__ import absolute_import
-import argparse
-
-import os
-import re
-import sys
-import logging
-from types import SimpleNamespace
-from typing import Callable
-
-from transformers import pipeline
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-
-logging.basicConfig(
-    format="%(asctime)s - %(levelname)s - %(name)s -   %(message)s",
-    datefmt="%m/%d/%Y %H:%M:%S",
-    level=logging.INFO,
-)
-logger = logging.getLogger(__name__)
-
-
-parser = argparse.ArgumentParser()
-
-parser.add_argument(
-    "--model_checkpoint",
-    default= None,
-    type=str,
-    help="Should the model weights at load_model_path be loaded.",
-)
-parser.add_argument(
-    "--output_dir",
-    default="./output/",
-    type=str,
-    help="The output directory where the model predictions and checkpoints will be written.",
-)
-parser.add_argument(
-    "--predict_filename",
-    default=None,
-    type=str,
-    help="The prediction filename.",
-)
-parser.add_argument(
-    "--source",
-    default="en",
-    type=str,
-    help="The source language (for file extension)",
-)
-parser.add_argument(
-    "--target",
-    default="sparql",
-    type=str,
-    help="The target language (for file extension)",
-)
-
-
-def init(args: SimpleNamespace) -> None:
-    """Intialize model."""
-    model_checkpoint = args.model_checkpoint
-
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_checkpoint)
-    tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
-    if os.path.exists(args.output_dir) is False:
-        os.makedirs(args.output_dir)
-
-
-
-def run(args: SimpleNamespace) -> None:
-    """Run and predict."""
-    if os.path.exists(args.output_dir) is False:
-        os.makedirs(args.output_dir)
-    model_checkpoint = args.model_checkpoint
-
-    model = AutoModelForSeq2SeqLM.from_pretrained(model_checkpoint)
-    tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
-    translator = pipeline(
-        "translation_xx_to_yy",
-        model=model,
-        tokenizer=tokenizer
-    )
-    translate: Callable = lambda q: (translator(q, max_length=100)[0]['translation_text'])
-
-
-    files = []
-    if args.predict_filename is not None:
-        files.append(args.predict_filename)
-    for idx, file in enumerate(files):
-        logger.info("Predict file: {}".format(file))
-        ques_file = file + "." + args.source
-        with open(ques_file, encoding="utf-8") as source_f:
-            questions = source_f.read().splitlines()
-        preds = []
-        for ques in questions:        
-            #text to sparql traanslation example
-            answer = translate(ques)
-            preds.append(answer)
-
-        pred_str = []
-        with open(
-                os.path.join(args.output_dir, "predict_{}.output".format(str(idx))), "w", encoding="utf-8"
-        ) as f:
-            for count, ref in enumerate(preds):
-                ref = ref.strip().replace("< ", "<").replace(" >", ">")
-                ref = re.sub(r' ?([!"#$%&\'(’)*+,-./:;=?@\\^_`{|}~]) ?', r"\1", ref)
-                ref = ref.replace("attr_close>", "attr_close >").replace(
-                    "_attr_open", "_ attr_open"
-                )
-                ref = ref.replace(" [ ", " [").replace(" ] ", "] ")
-                ref = ref.replace("_obd_", " _obd_ ").replace("_oba_", " _oba_ ")
-
-                pred_str.append(ref.split())
-                line = str(count) + "\t" + ref    #modified
-                f.write(line + "\n")    # modified
-
-    logger.info("  " + "*" * 20)
+"""File to perfrom prediction using t5 module."""
+
+from __future__ import absolute_import
+import argparse
+
+import os
+import sys
+import logging
+from types import SimpleNamespace
+from typing import List
+
+from app.postprocessing import format_prediction
+from transformers import pipeline
+from transformers import Pipeline
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+logging.basicConfig(
+    format="%(asctime)s - %(levelname)s - %(name)s -   %(message)s",
+    datefmt="%m/%d/%Y %H:%M:%S",
+    level=logging.INFO,
+)
+logger = logging.getLogger(__name__)
+
+
+parser = argparse.ArgumentParser()
+
+parser.add_argument(
+    "--model_checkpoint",
+    default= None,
+    type=str,
+    help="Should the model weights at load_model_path be loaded.",
+)
+parser.add_argument(
+    "--output_dir",
+    default="./output/",
+    type=str,
+    help="The output directory where the model predictions and checkpoints will be written.",
+)
+parser.add_argument(
+    "--predict_filename",
+    default=None,
+    type=str,
+    help="The prediction filename.",
+)
+parser.add_argument(
+    "--eval_batch_size",
+    default=8,
+    type=int,
+    help="Batch size per GPU/CPU for translation.",
+)
+parser.add_argument(
+    "--source",
+    default="en",
+    type=str,
+    help="The source language (for file extension)",
+)
+parser.add_argument(
+    "--target",
+    default="sparql",
+    type=str,
+    help="The target language (for file extension)",
+)
+
+
+def init(args: SimpleNamespace) -> Pipeline:
+    """Intialize model, tokenizer and translation pipeline once."""
+    model_checkpoint = args.model_checkpoint
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_checkpoint)
+    tokenizer = AutoTokenizer.from_pretrained(model_checkpoint)
+    model.eval()
+    translator = pipeline(
+        "translation_xx_to_yy",
+        model=model,
+        tokenizer=tokenizer
+    )
+    if os.path.exists(args.output_dir) is False:
+        os.makedirs(args.output_dir)
+
+    return translator
+
+
+def translate(translator: Pipeline, questions: List[str], batch_size: int = 8) -> List[str]:
+    """Translate a list of questions in batches of batch_size."""
+    answers: List[str] = []
+    for start in range(0, len(questions), batch_size):
+        batch = questions[start:start + batch_size]
+        translations = translator(batch, max_length=100)
+        answers.extend(t['translation_text'] for t in translations)
+    return answers
+
+
+def run(args: SimpleNamespace) -> None:
+    """Run and predict."""
+    translator = init(args)
+    batch_size = getattr(args, "eval_batch_size", 8)
+
+    files = []
+    if args.predict_filename is not None:
+        files.append(args.predict_filename)
+    for idx, file in enumerate(files):
+        logger.info("Predict file: {}".format(file))
+        ques_file = file + "." + args.source
+        with open(ques_file, encoding="utf-8") as source_f:
+            questions = source_f.read().splitlines()
+        #text to sparql traanslation example
+        preds = translate(translator, questions, batch_size)
+
+        pred_str = []
+        with open(
+                os.path.join(args.output_dir, "predict_{}.output".format(str(idx))), "w", encoding="utf-8"
+        ) as f:
+            for count, ref in enumerate(preds):
+                ref = format_prediction(ref)
+
+                pred_str.append(ref.split())
+                line = str(count) + "\t" + ref    #modified
+                f.write(line + "\n")    # modified
+
+    logger.info("  " + "*" * 20)
+
+
+def predict_queries(translator: Pipeline, args: SimpleNamespace, questions: List[str]) -> List[str]:
+    """Translate in-memory questions into encoded queries."""
+    batch_size = getattr(args, "eval_batch_size", 8)
+    return [format_prediction(ref) for ref in translate(translator, questions, batch_size)]
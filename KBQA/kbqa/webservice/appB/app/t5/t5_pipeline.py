@@ -1,13 +1,13 @@
 """Wrapper class for the t5 pipeline."""
 from types import SimpleNamespace
+from typing import List
 
 from app.base_pipeline import BasePipeline
 from app.postprocessing import postprocess_prediction
-from app.preprocessing import preprocessing_qtq
-from app.preprocessing import seperate_qtq
+from app.preprocessing import preprocess_qtq
 from app.t5.postprocess import decode
 from app.t5.predict import init
-from app.t5.predict import run
+from app.t5.predict import predict_queries
 
 
 class T5Pipeline(BasePipeline):
@@ -23,30 +23,63 @@ class T5Pipeline(BasePipeline):
             SPBERT.
         """
         super().__init__(arguments)
-        init(self.arguments)
 
-    def predict_sparql_query(self, question: str) -> str:
+        self.translator = init(self.arguments)
+
+    def predict_sparql_query(self, question: str, triples: List[str]) -> str:
         """Predict a SPARQL query for a given question using t5.
 
         Parameters
         ----------
         question : str
             Natural language question.
+        triples : list
+            Summarized triples for the question. They are not used by
+            this architecture.
 
         Returns
         -------
         str
             Predicted SPARQL query for the question from t5.
         """
-        seperate_qtq()
-        preprocessing_qtq()
-        run(self.arguments)
+        return self.predict_sparql_queries([question], [triples])[0]
+
+    def predict_sparql_queries(
+        self, questions: List[str], triples: List[List[str]]
+    ) -> List[str]:
+        """Predict SPARQL queries for a batch of questions using t5.
+
+        The questions are translated together in batches of
+        `eval_batch_size` by the resident translation pipeline.
+
+        Parameters
+        ----------
+        questions : list
+            Natural language questions.
+        triples : list
+            Summarized triples for each question. They are not used by
+            this architecture.
+
+        Returns
+        -------
+        list
+            Predicted SPARQL queries in the order of the questions.
+        """
+        sources = [
+            preprocess_qtq(question, question_triples)[0]
+            for question, question_triples in zip(questions, triples)
+        ]
+
+        predictions = predict_queries(self.translator, self.arguments, sources)
+
+        queries = list()
+        for prediction in predictions:
+            query = postprocess_prediction(prediction)
+            query = decode(query)
 
-        query_pairs = postprocess_prediction()
-        query = query_pairs["0"]
-        query = decode(query)
+            # not a good solution
+            query = query.replace("variable:", "?")
 
-        # not a good solution
-        query = query.replace("variable:", "?")
+            queries.append(query)
 
-        return query
+        return queries
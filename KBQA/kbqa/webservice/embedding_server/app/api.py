@@ -1,16 +1,30 @@
 """WSGI endpoint for embedding server."""
+import io
+
 from app.embedding_paths import ROOT_PATH
+from app.embeddings import EntityEmbeddingMatrix
 from app.embeddings import EntityHashTable
 from app.embeddings import RelationEmbeddings
 from app.main import main
+from app.main import main_binary
 from flask import Flask
 from flask import jsonify
 from flask import request
 from flask import Response
+import numpy as np
+
+NPZ_MIMETYPE = "application/x-npz"
 
 application = Flask(__name__)
 application.entity_hashtable = EntityHashTable(ROOT_PATH)
-application.entity_hashtable.load()
+# Prefer the memory-mapped store, if it has been generated with build_embeddings.py
+application.entity_matrix = EntityEmbeddingMatrix(ROOT_PATH)
+if application.entity_matrix.exists():
+    application.entity_matrix.load()
+    application.entity_hashtable.load_config()
+else:
+    application.entity_matrix = None
+    application.entity_hashtable.load()
 application.relation_embeddings = RelationEmbeddings(ROOT_PATH)
 application.relation_embeddings.load()
 
@@ -21,7 +35,9 @@ def endpoint() -> Response:
     Endpoint for the embedding server.
 
     Expects a POST request with a json object containing a list of entity URIs called "entities"
-    and a list of relation URIs called "relations"
+    and a list of relation URIs called "relations".
+    If the request accepts application/x-npz, the embeddings are returned as float32 arrays in an
+    uncompressed .npz file instead of json (see main_binary).
     """
     if request.method == "POST":
         content = request.json
@@ -32,11 +48,28 @@ def endpoint() -> Response:
             and "relations" in content
             and check_uri_list(content["relations"])
         ):
+            if (
+                request.accept_mimetypes.best_match(["application/json", NPZ_MIMETYPE])
+                == NPZ_MIMETYPE
+            ):
+                buffer = io.BytesIO()
+                np.savez(
+                    buffer,
+                    **main_binary(
+                        application.entity_hashtable,
+                        application.relation_embeddings,
+                        content["entities"],
+                        content["relations"],
+                        application.entity_matrix,
+                    ),
+                )
+                return Response(buffer.getvalue(), mimetype=NPZ_MIMETYPE)
             embedding_dict = main(
                 application.entity_hashtable,
                 application.relation_embeddings,
                 content["entities"],
                 content["relations"],
+                application.entity_matrix,
             )
             return jsonify(embedding_dict)
         else:
@@ -1,15 +1,131 @@
 """Hashtable implementation for large entity embedding files."""
 
-import csv
 import hashlib
 import json
+from multiprocessing import Pool
 import os
 import pickle
 import time
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 import numpy as np
 
+# order of the sides and parts of relation embeddings in binary responses
+RELATION_SIDES = ("lhs", "rhs")
+RELATION_PARTS = ("real", "imag")
+
+
+def hash_uri_bytes(uri_bytes: bytes) -> int:
+    """
+    Hash UTF-8 encoded URI with the first 8 bytes of its sha256 hash.
+
+    :param uri_bytes: UTF-8 encoded URI without "http(s)://"
+    :return: 64 bit hash of the URI
+    """
+    return int.from_bytes(hashlib.sha256(uri_bytes).digest()[:8], "little")
+
+
+def hash_chunk(job: Tuple[str, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the URIs of all lines in a chunk of the entity file.
+
+    :param job: path of the entity file, start and end of the chunk, which have to be at line starts
+    :return: 64 bit hashes of the URIs and the seek positions of their lines
+    """
+    path, start, end = job
+    with open(path, "rb") as tsv_file:
+        tsv_file.seek(start)
+        chunk = tsv_file.read(end - start)
+    lines = chunk.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    hashes = np.empty(len(lines), dtype=np.uint64)
+    offsets = np.empty(len(lines), dtype=np.int64)
+    file_pos = start
+    for i, line in enumerate(lines):
+        uri = line.split(b"\t", maxsplit=1)[0].split(b"/", maxsplit=2)[2]
+        hashes[i] = hash_uri_bytes(uri)
+        offsets[i] = file_pos
+        file_pos += len(line) + 1
+    return hashes, offsets
+
+
+class SortedHashIndex:
+    """
+    Sorted index of the 64 bit URI hashes of an entity file.
+
+    :param hashes: sorted 64 bit hashes of all URIs
+    :param offsets: seek positions of the lines corresponding to hashes
+    """
+
+    HASHES_FILE = "hash_index_hashes.npy"
+    OFFSETS_FILE = "hash_index_offsets.npy"
+
+    def __init__(self, hashes: np.ndarray, offsets: np.ndarray) -> None:
+        self.hashes = hashes
+        self.offsets = offsets
+
+    @classmethod
+    def exists(cls, root_path: str) -> bool:
+        """
+        Check whether the sorted index has been generated at root_path.
+
+        :param root_path: Path to folder containing the index files
+        :return: True if both files of the index exist
+        """
+        return os.path.isfile(
+            os.path.join(root_path, cls.HASHES_FILE)
+        ) and os.path.isfile(os.path.join(root_path, cls.OFFSETS_FILE))
+
+    @classmethod
+    def load(cls, root_path: str) -> "SortedHashIndex":
+        """
+        Memory-map the sorted index stored at root_path.
+
+        :param root_path: Path to folder containing the index files
+        :return: the memory-mapped index
+        """
+        return cls(
+            np.load(os.path.join(root_path, cls.HASHES_FILE), mmap_mode="r"),
+            np.load(os.path.join(root_path, cls.OFFSETS_FILE), mmap_mode="r"),
+        )
+
+    def store(self, root_path: str) -> None:
+        """
+        Store the index to root_path as two .npy files.
+
+        :param root_path: Path to folder the index files are written to
+        """
+        np.save(os.path.join(root_path, self.HASHES_FILE), self.hashes)
+        np.save(os.path.join(root_path, self.OFFSETS_FILE), self.offsets)
+
+    def __len__(self) -> int:
+        """
+        Return the number of indexed URIs.
+
+        :return: number of hashes in the index
+        """
+        return len(self.hashes)
+
+    def lookup(self, uri: str) -> List[int]:
+        """
+        Gather all seek positions for hash of given uri.
+
+        :param str uri: URI without "http(s)://"
+        :return: list of seek positions in the entity file
+        """
+        uri_hash = np.uint64(hash_uri_bytes(uri.encode("UTF-8")))
+        idx = int(np.searchsorted(self.hashes, uri_hash, side="left"))
+        seek_positions = []
+        # colliding hashes are adjacent
+        while idx < len(self.hashes) and self.hashes[idx] == uri_hash:
+            seek_positions.append(int(self.offsets[idx]))
+            idx += 1
+        return seek_positions
+
 
 class EntityHashTable:
     """
@@ -23,13 +139,18 @@ class EntityHashTable:
     :param hash_table_size: number of entries in hashtable buffer in hash_table
     :param hash_table_mask: used to cut down hash to generate index in [0,hash_table_size[
     :param use_hash_bytes: number of bytes used from sha256 hash
+    :param sorted_index: sorted hash index, if it is used instead of hash_table
     """
 
     PRINT_EVERY = 100000
 
+    # bytes of the entity file, which are hashed by one worker at once
+    CHUNK_SIZE = 64 * 1024 * 1024
+
     def __init__(self, root_path: str) -> None:
         self.hash_table: list = []
         self.hash_table_collisions: dict = {}
+        self.sorted_index: Optional[SortedHashIndex] = None
         self.root_path = root_path
         self.entity_file = ""
         self.num_entities = 0
@@ -43,8 +164,12 @@ class EntityHashTable:
 
         Hashtable itself is stored in compressed .npz format and the collision dict in .pkl format.
         hash_table.npz, hash_table.pkl, hash_table_config.json and entity_file have to be located at root_path.
+        If the sorted index generated by generate_sorted exists, it is memory-mapped instead.
         """
         self.load_config()
+        if SortedHashIndex.exists(self.root_path):
+            self.sorted_index = SortedHashIndex.load(self.root_path)
+            return
         with open(os.path.join(self.root_path, "hash_table.npz"), "rb") as in_file:
             data = np.load(in_file)
             self.hash_table = [data[tab] for tab in data]
@@ -157,6 +282,57 @@ class EntityHashTable:
                 line = tsv_file.readline()
         self.store()
 
+    def generate_sorted(self, processes: Optional[int] = None) -> None:
+        """
+        Generate the sorted index from entity_file stored at root_path.
+
+        The file is split into chunks, whose URIs are hashed in parallel. The (hash, seek position) pairs
+        are sorted by hash and stored as two .npy files, so a lookup is a single binary search.
+        Collisions of the 64 bit hashes are adjacent in the index and need no extra tables.
+
+        Remark: hash_table_config.json has to be created before calling generate_sorted
+                and has to be located at root_path
+
+        :param processes: number of worker processes (default: number of cores)
+        """
+        self.load_config()
+        t_start = time.time()
+        jobs = self.plan_chunks()
+        hashes = []
+        offsets = []
+        with Pool(processes) as pool:
+            for chunk_hashes, chunk_offsets in pool.imap(hash_chunk, jobs):
+                hashes.append(chunk_hashes)
+                offsets.append(chunk_offsets)
+                print(f"Hashed {len(hashes)}/{len(jobs)} chunks")
+                print(f"Speed: {sum(map(len, hashes))/(time.time()-t_start):.1f}")
+
+        all_hashes = np.concatenate(hashes) if hashes else np.empty(0, np.uint64)
+        all_offsets = np.concatenate(offsets) if offsets else np.empty(0, np.int64)
+        del hashes, offsets
+        order = np.argsort(all_hashes, kind="stable")
+        SortedHashIndex(all_hashes[order], all_offsets[order]).store(self.root_path)
+
+    def plan_chunks(self) -> List[Tuple[str, int, int]]:
+        """
+        Split entity_file into chunks of about CHUNK_SIZE bytes, which end at line breaks.
+
+        :return: jobs for hash_chunk with the path of entity_file and the start and end of each chunk
+        """
+        path = os.path.join(self.root_path, self.entity_file)
+        file_size = os.path.getsize(path)
+        jobs = []
+        with open(path, "rb") as tsv_file:
+            start = 0
+            while start < file_size:
+                # end the chunk after the next line break
+                tsv_file.seek(min(start + self.CHUNK_SIZE, file_size))
+                tsv_file.readline()
+                end = tsv_file.tell()
+                jobs.append((path, start, end))
+                start = end
+        return jobs
+
     def lookup(self, uri: str) -> List[int]:
         """
         Gather all seek positions for hash of given uri.
@@ -164,6 +340,8 @@ class EntityHashTable:
         :param str uri: URI without "http(s)://"
         :return: list of seek positions in entity_file
         """
+        if self.sorted_index is not None:
+            return self.sorted_index.lookup(uri)
         uri_bytes = uri.encode("UTF-8")
         sha256_instance = hashlib.sha256()
         sha256_instance.update(uri_bytes)
@@ -184,11 +362,285 @@ class EntityHashTable:
         return seek_positions
 
 
+class StringColumn:
+    """
+    Memory-mapped column of UTF-8 encoded strings of variable length.
+
+    :param offsets: start of each string in data, followed by the end of the last string
+    :param data: bytes of all strings one after the other
+    """
+
+    def __init__(self) -> None:
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.data = np.empty(0, dtype=np.uint8)
+
+    def load(self, offsets_path: str, data_path: str) -> None:
+        """
+        Memory-map the offsets and the bytes of the column.
+
+        :param offsets_path: path of the .npy file containing the offsets
+        :param data_path: path of the file containing the bytes of the strings
+        """
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self.data = np.memmap(data_path, dtype=np.uint8, mode="r")
+
+    def __len__(self) -> int:
+        """
+        Return the number of strings in the column.
+
+        :return: number of strings
+        """
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        """
+        Decode the string of a row.
+
+        :param row: row in the column
+        :return: string of the row
+        """
+        return bytes(self.data[self.offsets[row] : self.offsets[row + 1]]).decode(
+            "UTF-8"
+        )
+
+
+class EntityEmbeddingMatrix:
+    """
+    Memory-mapped binary store for large entity embedding files.
+
+    The embeddings are stored as float32 matrix with one row per entity. The rows are found by a binary search
+    in the sorted hashes of the URIs, the URIs themselves are stored to resolve hash collisions.
+    All files are opened with np.memmap, so they are only read on demand and shared by all worker processes.
+
+    :param root_path: Path to folder containing the entity embedding file and the generated files
+    :param entity_file: entity embedding file name, has to be stored in hash_table_config.json
+    :param num_entities: number of enities in entity file, has to be store in hash_table_config.json
+    :param matrix: float32 embedding matrix of shape (num_entities, dim)
+    :param hashes: sorted 64 bit hashes of the URIs without "http(s)://"
+    :param rows: matrix row of each hash in hashes
+    :param uris: column of the URIs of all rows as in the entity file
+    :param lines: column of the lines of all rows in entity_file, which is still needed to serve the original lines
+    """
+
+    PRINT_EVERY = 100000
+
+    MATRIX_FILE = "entity_matrix.npy"
+    HASHES_FILE = "entity_hashes.npy"
+    ROWS_FILE = "entity_rows.npy"
+    URI_OFFSETS_FILE = "entity_uri_offsets.npy"
+    URIS_FILE = "entity_uris.bin"
+    LINE_OFFSETS_FILE = "entity_line_offsets.npy"
+
+    def __init__(self, root_path: str) -> None:
+        self.root_path = root_path
+        self.entity_file = ""
+        self.num_entities = 0
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.uris = StringColumn()
+        self.lines = StringColumn()
+
+    @staticmethod
+    def hash_uri(uri: str) -> int:
+        """
+        Hash URI with the first 8 bytes of its sha256 hash.
+
+        :param str uri: URI without "http(s)://"
+        :return: 64 bit hash of the URI
+        """
+        return hash_uri_bytes(uri.encode("UTF-8"))
+
+    def exists(self) -> bool:
+        """
+        Check whether the binary store has been generated at root_path.
+
+        :return: True if all files of the store exist
+        """
+        return all(
+            os.path.isfile(os.path.join(self.root_path, file_name))
+            for file_name in (
+                self.MATRIX_FILE,
+                self.HASHES_FILE,
+                self.ROWS_FILE,
+                self.URI_OFFSETS_FILE,
+                self.URIS_FILE,
+                self.LINE_OFFSETS_FILE,
+            )
+        )
+
+    def load(self) -> None:
+        """
+        Memory-map the binary store at root_path.
+
+        The files are not read into memory, only the accessed pages are loaded by the operating system.
+        """
+        self.load_config()
+        self.matrix = np.load(
+            os.path.join(self.root_path, self.MATRIX_FILE), mmap_mode="r"
+        )
+        self.hashes = np.load(
+            os.path.join(self.root_path, self.HASHES_FILE), mmap_mode="r"
+        )
+        self.rows = np.load(os.path.join(self.root_path, self.ROWS_FILE), mmap_mode="r")
+        self.uris.load(
+            os.path.join(self.root_path, self.URI_OFFSETS_FILE),
+            os.path.join(self.root_path, self.URIS_FILE),
+        )
+        self.lines.load(
+            os.path.join(self.root_path, self.LINE_OFFSETS_FILE),
+            os.path.join(self.root_path, self.entity_file),
+        )
+
+    def load_config(self) -> None:
+        """
+        Load hash_table_config.json.
+
+        hash_table_config.json contains:
+        entity_file: name of the file containing the entity embeddings
+        num_entities: the number of entities in entity_file
+        """
+        with open(
+            os.path.join(self.root_path, "hash_table_config.json"),
+            "r",
+            encoding="UTF-8",
+        ) as config_file:
+            data = json.load(config_file)
+            self.entity_file = data["entity_file"]
+            self.num_entities = data["num_entities"]
+
+    def generate(self) -> None:
+        """
+        Generate the binary store from entity_file stored at root_path.
+
+        Remark: hash_table_config.json has to be created before calling generate
+                and has to be located at root_path
+        """
+        self.load_config()
+        t_start = time.time()
+        hashes = np.empty(self.num_entities, dtype=np.uint64)
+        uri_offsets = np.empty(self.num_entities + 1, dtype=np.int64)
+        uri_offsets[0] = 0
+        line_offsets = np.empty(self.num_entities + 1, dtype=np.int64)
+        line_offsets[0] = 0
+        with open(
+            os.path.join(self.root_path, self.entity_file), "rb"
+        ) as tsv_file, open(
+            os.path.join(self.root_path, self.URIS_FILE), "wb"
+        ) as uris_file:
+            matrix = None
+            i = 0
+            for line in tsv_file:
+                row = line.decode("utf-8").rstrip("\n").split("\t")
+                if matrix is None:
+                    matrix = np.lib.format.open_memmap(
+                        os.path.join(self.root_path, self.MATRIX_FILE),
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=(self.num_entities, len(row) - 1),
+                    )
+                if i == self.num_entities:
+                    raise ValueError(
+                        f"{self.entity_file} contains more than {self.num_entities} entities"
+                    )
+                matrix[i] = np.array(row[1:], dtype=np.float32)
+                hashes[i] = self.hash_uri(row[0].split("/", maxsplit=2)[2])
+                uri_bytes = row[0].encode("UTF-8")
+                uris_file.write(uri_bytes)
+                uri_offsets[i + 1] = uri_offsets[i] + len(uri_bytes)
+                line_offsets[i + 1] = line_offsets[i] + len(line)
+                i += 1
+                if i % EntityEmbeddingMatrix.PRINT_EVERY == 0:
+                    print(f"Converted {i} elements ({i/self.num_entities*100.0:.1f}%")
+                    print(f"Speed: {i/(time.time()-t_start):.1f}")
+        if matrix is None:
+            raise ValueError(f"{self.entity_file} contains no entities")
+        if i != self.num_entities:
+            raise ValueError(
+                f"{self.entity_file} contains {i} instead of {self.num_entities} entities"
+            )
+        matrix.flush()
+
+        rows = np.argsort(hashes, kind="stable")
+        np.save(os.path.join(self.root_path, self.HASHES_FILE), hashes[rows])
+        np.save(os.path.join(self.root_path, self.ROWS_FILE), rows.astype(np.int64))
+        np.save(os.path.join(self.root_path, self.URI_OFFSETS_FILE), uri_offsets)
+        np.save(os.path.join(self.root_path, self.LINE_OFFSETS_FILE), line_offsets)
+
+    def lookup(self, uri: str) -> int:
+        """
+        Find the matrix row of given uri.
+
+        :param str uri: URI without "http(s)://"
+        :return: row of the URI in matrix or -1 if the URI has no embedding
+        """
+        uri_hash = np.uint64(self.hash_uri(uri))
+        start = np.searchsorted(self.hashes, uri_hash, side="left")
+        end = np.searchsorted(self.hashes, uri_hash, side="right")
+        for row in self.rows[start:end]:
+            if self.uri(row).split("/", maxsplit=2)[2] == uri:
+                return int(row)
+        return -1
+
+    def lookup_many(self, uris: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return embeddings of several URIs at once.
+
+        The rows are gathered in ascending order, so the pages of the matrix are read sequentially,
+        and then scattered back into the order of the URIs.
+
+        :param uris: URIs without "http(s)://"
+        :return: float32 array with one row per URI, zero rows for the missing URIs,
+                 and the mask of the missing URIs
+        """
+        rows = np.array([self.lookup(uri) for uri in uris], dtype=np.int64)
+        missing = rows == -1
+        embeddings = np.zeros((len(uris), self.matrix.shape[1]), dtype=np.float32)
+        found = np.flatnonzero(~missing)
+        order = np.argsort(rows[found], kind="stable")
+        embeddings[found[order]] = self.matrix[rows[found[order]]]
+        return embeddings, missing
+
+    def uri(self, row: int) -> str:
+        """
+        Return the URI of a matrix row as stored in the entity file.
+
+        :param row: row in matrix
+        :return: URI of the row
+        """
+        return self.uris[row]
+
+    def embedding(self, row: int) -> np.ndarray:
+        """
+        Return the embedding of a matrix row without copying it.
+
+        :param row: row in matrix
+        :return: read-only view of the embedding
+        """
+        return self.matrix[row]
+
+    def line(self, row: int) -> str:
+        """
+        Return the line of a matrix row as it is written in the entity file.
+
+        :param row: row in matrix
+        :return: tab separated URI and embedding followed by a newline
+        """
+        return self.lines[row]
+
+
 class RelationEmbeddings:
     """
-    Hashtable implementation for large entity embedding files.
+    In-memory numeric table of the relation embeddings.
 
-    :param relation_embeddings: dict containing the embeddings of relations
+    :param embeddings: float32 array of shape (relations, side, part, dim) with the sides RELATION_SIDES
+                       and the parts RELATION_PARTS
+    :param uri_index: dict mapping the URIs without "http(s)://" to their row in embeddings
+    :param uris: URIs of the rows as stored in the relation file
+    :param loaded: bool array of shape (relations, side, part), which marks the sides and parts found in the file
+    :param value_offsets: int64 array of shape (relations, side, part, 2) with the start and end of the
+                          tab separated values of each side and part in the relation file
+    :param values: memory-mapped bytes of the relation file, which is still needed to serve the original values
     :param root_path: Path to folder containing the relation embedding file
     :param relation_file: relation embedding file name, has to be stored in relation_config.json
     """
@@ -196,60 +648,83 @@ class RelationEmbeddings:
     PRINT_EVERY = 100000
 
     def __init__(self, root_path: str) -> None:
-        self.relation_embeddings: dict = {}
+        self.embeddings = np.empty(
+            (0, len(RELATION_SIDES), len(RELATION_PARTS), 0), dtype=np.float32
+        )
+        self.uri_index: Dict[str, int] = {}
+        self.uris: List[str] = []
+        self.loaded = np.zeros((0, len(RELATION_SIDES), len(RELATION_PARTS)), bool)
+        self.value_offsets = np.zeros(
+            (0, len(RELATION_SIDES), len(RELATION_PARTS), 2), dtype=np.int64
+        )
+        self.values = np.empty(0, dtype=np.uint8)
         self.root_path = root_path
         self.relation_file = ""
 
     def load(self) -> None:
         """
-        Constrict relation_embedding dict directly from relation_embedding file.
+        Construct the relation embedding table directly from the relation embedding file.
 
-        The dict then contains the lhs and rhs embeddings with both the real and imaginary parts.
+        The table contains the lhs and rhs embeddings with both the real and imaginary parts. Missing sides or
+        parts are reported and filled with zeros in the table, they are left out of the json format.
         """
         self.load_config()
-        with open(
-            self.root_path + "/" + self.relation_file,
-            "r",
-            newline="",
-            encoding="utf-8",
-        ) as tsv_file:
-            tsv_reader = csv.reader(tsv_file, delimiter="\t")
-            for row in tsv_reader:
+        path = os.path.join(self.root_path, self.relation_file)
+        rows: List[np.ndarray] = []
+        offsets: List[np.ndarray] = []
+        self.uri_index = {}
+        self.uris = []
+        with open(path, "rb") as tsv_file:
+            line_start = 0
+            for line in tsv_file:
+                row = line.rstrip(b"\r\n").decode("utf-8").split("\t")
+                values_start = line_start + len("\t".join(row[:5]).encode("utf-8")) + 1
+                values_end = line_start + len(line.rstrip(b"\r\n"))
+                line_start += len(line)
                 if len(row) != 55:
                     print(f"[ERROR]: len(row) = {len(row)}")
+                    continue
                 try:
                     uri = row[0].split("/", maxsplit=2)[2]
                 except IndexError:
                     print(f"[ERROR]: {row[0]} not http")
                     continue
-                embedding = "\t".join(row[5:])
-                embedding_side = row[1]
-                embedding_part = row[3]
-                if uri in self.relation_embeddings:
-                    if embedding_side in self.relation_embeddings[uri]:
-                        if (
-                            embedding_part
-                            in self.relation_embeddings[uri][embedding_side]
-                        ):
-                            print(
-                                f"[ERROR] Found {uri} {embedding_side} {embedding_part} twice!"
-                            )
-                        else:
-                            self.relation_embeddings[uri][embedding_side][
-                                embedding_part
-                            ] = embedding
-                    else:
-                        self.relation_embeddings[uri][embedding_side] = {}
-                        self.relation_embeddings[uri][embedding_side][
-                            embedding_part
-                        ] = embedding
+                if row[1] not in RELATION_SIDES or row[3] not in RELATION_PARTS:
+                    print(f"[ERROR]: {uri} has unknown side {row[1]} or part {row[3]}")
+                    continue
+                side = RELATION_SIDES.index(row[1])
+                part = RELATION_PARTS.index(row[3])
+                if uri not in self.uri_index:
+                    self.uri_index[uri] = len(rows)
+                    self.uris.append(row[0])
+                    rows.append(
+                        np.zeros(
+                            (len(RELATION_SIDES), len(RELATION_PARTS), len(row) - 5),
+                            dtype=np.float32,
+                        )
+                    )
+                    # the end before the start marks sides and parts, which are not loaded
+                    offsets.append(
+                        np.full(
+                            (len(RELATION_SIDES), len(RELATION_PARTS), 2),
+                            (0, -1),
+                            dtype=np.int64,
+                        )
+                    )
+                idx = self.uri_index[uri]
+                if offsets[idx][side, part, 1] >= 0:
+                    print(f"[ERROR] Found {uri} {row[1]} {row[3]} twice!")
                 else:
-                    self.relation_embeddings[uri] = {}
-                    self.relation_embeddings[uri]["uri"] = uri
-                    self.relation_embeddings[uri][embedding_side] = {}
-                    self.relation_embeddings[uri][embedding_side][
-                        embedding_part
-                    ] = embedding
+                    rows[idx][side, part] = np.array(row[5:], dtype=np.float32)
+                    offsets[idx][side, part] = (values_start, values_end)
+        if rows:
+            self.embeddings = np.stack(rows)
+            self.value_offsets = np.stack(offsets)
+            self.loaded = self.value_offsets[..., 1] >= 0
+            self.values = np.memmap(path, dtype=np.uint8, mode="r")
+        for uri, idx in self.uri_index.items():
+            if not self.loaded[idx].all():
+                print(f"[ERROR] {uri} misses parts of its embedding, they are set to 0")
 
     def load_config(self) -> None:
         """
@@ -272,8 +747,46 @@ class RelationEmbeddings:
 
         :param str uri: URI without "http(s)://"
         :return: both lhs and rhs embedding with both real part and imaginary part of the embedding
+                 as tab separated values like in the relation file, the format of the json response
         """
-        if uri in self.relation_embeddings:
-            return self.relation_embeddings[uri]
-        else:
+        idx = self.uri_index.get(uri)
+        if idx is None:
             return {}
+        embedding: dict = {"uri": uri}
+        for side, part in zip(*np.nonzero(self.loaded[idx])):
+            start, end = self.value_offsets[idx, side, part]
+            embedding.setdefault(RELATION_SIDES[side], {})[
+                RELATION_PARTS[part]
+            ] = bytes(self.values[start:end]).decode("utf-8")
+        return embedding
+
+    def lookup_array(self, uri: str) -> Optional[np.ndarray]:
+        """
+        Return embedding of relation URI without copying it.
+
+        :param str uri: URI without "http(s)://"
+        :return: view of shape (side, part, dim) or None if the URI has no embedding
+        """
+        idx = self.uri_index.get(uri)
+        if idx is None:
+            return None
+        return self.embeddings[idx]
+
+    def lookup_many(self, uris: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return embeddings of several relation URIs at once.
+
+        :param uris: URIs without "http(s)://"
+        :return: float32 array of shape (uris, side, part, dim) with zero rows for the missing URIs
+                 and the mask of the missing URIs, missing sides or parts of a found URI are zero as well
+        """
+        rows = np.array([self.uri_index.get(uri, -1) for uri in uris], dtype=np.int64)
+        missing = rows == -1
+        if len(self.embeddings) == 0:
+            return (
+                np.zeros((len(uris),) + self.embeddings.shape[1:], np.float32),
+                missing,
+            )
+        embeddings = self.embeddings[np.where(missing, 0, rows)]
+        embeddings[missing] = 0
+        return embeddings, missing
@@ -1,8 +1,20 @@
 """Main module for extracting embeddings."""
+import io
 import os
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+from app.embeddings import EntityEmbeddingMatrix
 from app.embeddings import EntityHashTable
 from app.embeddings import RelationEmbeddings
+import numpy as np
+
+# bytes read from every seek position, which should cover one line of the entity file
+READ_AHEAD = 8192
+# maximal number of bytes between two reads, which are read together
+COALESCE_GAP = 16384
 
 
 def main(
@@ -10,6 +22,7 @@ def main(
     relation_embeddings: RelationEmbeddings,
     entities: list,
     relations: list,
+    entity_matrix: Optional[EntityEmbeddingMatrix] = None,
 ) -> dict:
     """
     Get embeddings for all requested URIs.
@@ -23,31 +36,23 @@ def main(
     :param relation_embeddings: class storing the relation embedding information for querying
     :param entities: list of entitiy URIs
     :param relations: list of relation URIs
+    :param entity_matrix: memory-mapped entity embeddings, which are used instead of the hashtable if given
     :return: list of embeddings for URIs
     """
     embedding_dict: dict = {"entity_embeddings": [], "relation_embeddings": []}
 
     # Query entity embeddings
-    with open(
-        os.path.join(hash_table.root_path, hash_table.entity_file),
-        "r",
-        newline="",
-        encoding="utf-8",
-    ) as tsv_file:
+    if entity_matrix is not None:
         for uri in entities:
             if uri.startswith("http"):
                 uri = uri.split("/", maxsplit=2)[2]
-            seek_positions = hash_table.lookup(uri)
-            for seek_pos in seek_positions:
-                tsv_file.seek(seek_pos)
-                line = tsv_file.readline()
-                comp_uri = line.split(sep="\t", maxsplit=1)[0]
-                comp_uri = comp_uri.split("/", maxsplit=2)[2]
-                if uri == comp_uri:
-                    embedding_dict["entity_embeddings"].append(line)
-                    break
+            row = entity_matrix.lookup(uri)
+            if row != -1:
+                embedding_dict["entity_embeddings"].append(entity_matrix.line(row))
             else:
                 embedding_dict["entity_embeddings"].append("")
+    else:
+        query_entity_file(hash_table, entities, embedding_dict)
 
     # Query relation embeddings
     for uri in relations:
@@ -57,3 +62,164 @@ def main(
         embedding_dict["relation_embeddings"].append(embedding)
 
     return embedding_dict
+
+
+def main_binary(
+    hash_table: EntityHashTable,
+    relation_embeddings: RelationEmbeddings,
+    entities: list,
+    relations: list,
+    entity_matrix: Optional[EntityEmbeddingMatrix] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Get embeddings for all requested URIs as float32 arrays.
+
+    The rows of the arrays correspond to the requested URIs. Rows of URIs without embedding are filled
+    with zeros and marked in the missing masks.
+    The relation embeddings have the shape (relations, side, part, dim) (see RelationEmbeddings).
+
+    :param hash_table: hashtable for entity embedding file
+    :param relation_embeddings: class storing the relation embedding information for querying
+    :param entities: list of entitiy URIs
+    :param relations: list of relation URIs
+    :param entity_matrix: memory-mapped entity embeddings, which are used instead of the hashtable if given
+    :return: dict with the arrays entity_uris, entity_embeddings, entity_missing, relation_uris,
+             relation_embeddings and relation_missing, the URIs are encoded as UTF-8
+    """
+    if entity_matrix is not None:
+        entity_embeddings, entity_missing = entity_matrix.lookup_many(
+            [strip_scheme(uri) for uri in entities]
+        )
+    else:
+        embedding_dict: dict = {"entity_embeddings": []}
+        query_entity_file(hash_table, entities, embedding_dict)
+        entity_missing = np.array(
+            [line == "" for line in embedding_dict["entity_embeddings"]], dtype=bool
+        )
+        entity_embeddings = stack_rows(
+            [
+                np.array(line.rstrip("\n").split("\t")[1:], dtype=np.float32)
+                for line in embedding_dict["entity_embeddings"]
+                if line != ""
+            ],
+            entity_missing,
+        )
+
+    relation_embeddings_array, relation_missing = relation_embeddings.lookup_many(
+        [strip_scheme(uri) for uri in relations]
+    )
+
+    return {
+        "entity_uris": np.array([uri.encode("UTF-8") for uri in entities], dtype=bytes),
+        "entity_embeddings": entity_embeddings,
+        "entity_missing": entity_missing,
+        "relation_uris": np.array(
+            [uri.encode("UTF-8") for uri in relations], dtype=bytes
+        ),
+        "relation_embeddings": relation_embeddings_array,
+        "relation_missing": relation_missing,
+    }
+
+
+def stack_rows(rows: list, missing: np.ndarray) -> np.ndarray:
+    """
+    Stack the found embeddings into one array with zero rows for the missing URIs.
+
+    :param rows: embeddings of the found URIs in request order
+    :param missing: mask of the URIs without embedding
+    :return: float32 array with one row per URI
+    """
+    if len(rows) == 0:
+        return np.zeros((len(missing), 0), dtype=np.float32)
+    stacked = np.zeros((len(missing),) + rows[0].shape, dtype=np.float32)
+    stacked[~missing] = np.stack(rows)
+    return stacked
+
+
+def strip_scheme(uri: str) -> str:
+    """
+    Remove "http(s)://" from URI.
+
+    :param uri: URI with or without scheme
+    :return: URI without "http(s)://"
+    """
+    if uri.startswith("http"):
+        return uri.split("/", maxsplit=2)[2]
+    return uri
+
+
+def query_entity_file(
+    hash_table: EntityHashTable, entities: list, embedding_dict: dict
+) -> None:
+    """
+    Read the entity embeddings from the entity file.
+
+    The seek positions of all entities are resolved first and read in file order, so adjacent lines are read
+    with a single call (see read_lines). The lines are then scattered back into the order of the entities.
+
+    :param hash_table: hashtable for entity embedding file
+    :param entities: list of entitiy URIs
+    :param embedding_dict: dict, whose list "entity_embeddings" is extended by the lines of the entities
+    """
+    uris = [strip_scheme(uri) for uri in entities]
+    candidates = [
+        (seek_pos, i)
+        for i, uri in enumerate(uris)
+        for seek_pos in hash_table.lookup(uri)
+    ]
+    with open(
+        os.path.join(hash_table.root_path, hash_table.entity_file), "rb"
+    ) as tsv_file:
+        lines = read_lines(tsv_file, sorted({seek_pos for seek_pos, _ in candidates}))
+
+    found_lines = [""] * len(uris)
+    for seek_pos, i in candidates:
+        line = lines[seek_pos]
+        comp_uri = line.split(sep="\t", maxsplit=1)[0]
+        comp_uri = comp_uri.split("/", maxsplit=2)[2]
+        if found_lines[i] == "" and uris[i] == comp_uri:
+            found_lines[i] = line
+    embedding_dict["entity_embeddings"].extend(found_lines)
+
+
+def read_lines(
+    tsv_file: io.BufferedIOBase, seek_positions: List[int]
+) -> Dict[int, str]:
+    """
+    Read the lines at sorted seek positions with coalesced reads.
+
+    Positions, whose read ahead windows are at most COALESCE_GAP bytes apart, are read together.
+    All reads go into one preallocated buffer. Lines longer than READ_AHEAD are completed with readline.
+
+    :param tsv_file: entity file opened in binary mode
+    :param seek_positions: sorted seek positions of line starts
+    :return: dict mapping the seek positions to their lines
+    """
+    file_size = os.fstat(tsv_file.fileno()).st_size
+    # runs of [start, end, seek positions]
+    runs: List[Tuple[int, int, List[int]]] = []
+    for seek_pos in seek_positions:
+        end = min(seek_pos + READ_AHEAD, file_size)
+        if runs and seek_pos <= runs[-1][1] + COALESCE_GAP:
+            runs[-1] = (runs[-1][0], max(runs[-1][1], end), runs[-1][2] + [seek_pos])
+        else:
+            runs.append((seek_pos, end, [seek_pos]))
+
+    buffer = bytearray(sum(end - start for start, end, _ in runs))
+    view = memoryview(buffer)
+    lines = {}
+    buffer_pos = 0
+    for start, end, run_positions in runs:
+        tsv_file.seek(start)
+        tsv_file.readinto(view[buffer_pos : buffer_pos + end - start])
+        for seek_pos in run_positions:
+            line_start = buffer_pos + seek_pos - start
+            line_end = buffer.find(b"\n", line_start, buffer_pos + end - start)
+            if line_end == -1:
+                tsv_file.seek(seek_pos)
+                line = tsv_file.readline()
+            else:
+                line = bytes(view[line_start : line_end + 1])
+            lines[seek_pos] = line.decode("utf-8")
+        buffer_pos += end - start
+    return lines
@@ -0,0 +1,65 @@
+"""Script for generating the memory-mapped entity embedding store or the sorted hash index of the embedding server."""
+import argparse
+from typing import Optional
+
+from app.embedding_paths import ROOT_PATH
+from app.embeddings import EntityEmbeddingMatrix
+from app.embeddings import EntityHashTable
+
+
+def main(root_path: str) -> None:
+    """
+    Convert the entity embedding file at root_path into the memory-mapped store.
+
+    :param root_path: Path to folder containing hash_table_config.json and the entity embedding file
+    """
+    entity_matrix = EntityEmbeddingMatrix(root_path)
+    entity_matrix.generate()
+    entity_matrix.load()
+    print(
+        f"Stored {entity_matrix.matrix.shape[0]} embeddings of dimension {entity_matrix.matrix.shape[1]}."
+    )
+
+
+def build_hash_index(root_path: str, processes: Optional[int] = None) -> None:
+    """
+    Generate the sorted hash index of the entity embedding file at root_path.
+
+    :param root_path: Path to folder containing hash_table_config.json and the entity embedding file
+    :param processes: number of worker processes (default: number of cores)
+    :raises RuntimeError: if the generated index could not be loaded from root_path
+    """
+    hash_table = EntityHashTable(root_path)
+    hash_table.generate_sorted(processes)
+    hash_table.load()
+    if hash_table.sorted_index is None:
+        raise RuntimeError(f"No sorted hash index was loaded from {root_path}")
+    print(f"Indexed {len(hash_table.sorted_index)} entities.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "root_path",
+        nargs="?",
+        default=ROOT_PATH,
+        help="Folder containing hash_table_config.json and the entity embedding file",
+    )
+    parser.add_argument(
+        "--hash-index",
+        action="store_true",
+        help="Generate the sorted hash index for the entity file instead of the memory-mapped store",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of worker processes for hashing (default: number of cores)",
+    )
+    args = parser.parse_args()
+
+    if args.hash_index:
+        build_hash_index(args.root_path, args.processes)
+    else:
+        main(args.root_path)
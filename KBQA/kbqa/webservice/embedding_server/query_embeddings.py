@@ -1,4 +1,5 @@
 """Module for converting triples from QTQ dataset to their corresponding Embeddings."""
+import io
 import json
 from typing import Dict
 from typing import List
@@ -7,6 +8,11 @@ from typing import Tuple
 import numpy as np
 import requests
 
+NPZ_MIMETYPE = "application/x-npz"
+# order of the sides and parts of relation embeddings in binary responses
+RELATION_SIDES = ("lhs", "rhs")
+RELATION_PARTS = ("real", "imag")
+
 
 def load_qtq_dataset(dataset_path: str) -> Dict:
     """
@@ -94,16 +100,26 @@ def gather_uris_from_dataset(dataset: dict) -> Tuple[List, List]:
 
 
 def execute_query(
-    uri_dict: dict, server_address: str = "http://kbqa-pg.cs.upb.de/embedding_query/"
+    uri_dict: dict,
+    server_address: str = "http://kbqa-pg.cs.upb.de/embedding_query/",
+    binary: bool = False,
 ) -> Dict:
     """
     Execute query for relations and entities to embedding server.
 
+    In binary mode the embeddings are requested as float32 arrays in an .npz file. Servers without
+    binary mode answer with json, which is returned instead.
+
     :param uri_dict: dict containing list of entities and relations for querying
     :param server_address: address of the embedding server
+    :param binary: request the binary response format
     :return: server response
     """
-    resp = requests.post(server_address, json=uri_dict)
+    headers = {"Accept": f"{NPZ_MIMETYPE}, application/json;q=0.5"} if binary else {}
+    resp = requests.post(server_address, json=uri_dict, headers=headers)
+    if resp.headers.get("Content-Type", "").startswith(NPZ_MIMETYPE):
+        with np.load(io.BytesIO(resp.content)) as data:
+            return dict(data)
     return resp.json()
 
 
@@ -117,6 +133,15 @@ def post_process_entitiy_response(response_dict: dict) -> Dict:
     :return: dict containg the embeddings as numpy arrays accessible via the URIs
     """
     entity_embeddings = {}
+    if "entity_missing" in response_dict:
+        # binary response: no text to parse
+        embeddings = response_dict["entity_embeddings"].astype(np.float64)
+        for uri, embedding, missing in zip(
+            response_dict["entity_uris"], embeddings, response_dict["entity_missing"]
+        ):
+            if not missing:
+                entity_embeddings[strip_scheme(uri.decode("UTF-8"))] = embedding
+        return entity_embeddings
     embeddings = response_dict["entity_embeddings"]
     for embedding in embeddings:
         if embedding != "":
@@ -140,6 +165,22 @@ def post_process_relation_response(response_dict: dict) -> Dict:
     :return: dict containg the lhs/rhs embeddings as numpy arrays accessible via the URIs
     """
     relation_embeddings: dict = {}
+    if "relation_missing" in response_dict:
+        # binary response with the shape (relations, side, part, dim)
+        embeddings = response_dict["relation_embeddings"].astype(np.float64)
+        for uri, embedding, missing in zip(
+            response_dict["relation_uris"],
+            embeddings,
+            response_dict["relation_missing"],
+        ):
+            if not missing:
+                relation_embeddings[strip_scheme(uri.decode("UTF-8"))] = {
+                    side: {
+                        part: embedding[i, j] for j, part in enumerate(RELATION_PARTS)
+                    }
+                    for i, side in enumerate(RELATION_SIDES)
+                }
+        return relation_embeddings
     embeddings = response_dict["relation_embeddings"]
     for embedding in embeddings:
         if embedding != {}:
@@ -160,6 +201,18 @@ def post_process_relation_response(response_dict: dict) -> Dict:
     return relation_embeddings
 
 
+def strip_scheme(uri: str) -> str:
+    """
+    Remove "http(s)://" from URI.
+
+    :param uri: URI with or without scheme
+    :return: URI without "http(s)://"
+    """
+    if uri.startswith("http"):
+        return uri.split("/", maxsplit=2)[2]
+    return uri
+
+
 def query_entities(entities: list) -> Dict:
     """
     Query embeddings for unique list of entites and store in dict.
@@ -174,7 +227,9 @@ def query_entities(entities: list) -> Dict:
         if len(batch_uris) == 100:
             uri_dict = {"entities": batch_uris, "relations": []}
             response_dict = execute_query(
-                uri_dict, server_address="http://127.0.0.1/embedding_query/"
+                uri_dict,
+                server_address="http://127.0.0.1/embedding_query/",
+                binary=True,
             )
             new_embeddings = post_process_entitiy_response(response_dict)
             entity_embeddings.update(new_embeddings)
@@ -183,7 +238,7 @@ def query_entities(entities: list) -> Dict:
     # Query remaining batch
     uri_dict = {"entities": batch_uris, "relations": []}
     response_dict = execute_query(
-        uri_dict, server_address="http://127.0.0.1/embedding_query/"
+        uri_dict, server_address="http://127.0.0.1/embedding_query/", binary=True
     )
     new_embeddings = post_process_entitiy_response(response_dict)
     entity_embeddings.update(new_embeddings)
@@ -204,7 +259,9 @@ def query_relations(relations: list) -> Dict:
         if len(batch_uris) == 100:
             uri_dict = {"entities": [], "relations": batch_uris}
             response_dict = execute_query(
-                uri_dict, server_address="http://127.0.0.1/embedding_query/"
+                uri_dict,
+                server_address="http://127.0.0.1/embedding_query/",
+                binary=True,
             )
             new_embeddings = post_process_relation_response(response_dict)
             entity_embeddings.update(new_embeddings)
@@ -214,7 +271,7 @@ def query_relations(relations: list) -> Dict:
     # Query remaining batch
     uri_dict = uri_dict = {"entities": [], "relations": batch_uris}
     response_dict = execute_query(
-        uri_dict, server_address="http://127.0.0.1/embedding_query/"
+        uri_dict, server_address="http://127.0.0.1/embedding_query/", binary=True
     )
     new_embeddings = post_process_relation_response(response_dict)
     entity_embeddings.update(new_embeddings)
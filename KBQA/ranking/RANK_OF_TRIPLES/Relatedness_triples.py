@@ -4,12 +4,11 @@ from typing import Dict
 from typing import List
 from typing import Tuple
 
+from KBQA.appB.summarizers.graph_backend import get_backend
 from nltk.corpus import wordnet
 from rdflib.graph import Graph
 from rdflib.term import Literal
 from rdflib.term import URIRef
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.Wrapper import RDFXML
 
 
 def graphs_for_the_question(entities: List[URIRef]) -> List[Graph]:
@@ -21,30 +20,15 @@ def graphs_for_the_question(entities: List[URIRef]) -> List[Graph]:
     :param entities: list of entities in URIRef format.
     :return: list of graphs.
     """
-    endpoint = "https://dbpedia.org/sparql"
+    backend = get_backend()
     graph_list = list()
     for entity in entities:
-        sparql_string1 = f"""CONSTRUCT WHERE{{
-            <{entity}> ?p ?o.
-            }}
-            """
-        sparql_string2 = f"""CONSTRUCT WHERE{{
-            ?s ?p <{entity}>.
-            }}
-            """
-        sparql = SPARQLWrapper(
-            endpoint,
-            agent="Mozilla/5.0 (Windows NT x.y; Win64; x64; X11; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
-        )
-        sparql.setQuery(sparql_string1)
-        sparql.method = "POST"
-        sparql.setReturnFormat(RDFXML)
-        graph1 = sparql.query().convert()
-        sparql.setQuery(sparql_string2)
-        sparql.method = "POST"
-        sparql.setReturnFormat(RDFXML)
-        graph2 = sparql.query().convert()
-        graph_list.append(graph1 + graph2)
+        graph = Graph()
+        for triple in backend.triples(subj=entity):
+            graph.add(triple)
+        for triple in backend.triples(obj=entity):
+            graph.add(triple)
+        graph_list.append(graph)
     return graph_list
 
 
@@ -8,18 +8,17 @@ from typing import Dict
 from typing import List
 from typing import Tuple
 
+from KBQA.appB.summarizers.graph_backend import get_backend
+from KBQA.appB.summarizers.utils import entity_recognition_tagme
 from KBQA.ranking.RANK_OF_TRIPLES.Relatedness_triples import (
     calclualteRelatenessOfGraphs,
     dictTripleRelateness,
     graphs_for_the_question,
 )
-from KBQA.appB.summarizers.utils import entity_recognition_tagme
 from rdflib.graph import Graph
 from rdflib.term import Literal
 from rdflib.term import URIRef
 import requests
-from SPARQLWrapper import SPARQLWrapper
-from SPARQLWrapper.Wrapper import RDFXML
 
 
 class Triples_for_pred(ABC):
@@ -95,13 +94,14 @@ class Triples_for_pred(ABC):
         """
         string1 = ""
         string2 = ""
-        subj1 = "<" + str(entity) + ">"
+        # the terms are separated by whitespace, which local SPARQL parsers require
+        subj1 = "<" + str(entity) + "> "
         first_predicate = True
         num = 1
         for pred in list_of_predicates:
-            object1 = "?obj1" + str(num) + "."
+            object1 = "?obj1" + str(num) + " . "
             if len(pred[0]) != 2:
-                pred1 = "<" + str(pred[0]) + ">"
+                pred1 = "<" + str(pred[0]) + "> "
                 string1 = string1 + subj1 + pred1 + object1
                 if first_predicate:
                     string2 = (
@@ -112,11 +112,11 @@ class Triples_for_pred(ABC):
                     string2 = string2 + """UNION{""" + subj1 + pred1 + object1 + """}"""
                 num = num + 1
             elif len(pred[0]) == 2:
-                pred1 = "<" + str(pred[0][0]) + ">"
-                pred2 = "<" + str(pred[0][1]) + ">"
-                object1 = "?obj" + str(num) + "."
-                object11 = "?obj" + str(num)
-                object2 = "?obj" + str(num) + "1."
+                pred1 = "<" + str(pred[0][0]) + "> "
+                pred2 = "<" + str(pred[0][1]) + "> "
+                object1 = "?obj" + str(num) + " . "
+                object11 = "?obj" + str(num) + " "
+                object2 = "?obj" + str(num) + "1 . "
                 string1 = string1 + subj1 + pred1 + object1 + object11 + pred2 + object2
                 if first_predicate:
                     string2 = (
@@ -166,11 +166,11 @@ class Triples_for_pred(ABC):
         string2 = ""
         first_predicate = True
         num = 1
-        object2 = "<" + str(entity) + ">."
+        object2 = "<" + str(entity) + "> . "
         for pred in list_of_predicates:
-            subj1 = "?s" + str(num)
+            subj1 = "?s" + str(num) + " "
             if len(pred[0]) != 2:
-                pred1 = "<" + str(pred[0]) + ">"
+                pred1 = "<" + str(pred[0]) + "> "
                 string1 = string1 + subj1 + pred1 + object2
                 if first_predicate:
                     string2 = (
@@ -198,28 +198,18 @@ class Triples_for_pred(ABC):
         :param list_of_predicates: predicates from data set in decreasing order according rank.
         :return: triples_list for all entities without duplicates.
         """
-        endpoint = "https://dbpedia.org/sparql"
+        backend = get_backend()
         triples_list: List[Tuple] = []
         for entity in entities:
             sparql_string1 = self.generate_sparql_string(entity, list_of_predicates)
             sparql_string2 = self.generate_sparql_string_inverse(
                 entity, list_of_predicates
             )
-            sparql = SPARQLWrapper(
-                endpoint,
-                agent="Mozilla/5.0 (Windows NT x.y; Win64; x64; X11; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
-            )
-            sparql.setQuery(sparql_string1)
-            sparql.method = "POST"
-            sparql.setReturnFormat(RDFXML)
-            graph_first_query = sparql.query().convert()
+            graph_first_query = backend.construct(sparql_string1)
             triples_list1 = self.add_new_triples_without_duplicates_to_triples_list(
                 triples_list, graph_first_query
             )
-            sparql.setQuery(sparql_string2)
-            sparql.method = "POST"
-            sparql.setReturnFormat(RDFXML)
-            graph_first_query = sparql.query().convert()
+            graph_first_query = backend.construct(sparql_string2)
             triples_list2 = self.add_new_triples_without_duplicates_to_triples_list(
                 triples_list, graph_first_query
             )
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "..", "..", "kbqa", "webservice", "appB"),
+)
+
+from app.base_pipeline import BasePipeline  # noqa: E402
+from app.batching import BatchScheduler  # noqa: E402
+
+
+class EchoPipeline(BasePipeline):
+    """Pipeline, which predicts the questions in upper case."""
+
+    def __init__(self):
+        super().__init__(SimpleNamespace())
+        self.batches = []
+
+    def predict_sparql_query(self, question, triples):
+        if question == "fail":
+            raise ValueError(question)
+
+        return question.upper()
+
+    def predict_sparql_queries(self, questions, triples):
+        self.batches.append(list(questions))
+
+        return [self.predict_sparql_query(q, t) for q, t in zip(questions, triples)]
+
+
+def predict_concurrently(scheduler, questions):
+    """Predict the questions in separate threads like concurrent requests."""
+    results = {}
+
+    def predict(question):
+        try:
+            results[question] = scheduler.predict_sparql_query(question, [])
+        except ValueError as exception:
+            results[question] = exception
+
+    threads = [threading.Thread(target=predict, args=(q,)) for q in questions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    return results
+
+
+class TestBatchScheduler(unittest.TestCase):
+    def test_max_wait(self):
+        """Test that an incomplete batch is predicted after max_wait_ms."""
+
+        pipeline = EchoPipeline()
+        scheduler = BatchScheduler(pipeline, max_batch_size=8, max_wait_ms=50)
+
+        start = time.monotonic()
+
+        self.assertEqual(scheduler.predict_sparql_query("a", []), "A")
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(pipeline.batches, [["a"]])
+
+    def test_max_batch_size(self):
+        """Test that the questions of concurrent requests are batched."""
+
+        pipeline = EchoPipeline()
+        scheduler = BatchScheduler(pipeline, max_batch_size=2, max_wait_ms=200)
+        questions = ["a", "b", "c", "d", "e"]
+
+        results = predict_concurrently(scheduler, questions)
+
+        self.assertEqual(results, {q: q.upper() for q in questions})
+        self.assertEqual(max(len(batch) for batch in pipeline.batches), 2)
+        self.assertCountEqual(
+            [q for batch in pipeline.batches for q in batch], questions
+        )
+
+    def test_error_propagation(self):
+        """Test that a failing question does not fail the rest of its batch."""
+
+        pipeline = EchoPipeline()
+        scheduler = BatchScheduler(pipeline, max_batch_size=8, max_wait_ms=200)
+
+        results = predict_concurrently(scheduler, ["a", "fail", "b"])
+
+        self.assertCountEqual(pipeline.batches[0], ["a", "fail", "b"])
+        self.assertEqual(results["a"], "A")
+        self.assertEqual(results["b"], "B")
+        self.assertIsInstance(results["fail"], ValueError)
@@ -0,0 +1,27 @@
+import os
+import unittest
+
+KBQA_PATH = os.path.join(os.path.dirname(__file__), "..", "..")
+
+# modules, which are copied into the summarizers and the services
+COPIED_MODULES = ["endpoints.py", "sparql_cache.py"]
+COPIES = [
+    os.path.join(KBQA_PATH, "appB", "summarizers"),
+    os.path.join(KBQA_PATH, "kbqa", "webservice", "appA", "app"),
+    os.path.join(KBQA_PATH, "kbqa", "webservice", "appB", "app"),
+]
+
+
+class TestCopies(unittest.TestCase):
+    def test_copies_identical(self):
+        """Test that the copies of the shared modules did not drift apart."""
+
+        for module in COPIED_MODULES:
+            sources = list()
+
+            for directory in COPIES:
+                with open(os.path.join(directory, module), encoding="utf-8") as file:
+                    sources.append(file.read())
+
+            with self.subTest(module=module):
+                self.assertEqual(sources.count(sources[0]), len(sources))
@@ -0,0 +1,83 @@
+import unittest
+
+from KBQA.appB.summarizers.endpoints import _parse_triples
+from KBQA.appB.summarizers.endpoints import iter_ntriples
+from KBQA.appB.summarizers.endpoints import to_term
+from rdflib import BNode
+from rdflib import Literal
+from rdflib import URIRef
+from rdflib.namespace import XSD
+
+BERLIN = URIRef("http://dbpedia.org/resource/Berlin")
+LABEL = URIRef("http://www.w3.org/2000/01/rdf-schema#label")
+
+
+class TestNTriples(unittest.TestCase):
+    def test_to_term(self):
+        """Test the conversion of the N-Triples terms."""
+
+        self.assertEqual(to_term("<http://dbpedia.org/resource/Berlin>"), BERLIN)
+        self.assertEqual(to_term("_:b0"), BNode("b0"))
+        self.assertEqual(to_term('"Berlin"'), Literal("Berlin"))
+        self.assertEqual(to_term('"Berlin"@de'), Literal("Berlin", lang="de"))
+        self.assertEqual(
+            to_term('"3664088"^^<http://www.w3.org/2001/XMLSchema#integer>'),
+            Literal("3664088", datatype=XSD.integer),
+        )
+
+    def test_to_term_escapes(self):
+        """Test that the escape sequences of the terms are resolved."""
+
+        self.assertEqual(to_term(r'"say \"hi\""'), Literal('say "hi"'))
+        self.assertEqual(to_term(r'"a\tb\nc\\"'), Literal("a\tb\nc\\"))
+        self.assertEqual(to_term(r'"Z\u00fcrich"@de'), Literal("Zürich", lang="de"))
+        self.assertEqual(to_term(r'"\U0001F600"'), Literal("\U0001F600"))
+        self.assertEqual(
+            to_term(r"<http://dbpedia.org/resource/Z\u00fcrich>"),
+            URIRef("http://dbpedia.org/resource/Zürich"),
+        )
+
+    def test_to_term_invalid(self):
+        """Test that invalid terms raise a ValueError."""
+
+        with self.assertRaises(ValueError):
+            to_term("Berlin")
+
+    def test_iter_ntriples(self):
+        """Test that only the valid triples are split into their terms."""
+
+        lines = [
+            "# comment",
+            "",
+            '<http://x/s> <http://x/p> "a . b"@en .',
+            r'_:b0 <http://x/p> "say \"hi\"" .',
+            "<http://x/s> <http://x/p> <http://x/o>",
+            "<http://x/s> <http://x/p> .",
+            "<http://x/s> <http://x/p> <http://x/o> .",
+        ]
+
+        self.assertEqual(
+            list(iter_ntriples(lines)),
+            [
+                ("<http://x/s>", "<http://x/p>", '"a . b"@en'),
+                ("_:b0", "<http://x/p>", r'"say \"hi\""'),
+                ("<http://x/s>", "<http://x/p>", "<http://x/o>"),
+            ],
+        )
+
+    def test_parse_triples(self):
+        """Test the parsing of the CONSTRUCT results by their media type."""
+
+        ntriples = [f'{BERLIN.n3()} {LABEL.n3()} "Berlin"@de .'.encode("utf-8")]
+        turtle = [
+            b"@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
+            f'{BERLIN.n3()} rdfs:label "Berlin"@de .'.encode("utf-8"),
+        ]
+        triple = (BERLIN, LABEL, Literal("Berlin", lang="de"))
+
+        self.assertEqual(_parse_triples("application/n-triples", ntriples), [triple])
+        self.assertEqual(_parse_triples("", ntriples), [triple])
+        self.assertEqual(_parse_triples("text/turtle", turtle), [triple])
+
+        with self.assertRaises(ValueError):
+            _parse_triples("text/html", [b"<html></html>"])
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "..", "..", "kbqa", "webservice", "appB"),
+)
+
+from app.summarizer.one_hop_rank_summarizer import (  # noqa: E402
+    entity_relation_hops,
+)
+from rdflib import URIRef  # noqa: E402
+
+TRIPLE = (URIRef("http://x/s"), URIRef("http://x/p"), URIRef("http://x/o"))
+
+
+class TestAskDbpediaConcurrently(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def tearDown(self):
+        self.release.set()
+
+    def ask_dbpedia(self, query, timeout=None):
+        """Stub of ask_dbpedia, which blocks the slow queries."""
+        self.calls.append(query)
+
+        if query == "slow":
+            self.release.wait(5)
+        elif query == "fail":
+            raise ValueError(query)
+
+        return [TRIPLE]
+
+    def ask_dbpedia_concurrently(self, queries, max_workers, deadline):
+        with mock.patch.object(
+            entity_relation_hops, "ask_dbpedia", side_effect=self.ask_dbpedia
+        ):
+            return entity_relation_hops.ask_dbpedia_concurrently(
+                queries, max_workers, deadline
+            )
+
+    def test_results(self):
+        """Test that the results are in the order of the queries."""
+
+        results = self.ask_dbpedia_concurrently(["a", "fail", "b"], 2, 5.0)
+
+        self.assertEqual(results, [[TRIPLE], [], [TRIPLE]])
+        self.assertEqual(self.ask_dbpedia_concurrently([], 2, 5.0), [])
+
+    def test_deadline(self):
+        """Test that queries, which exceed the deadline, result in no triples."""
+
+        start = time.monotonic()
+
+        results = self.ask_dbpedia_concurrently(["slow", "fast"], 2, 0.2)
+
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual(results, [[], [TRIPLE]])
+
+    def test_cancellation(self):
+        """Test that waiting queries are cancelled at the deadline."""
+
+        results = self.ask_dbpedia_concurrently(["slow", "a", "b"], 1, 0.2)
+
+        self.assertEqual(results, [[], [], []])
+
+        # the queued queries are not sent after the slow query is answered
+        self.release.set()
+        time.sleep(0.1)
+
+        self.assertEqual(self.calls, ["slow"])
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from KBQA.appB.summarizers import endpoints
+from KBQA.appB.summarizers.sparql_cache import cache_key
+from KBQA.appB.summarizers.sparql_cache import SparqlCache
+import requests
+
+
+class TestSparqlCache(unittest.TestCase):
+    def test_cache_key(self):
+        """Test that the key ignores the whitespace outside of literals."""
+
+        key = cache_key('SELECT ?s\n WHERE { ?s ?p "a  b" }', "json", "endpoint")
+
+        self.assertEqual(
+            key, cache_key('SELECT ?s WHERE { ?s ?p "a  b" }', "json", "endpoint")
+        )
+        self.assertNotEqual(
+            key, cache_key('SELECT ?s WHERE { ?s ?p "a b" }', "json", "endpoint")
+        )
+        self.assertNotEqual(
+            key, cache_key('SELECT ?s WHERE { ?s ?p "a  b" }', "xml", "endpoint")
+        )
+
+    def test_ttl_expiry(self):
+        """Test that expired results are not returned."""
+
+        cache = SparqlCache(ttl=10.0)
+
+        with mock.patch("KBQA.appB.summarizers.sparql_cache.time") as time:
+            time.time.return_value = 100.0
+            cache.put("key", "text/plain", b"body")
+
+            time.time.return_value = 105.0
+            self.assertEqual(cache.get("key"), ("text/plain", b"body"))
+
+            time.time.return_value = 111.0
+            self.assertIsNone(cache.get("key"))
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used result is evicted."""
+
+        cache = SparqlCache(max_entries=2)
+
+        cache.put("a", "text/plain", b"a")
+        cache.put("b", "text/plain", b"b")
+        cache.get("a")
+        cache.put("c", "text/plain", b"c")
+
+        self.assertEqual(cache.get("a"), ("text/plain", b"a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), ("text/plain", b"c"))
+
+    def test_sqlite_tier(self):
+        """Test that results are shared by caches with the same file."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+
+            SparqlCache(path=path).put("key", "text/plain", b"body")
+            cache = SparqlCache(path=path)
+
+            self.assertEqual(cache.get("key"), ("text/plain", b"body"))
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+            # the result is in memory after the first lookup
+            self.assertEqual(cache.get("key"), ("text/plain", b"body"))
+            self.assertEqual(cache.stats()["hits"], 1)
+
+            cache.clear()
+            self.assertIsNone(SparqlCache(path=path).get("key"))
+
+    def test_sqlite_pruning(self):
+        """Test that the oldest results on disk are pruned."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+
+            cache = SparqlCache(max_entries=1, path=path, max_disk_entries=2)
+            cache.PRUNE_INTERVAL = 1
+
+            with mock.patch("KBQA.appB.summarizers.sparql_cache.time") as time:
+                for created, key in enumerate(["a", "b", "c"]):
+                    time.time.return_value = 100.0 + created
+                    cache.put(key, "text/plain", key.encode())
+
+                time.time.return_value = 110.0
+                other = SparqlCache(path=path)
+
+                self.assertIsNone(other.get("a"))
+                self.assertEqual(other.get("b"), ("text/plain", b"b"))
+                self.assertEqual(other.get("c"), ("text/plain", b"c"))
+
+    def test_failed_responses_not_cached(self):
+        """Test that fetch_sparql does not cache failed queries."""
+
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "text/plain; charset=utf-8"
+        response._content = b"body"
+
+        endpoints.configure_cache(enabled=True)
+
+        try:
+            with mock.patch.object(
+                endpoints, "query_sparql", side_effect=requests.HTTPError
+            ):
+                with self.assertRaises(requests.HTTPError):
+                    endpoints.fetch_sparql("SELECT * {}", "text/plain")
+
+            self.assertEqual(endpoints.client.cache.stats()["entries"], 0)
+
+            with mock.patch.object(
+                endpoints, "query_sparql", return_value=response
+            ) as query_sparql:
+                for _ in range(2):
+                    self.assertEqual(
+                        endpoints.fetch_sparql("SELECT * {}", "text/plain"),
+                        ("text/plain", b"body"),
+                    )
+
+            query_sparql.assert_called_once()
+        finally:
+            endpoints.configure_cache(enabled=False)
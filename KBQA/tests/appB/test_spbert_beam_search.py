@@ -0,0 +1,150 @@
+import importlib.util
+import os
+import unittest
+
+import torch
+from transformers import BertConfig
+from transformers import BertModel
+
+APP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "kbqa", "webservice", "appB", "app"
+)
+
+
+def load_model_module(pipeline="bert_spbert_spbert"):
+    """Load the SPBERT model module without importing the webservice app."""
+    path = os.path.join(APP_PATH, pipeline, "spbert", "model.py")
+    spec = importlib.util.spec_from_file_location(f"{pipeline}_model", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def log_probs(seed, question, prefix, vocab_size):
+    """Random log probabilities of the next token, fixed by the hypothesis."""
+    generator = torch.Generator().manual_seed(hash((seed, question) + prefix) % 2**32)
+    return torch.randn(vocab_size, generator=generator).log_softmax(-1)
+
+
+class TestBeamSearch(unittest.TestCase):
+    def test_cached_decoding_matches_uncached(self):
+        """Test that the KV-cached beam search predicts the same queries."""
+
+        model_module = load_model_module()
+
+        for seed in range(3):
+            torch.manual_seed(seed)
+            config = BertConfig(
+                vocab_size=50,
+                hidden_size=32,
+                num_hidden_layers=2,
+                num_attention_heads=4,
+                intermediate_size=64,
+            )
+            decoder_config = BertConfig(**config.to_dict())
+            decoder_config.is_decoder = True
+            decoder_config.add_cross_attention = True
+            model = model_module.BertSeq2Seq(
+                BertModel(config),
+                BertModel(config),
+                BertModel(decoder_config),
+                config,
+                beam_size=4,
+                max_length=20,
+                sos_id=1,
+                eos_id=2,
+                device=torch.device("cpu"),
+            ).eval()
+
+            source_ids = torch.randint(3, 50, (3, 10))
+            source_ids[1, 6:] = 0
+            source_mask = (source_ids > 0).long()
+            triples_ids = torch.randint(3, 50, (3, 12))
+            triples_mask = torch.ones_like(triples_ids)
+            triples_mask[2, 5:] = 0
+
+            with torch.no_grad():
+                model.use_cache = False
+                uncached = model(source_ids, source_mask, triples_ids, triples_mask)
+                model.use_cache = True
+                cached = model(source_ids, source_mask, triples_ids, triples_mask)
+
+            self.assertTrue(torch.equal(uncached, cached))
+
+
+class TestBatchBeam(unittest.TestCase):
+    MAX_LENGTH = 12
+    VOCAB_SIZE = 7
+    SOS = 1
+    EOS = 2
+
+    def search_per_question(self, beam_class, seed, question, beam_size):
+        """Run the search of one question like the original SPBERT model."""
+        beam = beam_class(beam_size, self.SOS, self.EOS, device=torch.device("cpu"))
+        input_ids = beam.getCurrentState()
+        for _ in range(self.MAX_LENGTH):
+            if beam.done():
+                break
+            beam.advance(
+                torch.stack(
+                    [
+                        log_probs(seed, question, tuple(row), self.VOCAB_SIZE)
+                        for row in input_ids.tolist()
+                    ]
+                )
+            )
+            input_ids = input_ids.index_select(0, beam.getCurrentOrigin())
+            input_ids = torch.cat((input_ids, beam.getCurrentState()), -1)
+        hyp = beam.getHyp(beam.getFinal())
+        pred = beam.buildTargetTokens(hyp)[:beam_size]
+        return [
+            [int(token) for token in tokens] + [0] * (self.MAX_LENGTH - len(tokens))
+            for tokens in pred
+        ]
+
+    def search_batch(self, beam_class, seed, batch_size, beam_size):
+        """Run the batched search like BertSeq2Seq.forward."""
+        beam = beam_class(
+            batch_size, beam_size, self.SOS, self.EOS, device=torch.device("cpu")
+        )
+        input_ids = beam.getCurrentState()
+        for _ in range(self.MAX_LENGTH):
+            questions = beam.alive.repeat_interleave(beam_size).tolist()
+            origin = beam.advance(
+                torch.stack(
+                    [
+                        log_probs(seed, question, tuple(row), self.VOCAB_SIZE)
+                        for question, row in zip(questions, input_ids.tolist())
+                    ]
+                )
+            )
+            input_ids = torch.cat(
+                (input_ids.index_select(0, origin), beam.getCurrentState()), -1
+            )
+            keep = beam.prune()
+            if beam.done():
+                break
+            if keep is not None:
+                input_ids = input_ids.index_select(0, keep)
+        return beam.getPreds(self.MAX_LENGTH).tolist()
+
+    def test_batch_beam_matches_beam(self):
+        """Test that the batched beam search finds the per-question hypotheses."""
+
+        batch_beam = load_model_module().BatchBeam
+        beam = load_model_module("bert_spbert").Beam
+
+        for seed in range(4):
+            for batch_size in (1, 3, 8):
+                for beam_size in (1, 2, 4):
+                    with self.subTest(
+                        seed=seed, batch_size=batch_size, beam_size=beam_size
+                    ):
+                        expected = [
+                            self.search_per_question(beam, seed, question, beam_size)
+                            for question in range(batch_size)
+                        ]
+                        self.assertEqual(
+                            self.search_batch(batch_beam, seed, batch_size, beam_size),
+                            expected,
+                        )
@@ -0,0 +1,183 @@
+import os
+import tempfile
+import unittest
+
+from KBQA.appB.summarizers.graph_backend import get_backend
+from KBQA.appB.summarizers.graph_backend import LocalBackend
+from KBQA.appB.summarizers.graph_backend import set_backend
+from KBQA.appB.summarizers.triple_store import decode_term
+from KBQA.appB.summarizers.triple_store import encode_term
+from KBQA.appB.summarizers.triple_store import TripleStore
+from rdflib import BNode
+from rdflib import Literal
+from rdflib import URIRef
+from rdflib.namespace import XSD
+
+RESOURCE = "http://dbpedia.org/resource/"
+ONTOLOGY = "http://dbpedia.org/ontology/"
+
+BERLIN = URIRef(RESOURCE + "Berlin")
+GERMANY = URIRef(RESOURCE + "Germany")
+CAPITAL = URIRef(ONTOLOGY + "capital")
+COUNTRY = URIRef(ONTOLOGY + "country")
+POPULATION = URIRef(ONTOLOGY + "population")
+LABEL = URIRef("http://www.w3.org/2000/01/rdf-schema#label")
+
+TRIPLES = [
+    (GERMANY, CAPITAL, BERLIN),
+    (BERLIN, COUNTRY, GERMANY),
+    (BERLIN, POPULATION, Literal("3664088", datatype=XSD.nonNegativeInteger)),
+    (BERLIN, LABEL, Literal("Berlin", lang="de")),
+    (GERMANY, LABEL, Literal("Germany", lang="en")),
+    (GERMANY, LABEL, Literal("Deutschland")),
+]
+
+DUMP = """\
+<http://dbpedia.org/resource/Germany> <http://dbpedia.org/ontology/capital> <http://dbpedia.org/resource/Berlin> .
+<http://dbpedia.org/resource/Berlin> <http://dbpedia.org/ontology/country> <http://dbpedia.org/resource/Germany> .
+<http://dbpedia.org/resource/Berlin> <http://dbpedia.org/ontology/population> "3664088"^^<http://www.w3.org/2001/XMLSchema#nonNegativeInteger> .
+<http://dbpedia.org/resource/Berlin> <http://www.w3.org/2000/01/rdf-schema#label> "Berlin"@de .
+<http://dbpedia.org/resource/Germany> <http://www.w3.org/2000/01/rdf-schema#label> "Germany"@en .
+<http://dbpedia.org/resource/Germany> <http://www.w3.org/2000/01/rdf-schema#label> "Deutschland" .
+<http://dbpedia.org/resource/Germany> <http://dbpedia.org/ontology/capital> <http://dbpedia.org/resource/Berlin> .
+"""
+
+
+class TestTripleStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.directory.name, "dump.nt")
+        self.path = os.path.join(self.directory.name, "store.sqlite")
+
+        with open(self.dump, "w", encoding="utf-8") as file:
+            file.write(DUMP)
+
+        self.store = TripleStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_encode_decode_term(self):
+        """Test that the encoding of the terms is reversible."""
+
+        terms = [BERLIN, BNode("b0"), Literal("a b"), Literal("a", lang="en")]
+        terms += [Literal("1", datatype=XSD.integer), URIRef("http://x/{invalid}")]
+
+        for term in terms:
+            self.assertEqual(decode_term(encode_term(term)), term)
+
+    def test_load(self):
+        """Test that a dump is loaded without duplicates."""
+
+        self.assertEqual(self.store.load(self.dump), 7)
+        self.assertEqual(len(self.store), 6)
+        self.assertCountEqual(self.store.match(), TRIPLES)
+
+        # the triples are persisted
+        self.store.close()
+        self.store = TripleStore(self.path)
+        self.assertEqual(len(self.store), 6)
+
+    def test_match(self):
+        """Test the triple patterns with the different indexes."""
+
+        self.store.load(self.dump)
+
+        self.assertCountEqual(
+            self.store.match(subj=BERLIN), [t for t in TRIPLES if t[0] == BERLIN]
+        )
+        self.assertCountEqual(
+            self.store.match(pred=LABEL), [t for t in TRIPLES if t[1] == LABEL]
+        )
+        self.assertEqual(self.store.match(obj=BERLIN), [(GERMANY, CAPITAL, BERLIN)])
+        self.assertEqual(
+            self.store.match(BERLIN, COUNTRY, GERMANY), [(BERLIN, COUNTRY, GERMANY)]
+        )
+        self.assertEqual(len(self.store.match(pred=LABEL, limit=2)), 2)
+        self.assertEqual(self.store.match(subj=URIRef(RESOURCE + "Paris")), [])
+
+    def test_add_remove(self):
+        """Test that added triples are visible and removed by pattern."""
+
+        for triple in TRIPLES:
+            self.store.add(triple)
+
+        self.assertEqual(len(self.store), 6)
+
+        self.store.remove((GERMANY, LABEL, None))
+
+        self.assertCountEqual(
+            self.store.match(subj=GERMANY), [(GERMANY, CAPITAL, BERLIN)]
+        )
+        self.assertEqual(len(self.store), 4)
+
+        # removing unknown terms does nothing
+        self.store.remove((URIRef(RESOURCE + "Paris"), None, None))
+        self.assertEqual(len(self.store), 4)
+
+    def test_construct(self):
+        """Test that rdflib evaluates CONSTRUCT-queries on the store."""
+
+        self.store.load(self.dump)
+        backend = LocalBackend(self.path)
+
+        graph = backend.construct(
+            f"CONSTRUCT {{ {BERLIN.n3()} ?p ?o }} "
+            f"WHERE {{ {BERLIN.n3()} ?p ?o . FILTER(isIRI(?o)) }}"
+        )
+
+        self.assertCountEqual(list(graph), [(BERLIN, COUNTRY, GERMANY)])
+        backend.store.close()
+
+
+class TestLocalBackend(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "store.sqlite")
+
+        store = TripleStore(path)
+        for triple in TRIPLES:
+            store.add(triple)
+        store.close()
+
+        self.backend = LocalBackend(path)
+
+    def tearDown(self):
+        self.backend.store.close()
+        self.directory.cleanup()
+
+    def test_triples(self):
+        """Test the triple patterns of the backend."""
+
+        self.assertCountEqual(
+            self.backend.triples(subj=GERMANY), [t for t in TRIPLES if t[0] == GERMANY]
+        )
+        self.assertEqual(len(self.backend.triples(limit=3)), 3)
+
+    def test_select(self):
+        """Test SELECT- and ASK-queries in the SPARQL-JSON format."""
+
+        result = self.backend.select(
+            f"SELECT ?o WHERE {{ {GERMANY.n3()} {LABEL.n3()} ?o . "
+            'FILTER(lang(?o) = "en") }'
+        )
+        bindings = result["results"]["bindings"]
+
+        self.assertEqual(len(bindings), 1)
+        self.assertEqual(bindings[0]["o"]["value"], "Germany")
+
+        result = self.backend.select(f"ASK {{ {BERLIN.n3()} ?p {GERMANY.n3()} }}")
+
+        self.assertTrue(result["boolean"])
+
+    def test_set_backend(self):
+        """Test that the summarizers can be switched to the backend."""
+
+        previous = get_backend()
+
+        try:
+            set_backend(self.backend)
+            self.assertIs(get_backend(), self.backend)
+        finally:
+            set_backend(previous)
@@ -0,0 +1,82 @@
+from math import inf
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "..", "..", "kbqa", "webservice", "appB"),
+)
+
+from app.summarizer.one_hop_rank_summarizer.triple_table import (  # noqa: E402
+    TripleTable,
+)
+from rdflib import Literal  # noqa: E402
+from rdflib import URIRef  # noqa: E402
+
+SUBJECTS = [URIRef(f"http://dbpedia.org/resource/S{i}") for i in range(3)]
+PREDICATES = [URIRef(f"http://dbpedia.org/ontology/p{i}") for i in range(4)]
+OBJECTS = SUBJECTS + [Literal("a"), Literal("a", lang="en"), Literal(1)]
+
+
+def select_triples(triples, lower_rank, min_confidence, exclude, max_triples):
+    """Select the triples with lists like the summarizer did before the table."""
+    counts = dict()
+    selected = list()
+
+    for index, (triple, rank, confidence) in enumerate(triples):
+        if rank < lower_rank or confidence < min_confidence or triple[1] in exclude:
+            continue
+
+        key = (triple[0], triple[1])
+
+        if counts.get(key, 0) < max(max_triples, 1):
+            counts[key] = counts.get(key, 0) + 1
+            selected.append(index)
+
+    return selected
+
+
+class TestTripleTable(unittest.TestCase):
+    def test_filter_aggregate(self):
+        """Test that the table selects the same triples as the lists."""
+
+        rng = random.Random(0)
+
+        for _ in range(200):
+            triples = [
+                (
+                    (
+                        rng.choice(SUBJECTS),
+                        rng.choice(PREDICATES),
+                        rng.choice(OBJECTS),
+                    ),
+                    rng.choice([inf, 1, 2, 5]),
+                    rng.choice([0.3, 0.5, 0.9]),
+                )
+                for _ in range(rng.randint(0, 40))
+            ]
+            lower_rank = rng.choice([1, 2, 3])
+            min_confidence = rng.choice([0.0, 0.5])
+            exclude = rng.sample(PREDICATES, rng.randint(0, 2))
+            max_triples = rng.choice([-1, 0, 1, 3])
+
+            table = TripleTable()
+            table.extend(triples)
+
+            rows = table.filter(lower_rank, min_confidence, exclude)
+            rows = table.aggregate(rows, max_triples)
+
+            expected = select_triples(
+                triples, lower_rank, min_confidence, exclude, max_triples
+            )
+
+            self.assertEqual(rows.tolist(), expected)
+            self.assertEqual(
+                table.to_list(rows), [triples[index] for index in expected]
+            )
+            self.assertEqual(
+                table.format(rows),
+                [" ".join(t.n3() for t in triples[index][0]) for index in expected],
+            )